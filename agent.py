@@ -4,12 +4,31 @@ Contact Management Bot
 A command-line bot for managing contacts with phone numbers and birthdays.
 """
 
+import argparse
+import asyncio
+import json
+import re
+import sys
+import threading
+import time
+
 import handlers  # noqa: F401 — imported to registers all @command handlers
 import readline  # noqa: F401 — enables arrow keys and history in input()
 from colorama import Style
-from models.commands import registry
+from models.audit import AuditLog
+from models.commands import Command, registry
 from config import IDENT, BOT_COLOR, BOT_ERROR_COLOR
+from models.indexes import attach_served_indexes
 from models.models import AddressBook
+from models.storage import AutoSaver, load_journal
+from models.reminders import BirthdayScheduler, make_notifier
+from models.replica import ReplicaPublisher, ReplicaReader
+from models.sharding import ShardedBook
+from models.tenants import BookManager, BookSession
+
+
+EXIT_COMMANDS = ("close", "exit")
+INVALID_COMMAND = f"{IDENT}{BOT_ERROR_COLOR}Invalid command. Type 'help' to see available commands.{Style.RESET_ALL}"
 
 
 def parse_input(user_input):
@@ -20,29 +39,200 @@ def parse_input(user_input):
     return cmd.strip().lower(), args
 
 
-def main():
-    book = AddressBook()
-    print(f"{BOT_COLOR}Welcome to the assistant bot!{Style.RESET_ALL}")
+def split_commands(text: str) -> list[str]:
+    """Split `text` into commands on ';' and newlines, dropping empty ones."""
+    return [part.strip() for part in re.split(r"[;\n]", text) if part.strip()]
+
+
+async def run_commands_async(text: str, book, stop_on_error: bool = False) -> tuple[str, bool]:
+    """Run every command in `text` in order against `book`.
+
+    Returns (output, exit requested). Results are joined into one string so
+    the caller writes a whole batch at once. With `stop_on_error` the batch
+    ends at the first failing or unknown command. An exit command ends it too.
+    """
+    outputs = []
+    for line in split_commands(text):
+        cmd, args = parse_input(line)
+        if cmd in EXIT_COMMANDS:
+            outputs.append(f"{BOT_COLOR}Good bye!{Style.RESET_ALL}")
+            return "\n".join(outputs), True
+        if cmd in registry:
+            ok, result = await registry[cmd].execute_async(args, book)
+        else:
+            ok, result = False, INVALID_COMMAND
+        if result:
+            outputs.append(result)
+        if not ok and stop_on_error:
+            break
+    return "\n".join(outputs), False
+
+
+def run_commands(text: str, book, stop_on_error: bool = False) -> tuple[str, bool]:
+    """run_commands_async for callers without an event loop."""
+    return asyncio.run(run_commands_async(text, book, stop_on_error))
+
+
+def read_line(prompt: str) -> asyncio.Future:
+    """input() on a daemon thread, so the event loop keeps running and Ctrl+C
+    does not wait for a pending read."""
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def deliver(setter, value):
+        if not future.done():
+            setter(value)
+
+    def read():
+        try:
+            if sys.stdin.isatty():
+                line = input(prompt)  # keeps readline editing and history
+            else:
+                # piped input: read the unbuffered stream, whose lock a blocked daemon thread
+                # would otherwise still hold when the interpreter shuts down
+                print(prompt, end="", flush=True)
+                data = sys.stdin.buffer.raw.readline()
+                if not data:
+                    raise EOFError
+                line = data.decode("utf-8").rstrip("\r\n")
+        except BaseException as e:  # EOFError, KeyboardInterrupt: re-raised by the awaiting task
+            loop.call_soon_threadsafe(deliver, future.set_exception, e)
+        else:
+            loop.call_soon_threadsafe(deliver, future.set_result, line)
+
+    threading.Thread(target=read, name="input", daemon=True).start()
+    return future
+
+
+class SessionRecorder:
+    """Appends every raw input line to a JSON-lines file: {"ts": ..., "line": ...}.
+
+    The file is read back by `python -m benchmarks.replay`.
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+
+    def record(self, line: str):
+        self._file.write(json.dumps({"ts": time.time(), "line": line}) + "\n")
+
+    def close(self):
+        self._file.close()
+
+
+def main(**options):
+    """Run the bot; see serve() for the options."""
+    asyncio.run(serve(**options))
+
+
+async def serve(
+    record_path: str = None,
+    book_path: str = None,
+    books_dir: str = None,
+    max_books: int = 16,
+    notifier=None,
+    shards: int = 0,
+    publish_name: str = None,
+    replica_name: str = None,
+    audit_path: str = None,
+    audit_policy: str = "drop",
+    script: str = None,
+    stop_on_error: bool = False,
+):
+    if replica_name:
+        store = book = ReplicaReader(replica_name)
+    elif shards:
+        store = book = ShardedBook(shards)
+    elif books_dir:
+        store = BookManager(books_dir, max_books=max_books)
+        book = BookSession(store)
+    else:
+        book, lines = load_journal(book_path) if book_path else (AddressBook(), 0)
+        attach_served_indexes(book)
+        store = AutoSaver(book, book_path, journal_lines=lines) if book_path else None
+    recorder = SessionRecorder(record_path) if record_path else None
+    scheduler = BirthdayScheduler(book, notifier).start() if notifier else None
+    publisher = ReplicaPublisher(book, publish_name).start() if publish_name else None
+    Command.audit = audit = AuditLog(audit_path, policy=audit_policy)
 
     try:
+        if script is not None:
+            with open(sys.stdin.fileno() if script == "-" else script, encoding="utf-8", closefd=script != "-") as f:
+                text = f.read()
+            output, _ = await run_commands_async(text, book, stop_on_error)
+            if output:
+                print(output)
+            return
+        print(f"{BOT_COLOR}Welcome to the assistant bot!{Style.RESET_ALL}")
         while True:
-            user_input = input("Enter a command: ").strip()
-            cmd, args = parse_input(user_input)
-
-            if cmd in ["close", "exit"]:
-                print(f"{BOT_COLOR}Good bye!{Style.RESET_ALL}")
+            line = await read_line("Enter a command: ")
+            if recorder:
+                recorder.record(line)
+            output, exit_requested = await run_commands_async(line, book, stop_on_error)
+            if output:
+                print(output)
+            if exit_requested:
                 break
-            elif cmd in registry:
-                result = registry[cmd](args, book)
-                if result:
-                    print(result)
-            elif cmd:
-                print(
-                    f"{IDENT}{BOT_ERROR_COLOR}Invalid command. Type 'help' to see available commands.{Style.RESET_ALL}"
-                )
-    except KeyboardInterrupt:
+    except (KeyboardInterrupt, EOFError, asyncio.CancelledError):  # asyncio.run cancels the task on Ctrl+C
         print(f"\n{BOT_COLOR}Good bye!{Style.RESET_ALL}")
+    finally:
+        Command.shutdown()  # a cancelled command may still be running on the handler thread
+        Command.audit = None
+        audit.close()
+        if publisher:
+            publisher.close()
+        if scheduler:
+            scheduler.stop()
+        if store:
+            store.close()
+        if recorder:
+            recorder.close()
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Contact management bot.")
+    storage = parser.add_mutually_exclusive_group()
+    storage.add_argument("--book", metavar="FILE", help="load contacts from FILE and autosave changes to it")
+    storage.add_argument("--books", metavar="DIR", help="serve many named books from DIR; switch with 'use <book>'")
+    storage.add_argument("--shards", type=int, metavar="N", help="keep contacts in memory across N worker processes")
+    storage.add_argument("--replica", metavar="NAME", help="serve read-only lookups from a replica published as NAME")
+    parser.add_argument("--max-books", type=int, default=16, help="books kept in memory with --books (default 16)")
+    parser.add_argument("--record", metavar="FILE", help="log every input line with a timestamp to FILE")
+    parser.add_argument("--publish", metavar="NAME", help="publish a shared-memory read replica of the book as NAME")
+    parser.add_argument(
+        "--script", metavar="FILE",
+        help="run the commands in FILE ('-' for stdin), separated by newlines or ';', then exit",
+    )
+    parser.add_argument(
+        "--stop-on-error", action="store_true", help="stop a ';'-separated line or script at the first failing command",
+    )
+    parser.add_argument("--audit", metavar="FILE", help="append the audit log of mutating commands to FILE (rotated)")
+    parser.add_argument(
+        "--audit-policy", choices=AuditLog.POLICIES, default="drop",
+        help="when the audit buffer is full: drop the oldest unwritten entry or block the command (default drop)",
+    )
+    parser.add_argument(
+        "--remind", metavar="NOTIFIER",
+        help="send birthday reminders as they fall due: stdout, file:<path> or socket:<path>",
+    )
+    cli_args = parser.parse_args()
+    if (cli_args.remind or cli_args.publish) and (cli_args.books or cli_args.shards or cli_args.replica):
+        parser.error("--remind and --publish work with a single book, not --books, --shards or --replica")
+    try:
+        notifier = make_notifier(cli_args.remind) if cli_args.remind else None
+    except ValueError as e:
+        parser.error(str(e))
+    main(
+        record_path=cli_args.record,
+        book_path=cli_args.book,
+        books_dir=cli_args.books,
+        max_books=cli_args.max_books,
+        notifier=notifier,
+        shards=cli_args.shards or 0,
+        publish_name=cli_args.publish,
+        replica_name=cli_args.replica,
+        audit_path=cli_args.audit,
+        audit_policy=cli_args.audit_policy,
+        script=cli_args.script,
+        stop_on_error=cli_args.stop_on_error,
+    )
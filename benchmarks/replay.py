@@ -0,0 +1,158 @@
+"""Replay recorded or synthesized sessions against the command registry.
+
+    python agent.py --record session.jsonl          # record real traffic
+    python -m benchmarks.replay session.jsonl       # replay at full speed
+    python -m benchmarks.replay session.jsonl --rate 200 --book-size 100000
+    python -m benchmarks.replay --synthesize 50000  # no recording needed
+
+Every line is split with agent.split_commands and each command goes through
+agent.parse_input and the registry exactly as in the REPL. The report shows
+throughput, per-command latency percentiles and error counts (handler errors
+and unknown commands).
+"""
+
+import argparse
+import datetime
+import json
+import random
+import sys
+import time
+
+from tabulate import tabulate
+
+import handlers  # noqa: F401 — registers all @command handlers
+from agent import EXIT_COMMANDS, parse_input, split_commands
+from benchmarks.synthetic import make_book, synthetic_birthday, synthetic_phone
+from models.commands import Command, registry
+from models.models import AddressBook
+
+
+def load_session(path: str) -> list[str]:
+    """Read input lines from a file written by `agent.py --record`."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(row)["line"] for row in f if row.strip()]
+
+
+def synthesize_session(size: int, seed: int = 0) -> list[str]:
+    """Build an operator-like mix: mostly lookups, some adds and edits."""
+    rng = random.Random(seed)
+    today = datetime.date.today()
+    known = []
+    lines = []
+    for _ in range(size):
+        roll = rng.random()
+        if roll < 0.25 or not known:
+            name, phone = f"user{rng.randrange(size)}", synthetic_phone(rng)
+            known.append((name, phone))
+            lines.append(f"add {name} {phone}")
+        elif roll < 0.65:
+            lines.append(f"phone {rng.choice(known)[0]}")
+        elif roll < 0.75:
+            name, phone = rng.choice(known)
+            lines.append(f"change {name} {phone} {synthetic_phone(rng)}")
+        elif roll < 0.85:
+            lines.append(f"add-birthday {rng.choice(known)[0]} {synthetic_birthday(rng, today)}")
+        elif roll < 0.95:
+            lines.append(f"show-birthday {rng.choice(known)[0]}")
+        else:
+            lines.append("birthdays")
+    return lines
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def replay(lines, book: AddressBook = None, rate: float = 0) -> dict:
+    """Feed `lines` through parse_input and the registry.
+
+    `rate` is lines per second; 0 means as fast as possible. Returns
+    {"lines", "seconds", "throughput", "commands": {cmd: {count, errors, p50, p90, p99, max}}}
+    with latencies in milliseconds.
+    """
+    book = book if book is not None else AddressBook()
+    latencies: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    interval = 1 / rate if rate else 0
+    clock = time.perf_counter
+    started = clock()
+    replayed = 0
+    queue = [part for line in lines for part in split_commands(line)]
+
+    for i, line in enumerate(queue):
+        cmd, args = parse_input(line)
+        if not cmd or cmd in EXIT_COMMANDS:
+            continue
+        if interval:
+            delay = started + i * interval - clock()
+            if delay > 0:
+                time.sleep(delay)
+        replayed += 1
+        t0 = clock()
+        if cmd in registry:
+            command = registry[cmd]
+            try:
+                command.invoke(args, book)
+            except Command.ERRORS as e:
+                command.format_error(e)
+                errors[cmd] = errors.get(cmd, 0) + 1
+        else:
+            errors[cmd] = errors.get(cmd, 0) + 1
+        latencies.setdefault(cmd, []).append((clock() - t0) * 1000)
+
+    seconds = clock() - started
+    commands = {}
+    for cmd, values in latencies.items():
+        values.sort()
+        commands[cmd] = {
+            "count": len(values),
+            "errors": errors.get(cmd, 0),
+            "p50": _percentile(values, 50),
+            "p90": _percentile(values, 90),
+            "p99": _percentile(values, 99),
+            "max": values[-1],
+        }
+    return {
+        "lines": replayed,
+        "seconds": seconds,
+        "throughput": replayed / seconds if seconds else 0.0,
+        "commands": commands,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay bot sessions and report latency.")
+    parser.add_argument("session", nargs="?", help="JSON-lines file written by agent.py --record")
+    parser.add_argument("--synthesize", type=int, metavar="N", help="replay N synthetic lines instead")
+    parser.add_argument("--rate", type=float, default=0, help="lines per second (default: max speed)")
+    parser.add_argument("--book-size", type=int, default=0, help="prefill a synthetic book of this size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    if args.session:
+        lines = load_session(args.session)
+    elif args.synthesize:
+        lines = synthesize_session(args.synthesize, args.seed)
+    else:
+        parser.error("give a session file or --synthesize N")
+
+    book = make_book(args.book_size, args.seed) if args.book_size else AddressBook()
+    report = replay(lines, book, args.rate)
+
+    rows = [
+        (cmd, c["count"], c["errors"], f"{c['p50']:.3f}", f"{c['p90']:.3f}", f"{c['p99']:.3f}", f"{c['max']:.3f}")
+        for cmd, c in sorted(report["commands"].items())
+    ]
+    print(tabulate(rows, headers=["Command", "Count", "Errors", "p50 ms", "p90 ms", "p99 ms", "max ms"], tablefmt="rounded_grid"))
+    print(f"{report['lines']} lines in {report['seconds']:.2f}s — {report['throughput']:.0f} lines/s")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""Benchmark runner.
+
+    python -m benchmarks.run --sizes 1000 10000 100000 --output bench.json
+    python -m benchmarks.run --sizes 1000 --baseline bench.json
+
+Each benchmark is timed with time.perf_counter over a synthetic book of the
+given size. Results are written as JSON; with --baseline the run is compared
+benchmark by benchmark and regressions above --threshold are flagged (exit
+code 1).
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import random
+import sys
+import time
+
+from tabulate import tabulate
+
+import handlers  # noqa: F401 — registers all @command handlers
+from benchmarks.synthetic import make_records
+from models.commands import registry
+from models.models import AddressBook
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+LOOKUPS = 10_000  # point operations per benchmark, independent of book size
+
+
+def _timed(func, ops: int) -> dict:
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    return {"seconds": seconds, "ops": ops, "ns_per_op": seconds * 1e9 / max(ops, 1)}
+
+
+def _spare_phone(record) -> str:
+    """A number the record does not have, so editing to it and back never merges
+    phones and every run leaves the book as it found it."""
+    return next(p for p in (f"{i:010d}" for i in range(len(record.phones) + 1)) if record.find_phone(p) is None)
+
+
+def run_size(size: int, seed: int = 0) -> dict:
+    """Time every benchmark against one synthetic book of `size` contacts."""
+    records = make_records(size, seed)
+    rng = random.Random(seed)
+    book = AddressBook()
+    results = {}
+
+    def add_all():
+        for record in records:
+            book.add_record(record)
+
+    results["AddressBook.add_record"] = _timed(add_all, size)
+
+    names = [rng.choice(records).name.value for _ in range(LOOKUPS)]
+    results["AddressBook.find"] = _timed(lambda: [book.find(n) for n in names], LOOKUPS)
+
+    with_phones = [r for r in records if r.phones] or records
+    sample = [rng.choice(with_phones) for _ in range(LOOKUPS)]
+    targets = [(r, next(iter(r.phones)).value) for r in sample if r.phones]
+    results["Record.find_phone"] = _timed(
+        lambda: [r.find_phone(p) for r, p in targets], len(targets)
+    )
+
+    edits = [(r, p, _spare_phone(r)) for r, p in targets]
+
+    def edit_and_revert():
+        for r, p, spare in edits:
+            r.edit_phone(p, spare)
+            r.edit_phone(spare, p)
+
+    results["Record.edit_phone"] = _timed(edit_and_revert, len(edits))
+    results["AddressBook.get_upcoming_birthdays"] = _timed(book.get_upcoming_birthdays, size)
+
+    results["handler:all"] = _timed(lambda: registry["all"]([], book), size)
+    phone_args = [[n] for n in names[:1_000]]
+    results["handler:phone"] = _timed(
+        lambda: [registry["phone"](a, book) for a in phone_args], len(phone_args)
+    )
+    results["handler:birthdays"] = _timed(lambda: registry["birthdays"]([], book), size)
+    return results
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[tuple]:
+    """Return rows (size, benchmark, baseline ns, current ns, ratio, flag)."""
+    rows = []
+    for size, benches in current["results"].items():
+        for name, result in benches.items():
+            base = baseline.get("results", {}).get(size, {}).get(name)
+            if base is None:
+                continue
+            ratio = result["ns_per_op"] / base["ns_per_op"] if base["ns_per_op"] else float("inf")
+            flag = "REGRESSION" if ratio > 1 + threshold else ""
+            rows.append((size, name, round(base["ns_per_op"]), round(result["ns_per_op"]), f"{ratio:.2f}", flag))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark models and handlers on synthetic books.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against a previous JSON result")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown ratio (default 0.10)")
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "seed": args.seed,
+        },
+        "results": {},
+    }
+    for size in args.sizes:
+        report["results"][str(size)] = run_size(size, args.seed)
+        rows = [(name, round(r["ns_per_op"]), f"{r['seconds']:.4f}") for name, r in report["results"][str(size)].items()]
+        print(f"size={size}")
+        print(tabulate(rows, headers=["Benchmark", "ns/op", "Total s"], tablefmt="rounded_grid"))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.threshold)
+        print(tabulate(rows, headers=["Size", "Benchmark", "Base ns/op", "ns/op", "Ratio", ""], tablefmt="rounded_grid"))
+        if any(row[-1] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""Synthetic AddressBook generator for benchmarks.
+
+Books are reproducible for a given seed. Distributions are loosely modelled
+on a real contact list: most contacts have one phone, some have several or
+none; phones use Ukrainian mobile operator prefixes; about two thirds of
+contacts have a birthday, spread evenly over the year with adult ages.
+"""
+
+import datetime
+import random
+
+from models.models import AddressBook, Record
+
+FIRST_NAMES = (
+    "Olena", "Andrii", "Iryna", "Dmytro", "Natalia", "Oleksandr", "Kateryna",
+    "Serhii", "Yulia", "Mykola", "Alice", "Bob", "Maria", "John", "Anna",
+)
+OPERATOR_PREFIXES = ("050", "063", "066", "067", "068", "073", "093", "095", "096", "097", "098", "099")
+PHONES_PER_CONTACT = ((0, 0.03), (1, 0.70), (2, 0.20), (3, 0.07))
+BIRTHDAY_SHARE = 0.65
+
+
+def synthetic_phone(rng: random.Random) -> str:
+    return rng.choice(OPERATOR_PREFIXES) + f"{rng.randrange(10**7):07d}"
+
+
+def synthetic_birthday(rng: random.Random, today: datetime.date) -> str:
+    age = min(95, max(1, int(rng.gauss(38, 14))))
+    day = datetime.date(today.year - age, 1, 1) + datetime.timedelta(days=rng.randrange(365))
+    if day > today:
+        day = day.replace(year=day.year - 1)
+    return day.strftime("%d.%m.%Y")
+
+
+def make_records(size: int, seed: int = 0) -> list[Record]:
+    """Return `size` unique records; the same seed always gives the same data."""
+    rng = random.Random(seed)
+    today = datetime.date.today()
+    counts, weights = zip(*PHONES_PER_CONTACT)
+    records = []
+    for i in range(size):
+        record = Record(f"{rng.choice(FIRST_NAMES)}{i}")
+        for _ in range(rng.choices(counts, weights)[0]):
+            phone = synthetic_phone(rng)
+            if record.find_phone(phone) is None:
+                record.add_phone(phone)
+        if rng.random() < BIRTHDAY_SHARE:
+            record.add_birthday(synthetic_birthday(rng, today))
+        records.append(record)
+    return records
+
+
+def make_book(size: int, seed: int = 0) -> AddressBook:
+    book = AddressBook()
+    for record in make_records(size, seed):
+        book.add_record(record)
+    return book
@@ -9,3 +9,14 @@ ERR_NAME_AND_PHONE = "Give me name and phone please."
 ERR_NAME_AND_PHONES = "Give me name, old phone and new phone please."
 ERR_NAME_AND_BIRTHDAY = "Give me name and birthday please."
 ERR_NAME_ONLY = "Give me a name please."
+ERR_FILE_ONLY = "Give me a file name please."
+ERR_BOOK_ONLY = "Give me a book name please."
+ERR_PREFIX_ONLY = "Give me a phone prefix please."
+ERR_NAME_RANGE = "Give me the first and the last name of the range please."
+ERR_NAME_AND_TAG = "Give me name and tag please."
+ERR_TAG_EXPRESSION = "Give me a tag expression please."
+ERR_VERSION = "Give me a version number after --if-version please."
+ERR_AUDIT_USAGE = "Use 'audit tail [N]' please."
+ERR_BIRTHDAYS_OPTIONS = "Use 'birthdays [--days N] [--limit K]' with positive numbers please."
+ERR_PREDICATE = "Give me at least one condition please, e.g. name:al phone:067 birthday:3 tag:vip no-phone."
+ERR_UPDATE_ACTION = "Give me conditions, then 'set' and an action (tag:<tag>, untag:<tag> or birthday:<DD.MM.YYYY>) please."
@@ -1 +1 @@
-from handlers import contacts, birthdays, general  # noqa: F401 — trigger @command registration
+from handlers import contacts, birthdays, general, stats, storage, books, tags, audit, query  # noqa: F401 — trigger @command registration
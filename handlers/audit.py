@@ -0,0 +1,38 @@
+import datetime
+
+from colorama import Style
+from tabulate import tabulate
+from models.commands import Command, command
+from config import IDENT, BOT_COLOR, BOT_ERROR_COLOR, ERR_AUDIT_USAGE
+from models.audit import plain
+from models.errors import UsageError
+
+AUDIT_TAIL_DEFAULT = 10
+RESULT_WIDTH = 60  # longer results are cut in the table
+
+
+@command("audit", usage="audit tail [N] - show the last N (default 10) mutating commands.")
+def audit_cmd(args, book):
+    if not args or args[0].lower() != "tail" or (len(args) > 1 and not args[1].isdigit()):
+        raise UsageError(ERR_AUDIT_USAGE)
+    log = Command.audit
+    if log is None:
+        return f"{IDENT}{BOT_ERROR_COLOR}Audit log is off.{Style.RESET_ALL}"
+    entries = log.tail(int(args[1]) if len(args) > 1 else AUDIT_TAIL_DEFAULT)
+    if not entries:
+        return f"{IDENT}{BOT_COLOR}No commands audited yet.{Style.RESET_ALL}"
+    rows = []
+    for e in entries:
+        lines = plain(e.result).splitlines() or [""]
+        summary = lines[-1] if e.ok else lines[0]  # tables end in a summary; errors start with the message
+        rows.append((
+            datetime.datetime.fromtimestamp(e.ts).strftime("%Y-%m-%d %H:%M:%S"),
+            e.user,
+            " ".join((e.command, *e.args)),
+            "ok" if e.ok else "error",
+            summary[:RESULT_WIDTH],
+            f"{e.elapsed * 1000:.1f}",
+        ))
+    table = tabulate(rows, headers=["Time", "User", "Command", "Status", "Result", "ms"], tablefmt="rounded_grid")
+    dropped = f"\n{IDENT}{log.dropped} entries dropped." if log.dropped else ""
+    return f"{BOT_COLOR}{table}{dropped}{Style.RESET_ALL}"
@@ -3,20 +3,28 @@ from tabulate import tabulate
 from models.commands import command
 from config import (
     IDENT, BOT_COLOR, BOT_ERROR_COLOR,
-    ERR_NAME_AND_BIRTHDAY, ERR_NAME_ONLY,
+    ERR_BIRTHDAYS_OPTIONS, ERR_NAME_AND_BIRTHDAY, ERR_NAME_ONLY,
 )
-from handlers.utils import get_record_or_raise, require_args
+from handlers.utils import display_name, get_record_or_raise, pop_expected_version, require_args
+from models.errors import UsageError
+from models.models import AddressBook
 
 
-@command("add-birthday", usage="add-birthday <name> <DD.MM.YYYY> – add a birthday to a contact.")
+@command(
+    "add-birthday",
+    usage="add-birthday <name> <DD.MM.YYYY> [--if-version N] – add a birthday to a contact, "
+          "optionally only if it is still at version N.",
+    mutates=True,
+)
 def add_birthday(args, book):
+    args, expected = pop_expected_version(args)
     require_args(args, 2, ERR_NAME_AND_BIRTHDAY)
-    name, birthday_str = args
+    name, birthday_str = args[:2]
     username, record = get_record_or_raise(
         book, name,
-        not_found_msg=f"Contact '{name.capitalize()}' not found. Add the contact first.",
+        not_found_msg=f"Contact '{display_name(name)}' not found. Add the contact first.",
     )
-    record.add_birthday(birthday_str)
+    record.add_birthday(birthday_str, expected)
     return f"{IDENT}{BOT_COLOR}Birthday added.{Style.RESET_ALL}"
 
 
@@ -26,14 +34,32 @@ def show_birthday(args, book):
     username, record = get_record_or_raise(book, args[0])
     if record.birthday is None:
         return f"{IDENT}{BOT_COLOR}{username} has no birthday set.{Style.RESET_ALL}"
-    return f"{IDENT}{BOT_COLOR}{username}'s birthday is {record.birthday}.{Style.RESET_ALL}"
+    return f"{IDENT}{BOT_COLOR}{username}'s birthday is {record.birthday} (version {record.version}).{Style.RESET_ALL}"
+
 
+def _birthdays_options(args) -> tuple[int, int | None]:
+    """Parse `[--days N] [--limit K]` into (days, limit or None)."""
+    options = {"--days": AddressBook.UPCOMING_DAYS, "--limit": None}
+    for i in range(0, len(args), 2):
+        flag = args[i].lower()
+        value = args[i + 1] if i + 1 < len(args) else ""
+        if flag not in options or not value.isdigit() or int(value) < 1:
+            raise UsageError(ERR_BIRTHDAYS_OPTIONS)
+        options[flag] = int(value)
+    return options["--days"], options["--limit"]
 
-@command("birthdays", usage="birthdays – show contacts with birthdays in the next week.")
+
+@command(
+    "birthdays",
+    usage="birthdays [--days N] [--limit K] – show the K soonest birthdays in the next N days "
+          "(default: all in the next week).",
+)
 def birthdays_cmd(args, book):
-    upcoming = book.get_upcoming_birthdays()
+    days, limit = _birthdays_options(args)
+    upcoming = book.get_upcoming_birthdays(days, limit)
     if not upcoming:
-        return f"{IDENT}{BOT_ERROR_COLOR}No birthdays in the next week.{Style.RESET_ALL}"
+        window = "the next week" if days == AddressBook.UPCOMING_DAYS else f"the next {days} day(s)"
+        return f"{IDENT}{BOT_ERROR_COLOR}No birthdays in {window}.{Style.RESET_ALL}"
     data = [(u["name"], u["birthday"], u["congratulation_date"]) for u in upcoming]
     return BOT_COLOR + tabulate(
         data,
@@ -0,0 +1,33 @@
+from colorama import Style
+from tabulate import tabulate
+from models.commands import command
+from config import IDENT, BOT_COLOR, BOT_ERROR_COLOR, ERR_BOOK_ONLY
+from handlers.utils import require_args
+
+
+def _session_or_raise(book):
+    if not hasattr(book, "use"):
+        raise ValueError("Multiple books are not enabled. Start the bot with --books <dir>.")
+    return book
+
+
+@command("use", usage="use <book> - switch to another address book (created if missing).", mutates=True)
+def use_book(args, book):
+    require_args(args, 1, ERR_BOOK_ONLY)
+    session = _session_or_raise(book)
+    session.use(args[0])
+    return f"{IDENT}{BOT_COLOR}Using book '{args[0]}' ({len(session.data)} contact(s)).{Style.RESET_ALL}"
+
+
+@command("books", usage="books - list address books; * marks the current one.")
+def list_books(args, book):
+    session = _session_or_raise(book)
+    names = session.manager.names()
+    if not names:
+        return f"{IDENT}{BOT_ERROR_COLOR}No books yet.{Style.RESET_ALL}"
+    loaded = set(session.manager.loaded)
+    rows = [
+        (("* " if name == session.current else "  ") + name, "loaded" if name in loaded else "on disk")
+        for name in names
+    ]
+    return BOT_COLOR + tabulate(rows, headers=["Book", "State"], tablefmt="rounded_grid") + Style.RESET_ALL
@@ -3,20 +3,22 @@ from tabulate import tabulate
 from models.commands import command
 from config import (
     IDENT, BOT_COLOR, BOT_ERROR_COLOR,
-    ERR_NAME_AND_PHONE, ERR_NAME_AND_PHONES, ERR_NAME_ONLY,
+    ERR_NAME_AND_PHONE, ERR_NAME_AND_PHONES, ERR_NAME_ONLY, ERR_NAME_RANGE, ERR_PREFIX_ONLY,
 )
-from handlers.utils import get_record_or_raise, require_args
+from handlers.utils import display_name, get_record_or_raise, pop_expected_version, require_args
 from models.models import Record
+from models.dedupe import find_duplicates, merge_records
+from models.indexes import NameOrder, PhoneIndex
+from models.sharding import ShardedBook
 
 
-@command("add", usage="add <name> <phone> - add a contact with phone or add phone to the contact.")
+@command("add", usage="add <name> <phone> - add a contact with phone or add phone to the contact.", mutates=True)
 def add_contact(args, book):
     require_args(args, 2, ERR_NAME_AND_PHONE)
     name, phone = args
-    username = name.capitalize()
-    record = book.find(username)
+    record = book.find(name)
     if record is None:
-        record = Record(username)
+        record = Record(display_name(name))
         record.add_phone(phone)
         book.add_record(record)
         return f"{IDENT}{BOT_COLOR}Contact added.{Style.RESET_ALL}"
@@ -24,42 +26,107 @@ def add_contact(args, book):
     return f"{IDENT}{BOT_COLOR}Phone added to existing contact.{Style.RESET_ALL}"
 
 
-@command("change", usage="change <name> <old phone> <new phone> - change a contact's phone.")
+@command(
+    "change",
+    usage="change <name> <old phone> <new phone> [--if-version N] - change a contact's phone, "
+          "optionally only if it is still at version N.",
+    mutates=True,
+)
 def update_contact(args, book):
+    args, expected = pop_expected_version(args)
     require_args(args, 3, ERR_NAME_AND_PHONES)
-    name, old_phone, new_phone = args
+    name, old_phone, new_phone = args[:3]
     username, record = get_record_or_raise(book, name)
-    merged = record.edit_phone(old_phone, new_phone)
+    merged = record.edit_phone(old_phone, new_phone, expected)
     if merged:
         return f"{IDENT}{BOT_COLOR}{new_phone} already exists — {old_phone} removed.{Style.RESET_ALL}"
     return f"{IDENT}{BOT_COLOR}Contact updated.{Style.RESET_ALL}"
 
 
-@command("phone", usage="phone <name> - get the phone of a contact.")
+@command("phone", usage="phone <name> - get the phone and version of a contact.")
 def get_users_phone(args, book):
     require_args(args, 1, ERR_NAME_ONLY)
     username, record = get_record_or_raise(book, args[0])
     return BOT_COLOR + tabulate(
-        [(username, "\n".join(p.value for p in record.phones))],
-        headers=["Name", "Phone(s)"],
+        [(username, "\n".join(p.value for p in record.phones), record.version)],
+        headers=["Name", "Phone(s)", "Version"],
         tablefmt="rounded_grid",
     ) + Style.RESET_ALL
 
 
-@command("all", usage="all - list all contacts.")
-def all_contacts(args, book):
-    if not book.data:
-        return f"{IDENT}{BOT_ERROR_COLOR}No contacts yet.{Style.RESET_ALL}"
+def _contacts_table(records) -> str:
     data = [
         (
             r.name.value,
             "\n".join(p.value for p in r.phones) or "—",
             str(r.birthday) if r.birthday else "—",
         )
-        for r in book.data.values()
+        for r in records
     ]
     return BOT_COLOR + tabulate(
         data,
         headers=["Name", "Phone(s)", "Birthday"],
         tablefmt="rounded_grid",
     ) + Style.RESET_ALL
+
+
+def _records_in_order(book, start=None, stop=None):
+    """Records by name; a sharded book has no indexes and merges its shards' order."""
+    if isinstance(book, ShardedBook):
+        return book.records_in_order(start, stop)
+    return NameOrder.for_book(book).records(start, stop)
+
+
+@command("all", usage="all [--sorted] - list all contacts, optionally in alphabetical order.")
+def all_contacts(args, book):
+    data = book.data  # a ShardedBook gathers every shard on each access
+    if not data:
+        return f"{IDENT}{BOT_ERROR_COLOR}No contacts yet.{Style.RESET_ALL}"
+    if "--sorted" in args:
+        return _contacts_table(_records_in_order(book))
+    return _contacts_table(data.values())
+
+
+@command("list", usage="list <from-name> <to-name> - list contacts alphabetically from one name up to another.")
+def list_range(args, book):
+    require_args(args, 2, ERR_NAME_RANGE)
+    start, stop = args[:2]
+    records = list(_records_in_order(book, start, stop))
+    if not records:
+        return f"{IDENT}{BOT_ERROR_COLOR}No contacts between {start} and {stop}.{Style.RESET_ALL}"
+    return _contacts_table(records)
+
+
+@command(
+    "dedupe", usage="dedupe [--dry-run] - merge contacts sharing a phone or a near-identical name.", mutates=True,
+)
+def dedupe_contacts(args, book):
+    dry_run = "--dry-run" in args
+    groups = find_duplicates(book)
+    if not groups:
+        return f"{IDENT}{BOT_COLOR}No duplicates found.{Style.RESET_ALL}"
+    if not dry_run:
+        for group in groups:
+            merge_records(book, group)
+    merged = sum(len(group) - 1 for group in groups)
+    verb = "Would merge" if dry_run else "Merged"
+    table = tabulate(
+        [(group[0], "\n".join(group[1:])) for group in groups],
+        headers=["Keep", "Merge"],
+        tablefmt="rounded_grid",
+    )
+    return f"{BOT_COLOR}{table}\n{IDENT}{verb} {merged} contact(s).{Style.RESET_ALL}"
+
+
+@command("phones-prefix", usage="phones-prefix <digits> - list contacts whose phone starts with the digits.")
+def phones_by_prefix(args, book):
+    require_args(args, 1, ERR_PREFIX_ONLY)
+    matches = PhoneIndex.for_book(book).with_prefix(args[0])
+    if not matches:
+        return f"{IDENT}{BOT_ERROR_COLOR}No phones start with {args[0]}.{Style.RESET_ALL}"
+    table = tabulate(
+        [(phone, record.name.value) for phone, record in matches],
+        headers=["Phone", "Name"],
+        tablefmt="rounded_grid",
+    )
+    return f"{BOT_COLOR}{table}\n{IDENT}{len(matches)} phone(s).{Style.RESET_ALL}"
@@ -0,0 +1,97 @@
+from colorama import Style
+from tabulate import tabulate
+from models.commands import command
+from config import IDENT, BOT_COLOR, BOT_ERROR_COLOR, ERR_PREDICATE, ERR_UPDATE_ACTION
+from handlers.contacts import _contacts_table
+from handlers.utils import require_args
+from models.errors import UsageError
+from models.models import Birthday, Tag
+from models.query import parse_predicate, plan
+
+SELECT_LIMIT = 50  # rows shown by select-where; the count covers every match
+QUERY_COMMANDS = ("select-where", "delete-where", "update-where")
+CONDITIONS_HELP = "conditions: name:<prefix> phone:<digits> tag:<tag> birthday:<month|from..to> no-phone"
+
+
+def _plan(terms, book):
+    require_args(terms, 1, ERR_PREDICATE)
+    return plan(book, parse_predicate(terms))
+
+
+def _split_update(args):
+    """Split `<conditions> set <actions>` into the two term lists."""
+    lowered = [a.lower() for a in args]
+    if "set" not in lowered:
+        raise UsageError(ERR_UPDATE_ACTION)
+    at = lowered.index("set")
+    if at + 1 == len(args):
+        raise UsageError(ERR_UPDATE_ACTION)
+    return args[:at], args[at + 1:]
+
+
+def _parse_actions(terms) -> list[tuple[str, str]]:
+    actions = []
+    for term in terms:
+        kind, _, value = term.partition(":")
+        kind = kind.lower()
+        if kind in ("tag", "untag") and value:
+            actions.append((kind, Tag(value).value))
+        elif kind == "birthday" and value:
+            Birthday(value)  # validate before touching any record
+            actions.append((kind, value))
+        else:
+            raise ValueError(f"Unknown action '{term}'. Use tag:<tag>, untag:<tag> or birthday:<DD.MM.YYYY>.")
+    return actions
+
+
+@command("select-where", usage=f"select-where <conditions> - list contacts matching all {CONDITIONS_HELP}.")
+def select_where(args, book):
+    records = _plan(args, book).records()
+    if not records:
+        return f"{IDENT}{BOT_ERROR_COLOR}No contacts match.{Style.RESET_ALL}"
+    shown = f" (first {SELECT_LIMIT} shown)" if len(records) > SELECT_LIMIT else ""
+    table = _contacts_table(records[:SELECT_LIMIT])
+    return f"{table}\n{IDENT}{BOT_COLOR}{len(records)} contact(s){shown}.{Style.RESET_ALL}"
+
+
+@command("delete-where", usage="delete-where <conditions> - delete every matching contact in one batch.", mutates=True)
+def delete_where(args, book):
+    records = _plan(args, book).records()
+    with book.bulk():
+        for record in records:
+            book.delete(record.name.value)
+    return f"{IDENT}{BOT_COLOR}Deleted {len(records)} contact(s).{Style.RESET_ALL}"
+
+
+@command(
+    "update-where",
+    usage="update-where <conditions> set <tag:<tag>|untag:<tag>|birthday:<DD.MM.YYYY>>... "
+          "- change every matching contact in one batch.",
+    mutates=True,
+)
+def update_where(args, book):
+    terms, action_terms = _split_update(args)
+    actions = _parse_actions(action_terms)
+    records = _plan(terms, book).records()
+    with book.bulk():
+        for record in records:
+            for kind, value in actions:
+                if kind == "tag" and value not in record.tags:
+                    record.add_tag(value)
+                elif kind == "untag" and value in record.tags:
+                    record.remove_tag(value)
+                elif kind == "birthday":
+                    record.add_birthday(value)
+    return f"{IDENT}{BOT_COLOR}Updated {len(records)} contact(s).{Style.RESET_ALL}"
+
+
+@command("explain", usage="explain [select-where|delete-where|update-where] <conditions> - show the query plan.")
+def explain_cmd(args, book):
+    if args and args[0].lower() in QUERY_COMMANDS:
+        command_name, args = args[0].lower(), args[1:]
+        if command_name == "update-where":
+            args = _split_update(args)[0]
+    query = _plan(args, book)
+    table = tabulate(query.explain(), headers=["Access path", "Reads", "Est. rows", ""], tablefmt="rounded_grid")
+    checks = ", ".join(str(c) for c in query.filters) or "nothing"
+    return f"{BOT_COLOR}{table}\n{IDENT}Then checks: {checks}.{Style.RESET_ALL}"
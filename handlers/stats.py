@@ -0,0 +1,55 @@
+import calendar
+import tracemalloc
+
+from colorama import Style
+from tabulate import tabulate
+from models.commands import command
+from config import IDENT, BOT_COLOR
+from models.indexes import BookStats
+from models.memstats import memory_stats
+
+MEMSTATS_SAMPLE_SIZE = 10_000  # measure at most ~this many records per report
+
+
+@command("memstats", usage="memstats [on|off] - show memory used by the book; on/off toggles tracemalloc.")
+def memstats_cmd(args, book):
+    if args and args[0].lower() == "on":
+        tracemalloc.start()
+        return f"{IDENT}{BOT_COLOR}Allocation tracing started.{Style.RESET_ALL}"
+    if args and args[0].lower() == "off":
+        tracemalloc.stop()
+        return f"{IDENT}{BOT_COLOR}Allocation tracing stopped.{Style.RESET_ALL}"
+
+    stats = memory_stats(book, sample=len(book.data) // MEMSTATS_SAMPLE_SIZE)
+    rows = [(name, c["count"], c["bytes"]) for name, c in stats["classes"].items()]
+    rows.append(("Total", "", stats["total_bytes"]))
+    output = tabulate(rows, headers=["Structure", "Objects", "Bytes"], tablefmt="rounded_grid")
+    output += f"\n{IDENT}Contacts: {stats['contacts']}, {stats['bytes_per_contact']:.0f} bytes per contact."
+    if stats["top_allocations"]:
+        sites = [(a["site"], a["count"], a["bytes"]) for a in stats["top_allocations"]]
+        output += "\n" + tabulate(sites, headers=["Allocation site", "Blocks", "Bytes"], tablefmt="rounded_grid")
+    return BOT_COLOR + output + Style.RESET_ALL
+
+
+def _table(title: str, rows) -> str:
+    return tabulate(rows, headers=[title, "Contacts"], tablefmt="rounded_grid")
+
+
+@command("book-stats", usage="book-stats - contact, phone, birthday and age statistics.")
+def book_stats_cmd(args, book):
+    stats = BookStats.for_book(book)
+    phones = sorted((n, c) for n, c in stats.phones_per_contact.items() if c)
+    months = [(calendar.month_name[m], stats.birth_months[m]) for m in range(1, 13)]
+    weekdays = stats.anniversary_weekdays()
+    weekday_rows = [(calendar.day_name[d], weekdays[d]) for d in range(7)]
+    ages = sorted(stats.age_histogram().items())
+    age_rows = [(f"{low}–{low + BookStats.AGE_BUCKET - 1}", count) for low, count in ages]
+    sections = [
+        f"{IDENT}Contacts: {stats.contacts}",
+        _table("Phones per contact", phones),
+        _table("Birth month", months),
+        _table("Next birthday weekday", weekday_rows),
+    ]
+    if age_rows:
+        sections.append(_table("Age", age_rows))
+    return BOT_COLOR + "\n".join(sections) + Style.RESET_ALL
@@ -0,0 +1,86 @@
+import os
+
+from colorama import Style
+from tabulate import tabulate
+from models.commands import command
+from config import IDENT, BOT_COLOR, ERR_FILE_ONLY
+from handlers.utils import require_args
+from models.merkle import MerkleTree, diff, sync
+from models.storage import (
+    append_journal, is_snapshot, iter_snapshot, load_book, load_snapshot, record_from_dict, save_snapshot,
+)
+
+DIFF_SAMPLE_SIZE = 5  # names shown per row of the diff table
+
+
+@command("backup", usage="backup <file> [zlib|lzma] - save a compressed snapshot of all contacts.")
+def backup_cmd(args, book):
+    require_args(args, 1, ERR_FILE_ONLY)
+    path, codec = args[0], (args[1].lower() if len(args) > 1 else "zlib")
+    try:
+        save_snapshot(book, path, codec=codec)
+    except OSError as e:
+        raise ValueError(f"Cannot write snapshot '{path}': {e.strerror}.")
+    return f"{IDENT}{BOT_COLOR}Saved {len(book.data)} contact(s) to {path}.{Style.RESET_ALL}"
+
+
+@command("restore", usage="restore <file> - add or replace contacts from a snapshot.", mutates=True)
+def restore_cmd(args, book):
+    require_args(args, 1, ERR_FILE_ONLY)
+    try:
+        records = iter_snapshot(args[0])
+        count = 0
+        with book.bulk():
+            for data in records:
+                book.add_record(record_from_dict(data))
+                count += 1
+    except OSError as e:
+        raise ValueError(f"Cannot read snapshot '{args[0]}': {e.strerror}.")
+    return f"{IDENT}{BOT_COLOR}Restored {count} contact(s).{Style.RESET_ALL}"
+
+
+def _names(names) -> str:
+    shown = ", ".join(sorted(names)[:DIFF_SAMPLE_SIZE])
+    return shown + (", ..." if len(names) > DIFF_SAMPLE_SIZE else "")
+
+
+@command("diff", usage="diff <file> - compare contacts with a journal or snapshot file by Merkle hashes.")
+def diff_cmd(args, book):
+    require_args(args, 1, ERR_FILE_ONLY)
+    path = args[0]
+    try:
+        other = load_snapshot(path) if is_snapshot(path) else load_book(path)
+    except OSError as e:
+        raise ValueError(f"Cannot read '{path}': {e.strerror}.")
+    changes = diff(MerkleTree.for_book(book), MerkleTree.for_book(other))
+    if not changes:
+        return f"{IDENT}{BOT_COLOR}Contacts and {path} are identical.{Style.RESET_ALL}"
+    rows = [
+        ("Only here", len(changes.added), _names(changes.added)),
+        ("Different", len(changes.changed), _names(changes.changed)),
+        (f"Only in {path}", len(changes.removed), _names(changes.removed)),
+    ]
+    table = tabulate(rows, headers=["", "Contacts", "Names"], tablefmt="rounded_grid")
+    return f"{BOT_COLOR}{table}\n{IDENT}Compared {changes.hashes} hash(es).{Style.RESET_ALL}"
+
+
+@command(
+    "sync",
+    usage="sync <file> - bring a journal file up to date, writing only the contacts that differ.",
+    mutates=True,
+)
+def sync_cmd(args, book):
+    require_args(args, 1, ERR_FILE_ONLY)
+    path = args[0]
+    try:
+        if os.path.exists(path) and is_snapshot(path):
+            raise ValueError(f"'{path}' is a snapshot; sync updates journal files, use backup for snapshots.")
+        standby = load_book(path)
+        changes = sync(MerkleTree.for_book(book), standby)
+        written = append_journal(standby, path, changes.removed + changes.added + changes.changed)
+    except OSError as e:
+        raise ValueError(f"Cannot sync '{path}': {e.strerror}.")
+    return (
+        f"{IDENT}{BOT_COLOR}Synced {path}: {len(changes.added)} added, {len(changes.changed)} changed, "
+        f"{len(changes.removed)} removed ({written} journal line(s)).{Style.RESET_ALL}"
+    )
@@ -0,0 +1,36 @@
+from colorama import Style
+from tabulate import tabulate
+from models.commands import command
+from config import IDENT, BOT_COLOR, BOT_ERROR_COLOR, ERR_NAME_AND_TAG, ERR_TAG_EXPRESSION
+from handlers.utils import get_record_or_raise, require_args
+from models.indexes import TagIndex
+
+
+@command("tag", usage="tag <name> <tag> - add a tag to a contact.", mutates=True)
+def tag_contact(args, book):
+    require_args(args, 2, ERR_NAME_AND_TAG)
+    username, record = get_record_or_raise(book, args[0])
+    record.add_tag(args[1])
+    return f"{IDENT}{BOT_COLOR}Tag added.{Style.RESET_ALL}"
+
+
+@command("untag", usage="untag <name> <tag> - remove a tag from a contact.", mutates=True)
+def untag_contact(args, book):
+    require_args(args, 2, ERR_NAME_AND_TAG)
+    username, record = get_record_or_raise(book, args[0])
+    record.remove_tag(args[1])
+    return f"{IDENT}{BOT_COLOR}Tag removed.{Style.RESET_ALL}"
+
+
+@command("tagged", usage="tagged <expr> - contacts matching tags with AND/OR/NOT, e.g. 'vip AND NOT blocked'.")
+def tagged_contacts(args, book):
+    require_args(args, 1, ERR_TAG_EXPRESSION)
+    records = TagIndex.for_book(book).query(" ".join(args))
+    if not records:
+        return f"{IDENT}{BOT_ERROR_COLOR}No contacts match.{Style.RESET_ALL}"
+    table = tabulate(
+        [(r.name.value, ", ".join(sorted(r.tags))) for r in records],
+        headers=["Name", "Tags"],
+        tablefmt="rounded_grid",
+    )
+    return f"{BOT_COLOR}{table}\n{IDENT}{len(records)} contact(s).{Style.RESET_ALL}"
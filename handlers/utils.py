@@ -1,6 +1,6 @@
 from colorama import Style
 
-from config import BOT_ERROR_COLOR, IDENT
+from config import BOT_ERROR_COLOR, ERR_VERSION, IDENT
 from models.errors import UsageError
 
 
@@ -10,9 +10,24 @@ def require_args(args, count: int, message: str):
         raise UsageError(message)
 
 
+def pop_expected_version(args):
+    """Split `--if-version N` off the arguments. Returns (remaining args, N or None)."""
+    if "--if-version" not in args:
+        return list(args), None
+    at = args.index("--if-version")
+    value = args[at + 1] if at + 1 < len(args) else ""
+    if not value.isdigit():
+        raise UsageError(ERR_VERSION)
+    return list(args[:at]) + list(args[at + 2:]), int(value)
+
+
+def display_name(name: str) -> str:
+    """Capitalize the first letter only, so 'mcDonald' → 'McDonald', not 'Mcdonald'."""
+    return name[:1].upper() + name[1:]
+
+
 def get_record_or_raise(book, name: str, not_found_msg: str = None):
-    username = name.capitalize()
-    record = book.find(username)
+    record = book.find(name)
     if record is None:
-        raise KeyError(not_found_msg or f"Contact '{username}' doesn't exist.")
-    return username, record
+        raise KeyError(not_found_msg or f"Contact '{display_name(name)}' doesn't exist.")
+    return record.name.value, record
@@ -0,0 +1,149 @@
+"""Audit trail of mutating commands.
+
+`AuditLog.record` only stores a small tuple in a fixed-size ring buffer
+under a lock, so the command path never touches the disk. When the log has
+a `path`, a daemon thread drains the buffer every `interval` seconds (or
+once it is half full) and appends the batch as JSON lines, rotating the
+file to `path.1`, `path.2`, ... once it reaches `max_bytes`.
+
+If writers outrun the flusher and the buffer fills up, the `policy`
+decides: "drop" overwrites the oldest unwritten entry and counts it in
+`dropped`; "block" makes the writer wait until the flusher frees a slot.
+The most recent entries stay in the buffer either way, for `tail`.
+"""
+
+from collections import namedtuple
+import getpass
+import json
+import os
+import re
+import threading
+import time
+
+AuditEntry = namedtuple("AuditEntry", "ts elapsed user command args ok result")
+
+_ANSI = re.compile(r"\x1b\[[0-9;]*m")
+
+
+def plain(text: str) -> str:
+    """Strip terminal colour codes from a command result."""
+    return _ANSI.sub("", text or "").strip()
+
+
+class AuditLog:
+    POLICIES = ("drop", "block")
+
+    def __init__(
+        self,
+        path: str = None,
+        capacity: int = 1024,
+        policy: str = "drop",
+        interval: float = 1.0,
+        max_bytes: int = 1_000_000,
+        backups: int = 3,
+        user: str = None,
+    ):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown audit policy '{policy}'. Expected one of: {', '.join(self.POLICIES)}.")
+        if capacity < 1:
+            raise ValueError("Audit buffer capacity must be positive.")
+        self.path = path
+        self.capacity = capacity
+        self.policy = policy
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.user = user or getpass.getuser()
+        self.dropped = 0
+        self._buffer = [None] * capacity
+        self._written = 0  # entries ever recorded; the next one goes to _written % capacity
+        self._taken = 0  # entries before this sequence number were handed to the flusher (or dropped)
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._stopped = False
+        self._thread = None
+        if path is not None:
+            self._thread = threading.Thread(target=self._run, name="audit", daemon=True)
+            self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        """Entries recorded but not yet handed to the flusher."""
+        return self._written - self._taken
+
+    def record(self, command: str, args, ok: bool, result: str, started: float):
+        entry = AuditEntry(started, time.time() - started, self.user, command, tuple(args), ok, result)
+        with self._cond:
+            if self.path is not None and self._written - self._taken >= self.capacity:
+                if self.policy == "block":
+                    self._cond.notify_all()
+                    while self._written - self._taken >= self.capacity and not self._stopped:
+                        self._cond.wait()
+                if self._written - self._taken >= self.capacity:
+                    self._taken += 1
+                    self.dropped += 1
+            self._buffer[self._written % self.capacity] = entry
+            self._written += 1
+            if self.path is not None and 2 * (self._written - self._taken) >= self.capacity:
+                self._cond.notify_all()
+
+    def tail(self, n: int = 10) -> list:
+        """The last `n` recorded entries, oldest first."""
+        with self._cond:
+            n = max(0, min(n, self._written, self.capacity))
+            return [self._buffer[i % self.capacity] for i in range(self._written - n, self._written)]
+
+    def _run(self):
+        while True:
+            with self._cond:
+                # a wake-up sent before we got here is not lost: the fill level is checked first
+                if not self._stopped and 2 * (self._written - self._taken) < self.capacity:
+                    self._cond.wait(self.interval)
+                stopped = self._stopped
+            self.flush()
+            if stopped:
+                return
+
+    def flush(self):
+        """Append every entry not yet written to the file, rotating it if needed."""
+        if self.path is None:
+            return
+        with self._write_lock:
+            with self._cond:
+                start, end = self._taken, self._written
+                batch = [self._buffer[i % self.capacity] for i in range(start, end)]
+                self._taken = end
+                self._cond.notify_all()
+            if not batch:
+                return
+            data = "".join(
+                json.dumps({
+                    "ts": e.ts, "ms": round(e.elapsed * 1000, 3), "user": e.user,
+                    "command": e.command, "args": list(e.args), "ok": e.ok, "result": plain(e.result),
+                }) + "\n"
+                for e in batch
+            ).encode("utf-8")
+            size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+            if size and size + len(data) > self.max_bytes:
+                self._rotate()
+            with open(self.path, "ab") as f:
+                f.write(data)
+
+    def _rotate(self):
+        for i in range(self.backups, 0, -1):
+            source = self.path if i == 1 else f"{self.path}.{i - 1}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{i}")
+        if os.path.exists(self.path):
+            os.remove(self.path)  # backups=0: start over
+
+    def close(self):
+        """Stop the flusher after it has written everything still buffered."""
+        with self._cond:
+            if self._stopped:
+                return
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
@@ -1,25 +1,97 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import inspect
+import time
+
 from colorama import Fore, Style
 from models.errors import UsageError
 
 
 class Command:
-    """A registered bot command that wraps a handler with error handling."""
+    """A registered bot command that wraps a handler with error handling.
+
+    Handlers may be plain functions or `async def` coroutine functions.
+    Calling a command runs either kind to completion; from a running event
+    loop use `await command.execute_async(...)`, which awaits coroutines and
+    runs plain handlers on the shared handler thread so the loop stays free.
+    """
 
-    def __init__(self, name: str, handler, usage: str = None):
+    def __init__(self, name: str, handler, usage: str = None, mutates: bool = False):
         self.name = name
         self.usage = usage
+        self.mutates = mutates
+        self.is_async = inspect.iscoroutinefunction(handler)
         self._handler = handler
 
+    ERRORS = (ValueError, KeyError, IndexError)
+    audit = None  # models.audit.AuditLog recording every call of a mutating command
+    _executor = None
+
+    @classmethod
+    def executor(cls) -> ThreadPoolExecutor:
+        """The single worker thread that runs plain handlers for execute_async.
+        One worker, so handlers never run concurrently against the same book."""
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="handler")
+        return cls._executor
+
+    @classmethod
+    def shutdown(cls):
+        """Wait for a handler still running on the handler thread, then stop it.
+        Call before closing anything the handlers write to."""
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=True)
+            cls._executor = None
+
     def __call__(self, args, book):
+        return self.execute(args, book)[1]
+
+    def _outcome(self, args, invocation, started: float):
+        """Call `invocation()`, turn handler errors into (False, message) and
+        audit the call if the command mutates."""
+        ok = True
         try:
-            return self._handler(args, book)
-        except (ValueError, KeyError, IndexError) as e:
-            hint = (
-                f"\n{Fore.YELLOW}'{self.usage}'{Style.RESET_ALL}"
-                if isinstance(e, UsageError) and self.usage
-                else ""
+            result = invocation()
+        except Command.ERRORS as e:
+            ok, result = False, self.format_error(e)
+        if self.mutates and Command.audit is not None:
+            Command.audit.record(self.name, args, ok, result, started)
+        return ok, result
+
+    def execute(self, args, book):
+        """Like calling the command, but returns (ok, result) so callers can tell errors apart."""
+        return self._outcome(args, lambda: self.invoke(args, book), time.time())
+
+    async def execute_async(self, args, book):
+        """execute() for callers inside an event loop."""
+        started = time.time()
+        if self.is_async:
+            pending = asyncio.ensure_future(self._handler(args, book))
+        else:
+            pending = asyncio.get_running_loop().run_in_executor(
+                Command.executor(), self._handler, args, book,
             )
-            return f" {Fore.RED}{e.args[0]}{Style.RESET_ALL}" + hint
+        try:
+            await asyncio.wait([pending])
+        except asyncio.CancelledError:
+            pending.cancel()  # a handler already on the handler thread runs on, see shutdown()
+            raise
+        return self._outcome(args, pending.result, started)  # result() re-raises handler errors
+
+    def invoke(self, args, book):
+        """Run the handler without error formatting — errors propagate.
+        A coroutine handler is run to completion on a new event loop."""
+        if self.is_async:
+            return asyncio.run(self._handler(args, book))
+        return self._handler(args, book)
+
+    def format_error(self, e: Exception) -> str:
+        hint = (
+            f"\n{Fore.YELLOW}'{self.usage}'{Style.RESET_ALL}"
+            if isinstance(e, UsageError) and self.usage
+            else ""
+        )
+        return f" {Fore.RED}{e.args[0]}{Style.RESET_ALL}" + hint
 
 
 class CommandRegistry:
@@ -28,7 +100,7 @@ class CommandRegistry:
     def __init__(self):
         self._commands: dict[str, Command] = {}
 
-    def command(self, name: str, usage: str = None):
+    def command(self, name: str, usage: str = None, mutates: bool = False):
         """Decorator that registers a handler function as a named bot command.
 
         Registration happens at import time — the moment the module containing
@@ -37,10 +109,12 @@ class CommandRegistry:
         "change", "phone", and "all" before any user input is processed.
 
         To add a new command, create a handler with @command(...) and import
-        its module in handlers/__init__.py.
+        its module in handlers/__init__.py. The handler may be `async def`.
+        Pass mutates=True for commands that change the book so they are
+        written to the audit log.
         """
         def decorator(func):
-            self._commands[name] = Command(name, func, usage)
+            self._commands[name] = Command(name, func, usage, mutates)
             return func
         return decorator
 
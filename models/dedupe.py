@@ -0,0 +1,82 @@
+"""Duplicate-contact detection for AddressBook.
+
+Records are linked when they share a phone number or when their names
+normalize to the same key (case, accents, spaces and punctuation ignored).
+Links are collected by hashing into buckets and resolved with union-find,
+so the cost is linear in the number of records plus phones.
+"""
+
+import unicodedata
+
+
+def name_key(name: str) -> str:
+    """Return a loose comparison key: 'José-Smith' and 'jose smith' → 'josesmith'."""
+    decomposed = unicodedata.normalize("NFKD", name)
+    return "".join(ch for ch in decomposed if ch.isalnum()).casefold()
+
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, i: int) -> int:
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]  # path halving
+            i = parent[i]
+        return i
+
+    def union(self, a: int, b: int):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            # The earlier record stays the root so it survives the merge.
+            if ra < rb:
+                self.parent[rb] = ra
+            else:
+                self.parent[ra] = rb
+
+
+def find_duplicates(book) -> list[list[str]]:
+    """Return groups of record names that look like the same person.
+
+    Each group lists names in book insertion order; the first one is the
+    record the others would be merged into. Singletons are omitted.
+    """
+    names = list(book.data)
+    uf = _UnionFind(len(names))
+    first_by_name = {}
+    first_by_phone = {}
+    for i, (name, record) in enumerate(book.data.items()):
+        j = first_by_name.setdefault(name_key(name), i)
+        if j != i:
+            uf.union(i, j)
+        for phone in record.phones:
+            j = first_by_phone.setdefault(int(phone), i)
+            if j != i:
+                uf.union(i, j)
+
+    groups = {}
+    for i, name in enumerate(names):
+        groups.setdefault(uf.find(i), []).append(name)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def merge_records(book, group: list[str]):
+    """Merge every record in `group` into the first one and delete the rest.
+
+    Phones and tags are added through Record.add_phone/add_tag; the
+    survivor's birthday wins, otherwise the first birthday found among the
+    duplicates is used.
+    """
+    target = book.find(group[0])
+    for name in group[1:]:
+        duplicate = book.find(name)
+        for phone in duplicate.phones:
+            if target.find_phone(phone.value) is None:
+                target.add_phone(phone.value)
+        if target.birthday is None and duplicate.birthday is not None:
+            target.add_birthday(str(duplicate.birthday))
+        for tag in sorted(duplicate.tags - target.tags):
+            target.add_tag(tag)
+        book.delete(name)
+    return target
@@ -1,2 +1,6 @@
 class UsageError(ValueError):
     """Raised when a command receives wrong number or type of arguments."""
+
+
+class VersionConflict(ValueError):
+    """Raised when a conditional update sees a record version other than the expected one."""
@@ -0,0 +1,134 @@
+"""Change feed for AddressBook and Record mutations.
+
+Secondary structures (indexes, caches, persistence) subscribe to a book's
+`changes` feed instead of rescanning the book. Events are delivered
+synchronously to plain subscribers; batched subscribers receive a list of
+queued events whenever `flush()` is called.
+
+Between `begin()` and `commit()` events are only journaled: nobody is
+notified until the batch commits, and `rollback()` hands the journal back so
+the book can undo it.
+"""
+
+from enum import Enum
+from typing import Any, NamedTuple
+
+
+class ChangeKind(Enum):
+    RECORD_ADDED = "record_added"
+    RECORD_DELETED = "record_deleted"
+    PHONE_ADDED = "phone_added"
+    PHONE_REMOVED = "phone_removed"
+    BIRTHDAY_SET = "birthday_set"
+    TAG_ADDED = "tag_added"
+    TAG_REMOVED = "tag_removed"
+
+
+class RecordState(NamedTuple):
+    """A record's phones, birthday and tags at the moment it was added or deleted."""
+
+    phones: tuple
+    birthday: Any
+    tags: tuple = ()
+
+    @classmethod
+    def of(cls, record) -> "RecordState":
+        return cls(tuple(record.phones), record.birthday, tuple(record.tags))
+
+
+class Change(NamedTuple):
+    """One mutation. `old`/`new` hold the Phone, Birthday or tag involved, or a
+    RecordState for RECORD_ADDED (`new`) and RECORD_DELETED (`old`).
+
+    Subscribers should read these fields rather than the live record:
+    events from a bulk() batch are delivered after the whole batch ran.
+    """
+
+    kind: ChangeKind
+    record: Any
+    old: Any = None
+    new: Any = None
+    bumped: bool = False  # this event raised record.version (the first event of a mutator call)
+
+
+class ChangeFeed:
+    """Subscriber list plus a queue for batched delivery."""
+
+    def __init__(self):
+        self._subscribers = []
+        self._batched = []
+        self._on_commit = {}  # plain subscriber -> handler taking a committed journal
+        self._queue: list[Change] = []
+        self._journal: list[Change] | None = None
+
+    @property
+    def active(self) -> bool:
+        """True if anyone is listening — mutators skip building events otherwise."""
+        return self._journal is not None or bool(self._subscribers or self._batched)
+
+    @property
+    def in_batch(self) -> bool:
+        return self._journal is not None
+
+    def begin(self):
+        """Start journaling events instead of delivering them."""
+        if self._journal is not None:
+            raise RuntimeError("A batch is already open on this feed.")
+        self._journal = []
+
+    def commit(self):
+        """Close the batch and deliver it: one call per event to plain
+        subscribers (or one `on_commit` call if they registered one), a
+        single batch to batched subscribers."""
+        journal, self._journal = self._journal, None
+        for callback in list(self._subscribers):
+            on_commit = self._on_commit.get(callback)
+            if on_commit is not None:
+                on_commit(journal)
+                continue
+            for change in journal:
+                callback(change)
+        if self._batched:
+            self._queue.extend(journal)
+            self.flush()
+
+    def rollback(self) -> list[Change]:
+        """Close the batch without notifying anyone and return its journal."""
+        journal, self._journal = self._journal, None
+        return journal
+
+    def subscribe(self, callback, batched: bool = False, on_commit=None):
+        """Register `callback(change)`, or `callback(changes)` when batched.
+
+        A plain subscriber may pass `on_commit(changes)` to take a whole
+        committed bulk batch at once — e.g. to rebuild an index in one go.
+        """
+        (self._batched if batched else self._subscribers).append(callback)
+        if on_commit is not None:
+            self._on_commit[callback] = on_commit
+        return callback
+
+    def unsubscribe(self, callback):
+        for target in (self._subscribers, self._batched):
+            if callback in target:
+                target.remove(callback)
+        self._on_commit.pop(callback, None)
+        if not self._batched:
+            self._queue.clear()
+
+    def emit(self, change: Change):
+        if self._journal is not None:
+            self._journal.append(change)
+            return
+        for callback in self._subscribers:
+            callback(change)
+        if self._batched:
+            self._queue.append(change)
+
+    def flush(self):
+        """Deliver queued events to batched subscribers and clear the queue."""
+        if not self._queue:
+            return
+        queue, self._queue = self._queue, []
+        for callback in self._batched:
+            callback(queue)
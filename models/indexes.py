@@ -0,0 +1,620 @@
+"""Optional secondary indexes over an AddressBook.
+
+An index is built with one scan the first time it is asked for
+(`X.for_book(book)`), stored in `book.indexes`, and from then on kept up to
+date from the book's change feed. A whole `book.bulk()` batch is applied in
+one step on commit. `attach_served_indexes(book)` builds the ones the query
+planner and the read commands use, for books the agent serves.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right, insort
+import calendar
+from collections import Counter
+import datetime
+import re
+import sys
+
+from models.events import ChangeKind
+from models.models import AddressBook, Name, Phone, Tag
+
+
+class BookIndex:
+    """Base for derived structures: built once, then fed from `book.changes`.
+
+    Subclasses set NAME and implement `rebuild()` and `_on_change(change)`;
+    `_on_commit(changes)` defaults to applying a bulk batch event by event.
+    """
+
+    NAME = None
+
+    def __init__(self, book):
+        self.book = book
+        self.rebuild()
+        book.changes.subscribe(self._on_change, on_commit=self._on_commit)
+
+    @classmethod
+    def for_book(cls, book):
+        """Return the book's instance of this index, building it on first use."""
+        index = book.indexes.get(cls.NAME)
+        if index is None:
+            index = book.indexes[cls.NAME] = cls(book)
+        return index
+
+    def rebuild(self):
+        raise NotImplementedError
+
+    def _on_change(self, change):
+        raise NotImplementedError
+
+    def _on_commit(self, changes):
+        for change in changes:
+            self._on_change(change)
+
+
+class PhoneIndex(BookIndex):
+    """All phones in the book as a sorted array of packed ints.
+
+    `_phones` holds the numbers (8 bytes each) and `_owners` the record for
+    each position, so a prefix query is two bisects plus a slice.
+    """
+
+    NAME = "phones"
+    REBUILD_RATIO = 0.1  # bulk batches larger than this share of rows rebuild instead of patching
+
+    def rebuild(self):
+        pairs = sorted(
+            ((int(phone), record) for record in self.book.data.values() for phone in record.phones),
+            key=lambda pair: pair[0],
+        )
+        self._phones = array("q", (phone for phone, _ in pairs))
+        self._owners = [record for _, record in pairs]
+
+    def _add(self, phone: int, record):
+        i = bisect_right(self._phones, phone)
+        self._phones.insert(i, phone)
+        self._owners.insert(i, record)
+
+    def _remove(self, phone: int, record):
+        lo, hi = bisect_left(self._phones, phone), bisect_right(self._phones, phone)
+        for i in range(lo, hi):
+            if self._owners[i] is record:
+                del self._phones[i]
+                del self._owners[i]
+                return
+
+    def _on_change(self, change):
+        kind = change.kind
+        if kind is ChangeKind.PHONE_ADDED:
+            self._add(int(change.new), change.record)
+        elif kind is ChangeKind.PHONE_REMOVED:
+            self._remove(int(change.old), change.record)
+        elif kind is ChangeKind.RECORD_ADDED:
+            for phone in change.new.phones:
+                self._add(int(phone), change.record)
+        elif kind is ChangeKind.RECORD_DELETED:
+            for phone in change.old.phones:
+                self._remove(int(phone), change.record)
+
+    def _on_commit(self, changes):
+        if len(changes) > self.REBUILD_RATIO * max(len(self._phones), 1):
+            self.rebuild()
+        else:
+            for change in changes:
+                self._on_change(change)
+
+    def __len__(self):
+        return len(self._phones)
+
+    def _bounds(self, prefix: str) -> tuple[int, int]:
+        lo, hi = Phone.prefix_range(prefix)
+        return bisect_left(self._phones, lo), bisect_left(self._phones, hi)
+
+    def with_prefix(self, prefix: str) -> list[tuple[str, object]]:
+        """Return (phone, record) pairs whose number starts with `prefix`, by phone."""
+        start, stop = self._bounds(prefix)
+        width = Phone.DIGITS
+        return [
+            (f"{phone:0{width}d}", record)
+            for phone, record in zip(self._phones[start:stop], self._owners[start:stop])
+        ]
+
+    def count(self, prefix: str) -> int:
+        start, stop = self._bounds(prefix)
+        return stop - start
+
+    def prefix_counts(self, length: int) -> dict[str, int]:
+        """Count phones per leading `length` digits, jumping between groups with bisect."""
+        scale = 10 ** (Phone.DIGITS - length)
+        counts = {}
+        phones = self._phones
+        i = 0
+        while i < len(phones):
+            group = phones[i] // scale
+            end = bisect_left(phones, (group + 1) * scale, i)
+            counts[f"{group:0{length}d}"] = end - i
+            i = end
+        return counts
+
+    def __sizeof__(self):
+        return object.__sizeof__(self) + sys.getsizeof(self._phones) + sys.getsizeof(self._owners)
+
+
+class NameOrder(BookIndex):
+    """Record names kept in case-insensitive order as a blocked sorted list.
+
+    Entries are (Name.key, display name) tuples stored in blocks of at most
+    2 * LOAD items, with `_maxes` holding each block's last entry. Finding a
+    block is a bisect over `_maxes` and inserting or removing only shifts one
+    block, so updates are O(log N + LOAD). A range scan touches only the
+    blocks that overlap the range.
+    """
+
+    NAME = "name_order"
+    LOAD = 500
+
+    def rebuild(self):
+        entries = sorted((Name.key(name), name) for name in self.book.data)
+        self._blocks = [entries[i:i + self.LOAD] for i in range(0, len(entries), self.LOAD)]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._size = len(entries)
+
+    def __len__(self):
+        return self._size
+
+    def _insert(self, entry):
+        if not self._blocks:
+            self._blocks.append([entry])
+            self._maxes.append(entry)
+            self._size += 1
+            return
+        i = min(bisect_left(self._maxes, entry), len(self._blocks) - 1)
+        block = self._blocks[i]
+        insort(block, entry)
+        self._maxes[i] = block[-1]
+        if len(block) > 2 * self.LOAD:
+            self._blocks[i:i + 1] = [block[:self.LOAD], block[self.LOAD:]]
+            self._maxes[i:i + 1] = [block[self.LOAD - 1], block[-1]]
+        self._size += 1
+
+    def _remove(self, entry):
+        i = bisect_left(self._maxes, entry)
+        if i == len(self._blocks):
+            return
+        block = self._blocks[i]
+        j = bisect_left(block, entry)
+        if j == len(block) or block[j] != entry:
+            return
+        del block[j]
+        self._size -= 1
+        if block:
+            self._maxes[i] = block[-1]
+        else:
+            del self._blocks[i]
+            del self._maxes[i]
+
+    def _on_change(self, change):
+        name = change.record.name.value
+        if change.kind is ChangeKind.RECORD_ADDED:
+            self._insert((Name.key(name), name))
+        elif change.kind is ChangeKind.RECORD_DELETED:
+            self._remove((Name.key(name), name))
+
+    @staticmethod
+    def _range(start: str = None, stop: str = None):
+        low = (Name.key(start),) if start else ()
+        high = (Name.key(stop) + "\U0010ffff",) if stop else None
+        return low, high
+
+    def _rank(self, entry) -> int:
+        """Number of entries before `entry`; sums block sizes, so O(N / LOAD)."""
+        i = bisect_left(self._maxes, entry)
+        before = sum(map(len, self._blocks[:i]))
+        return before + (bisect_left(self._blocks[i], entry) if i < len(self._blocks) else 0)
+
+    def count(self, start: str = None, stop: str = None) -> int:
+        """Number of names that names(start, stop) would yield, without walking them."""
+        low, high = self._range(start, stop)
+        return (self._rank(high) if high is not None else self._size) - self._rank(low)
+
+    def names(self, start: str = None, stop: str = None):
+        """Yield display names in order from `start` up to and including any
+        name beginning with `stop` (both case-insensitive, both optional)."""
+        low, high = self._range(start, stop)
+        i = bisect_left(self._maxes, low)
+        j = bisect_left(self._blocks[i], low) if i < len(self._blocks) else 0
+        for block in self._blocks[i:]:
+            for entry in block[j:]:
+                if high is not None and entry >= high:
+                    return
+                yield entry[1]
+            j = 0
+
+    def records(self, start: str = None, stop: str = None):
+        data = self.book.data
+        return (data[name] for name in self.names(start, stop))
+
+    def __sizeof__(self):
+        return (
+            object.__sizeof__(self)
+            + sys.getsizeof(self._blocks)
+            + sys.getsizeof(self._maxes)
+            + sum(sys.getsizeof(block) for block in self._blocks)
+        )
+
+
+class BookStats(BookIndex):
+    """Aggregates updated in O(1) per mutation.
+
+    Kept: contacts per phone count, birthdays per birth month, per calendar
+    day (month, day) and per birth date. Reports that depend on today — the
+    weekday of the next anniversary and the age histogram — are derived from
+    those counters, so their cost depends on the number of distinct dates,
+    never on the number of contacts.
+    """
+
+    NAME = "stats"
+    AGE_BUCKET = 10
+
+    def rebuild(self):
+        self._phone_counts = {}  # record -> number of phones
+        self.phones_per_contact = Counter()
+        self.birth_months = Counter()
+        self._calendar_days = Counter()
+        self._birth_dates = Counter()
+        for record in self.book.data.values():
+            self._add_record(record, record.phones, record.birthday)
+
+    @property
+    def contacts(self) -> int:
+        return len(self._phone_counts)
+
+    def _count_birthday(self, birthday, delta: int):
+        if birthday is None:
+            return
+        day = birthday.value
+        self.birth_months[day.month] += delta
+        self._calendar_days[day.month, day.day] += delta
+        self._birth_dates[day] += delta
+
+    def _set_phone_count(self, record, count: int):
+        old = self._phone_counts.get(record)
+        if old is not None:
+            self.phones_per_contact[old] -= 1
+        self._phone_counts[record] = count
+        self.phones_per_contact[count] += 1
+
+    def _add_record(self, record, phones, birthday):
+        self._set_phone_count(record, len(phones))
+        self._count_birthday(birthday, 1)
+
+    def _on_change(self, change):
+        kind, record = change.kind, change.record
+        if kind is ChangeKind.PHONE_ADDED:
+            self._set_phone_count(record, self._phone_counts[record] + 1)
+        elif kind is ChangeKind.PHONE_REMOVED:
+            self._set_phone_count(record, self._phone_counts[record] - 1)
+        elif kind is ChangeKind.BIRTHDAY_SET:
+            self._count_birthday(change.old, -1)
+            self._count_birthday(change.new, 1)
+        elif kind is ChangeKind.RECORD_ADDED:
+            self._add_record(record, change.new.phones, change.new.birthday)
+        elif kind is ChangeKind.RECORD_DELETED:
+            self.phones_per_contact[self._phone_counts.pop(record)] -= 1
+            self._count_birthday(change.old.birthday, -1)
+
+    def anniversary_weekdays(self, today: datetime.date = None) -> Counter:
+        """Birthdays per weekday (0=Mon) of their next anniversary."""
+        today = today or datetime.date.today()
+        weekdays = Counter()
+        for (month, day), count in self._calendar_days.items():
+            if count:
+                anniversary = AddressBook.next_anniversary(datetime.date(2000, month, day), today)
+                weekdays[anniversary.weekday()] += count
+        return weekdays
+
+    def age_histogram(self, today: datetime.date = None) -> Counter:
+        """Contacts per age bucket, keyed by the bucket's lower bound (0, 10, 20, ...)."""
+        today = today or datetime.date.today()
+        ages = Counter()
+        for born, count in self._birth_dates.items():
+            if count:
+                age = today.year - born.year - ((today.month, today.day) < (born.month, born.day))
+                ages[age // self.AGE_BUCKET * self.AGE_BUCKET] += count
+        return ages
+
+    def __sizeof__(self):
+        return object.__sizeof__(self) + sum(
+            sys.getsizeof(c)
+            for c in (self._phone_counts, self.phones_per_contact, self.birth_months,
+                      self._calendar_days, self._birth_dates)
+        )
+
+
+class BirthdayCalendar(BookIndex):
+    """Contacts with a birthday grouped by calendar day (month, day).
+
+    There are at most 366 groups, so `upcoming_items` walks the calendar
+    from today one day at a time and stops as soon as it has `limit`
+    contacts: its cost depends on the window and the limit, not on the
+    size of the book.
+    """
+
+    NAME = "birthdays"
+    YEAR_DAYS = 366  # every next anniversary is less than this many days away
+
+    def rebuild(self):
+        self._days = {}  # (month, day) -> {record: None}, insertion-ordered set
+        for record in self.book.data.values():
+            self._add(record, record.birthday)
+
+    def _add(self, record, birthday):
+        if birthday is not None:
+            day = birthday.value
+            self._days.setdefault((day.month, day.day), {})[record] = None
+
+    def _remove(self, record, birthday):
+        if birthday is None:
+            return
+        day = birthday.value
+        group = self._days.get((day.month, day.day))
+        if group is not None:
+            group.pop(record, None)
+            if not group:
+                del self._days[day.month, day.day]
+
+    def _on_change(self, change):
+        if change.kind is ChangeKind.BIRTHDAY_SET:
+            self._remove(change.record, change.old)
+            self._add(change.record, change.new)
+        elif change.kind is ChangeKind.RECORD_ADDED:
+            self._add(change.record, change.new.birthday)
+        elif change.kind is ChangeKind.RECORD_DELETED:
+            self._remove(change.record, change.old.birthday)
+
+    @staticmethod
+    def month_days(month: int) -> list[tuple[int, int]]:
+        return [(month, day) for day in range(1, calendar.monthrange(2000, month)[1] + 1)]
+
+    @classmethod
+    def days_between(cls, start: datetime.date = None, end: datetime.date = None) -> list[tuple[int, int]]:
+        """Calendar days a birth date in [start, end] can fall on; either end may be open."""
+        if start is None or end is None or (end - start).days >= cls.YEAR_DAYS:
+            return [day for month in range(1, 13) for day in cls.month_days(month)]
+        days = (start + datetime.timedelta(days=i) for i in range((end - start).days + 1))
+        return list(dict.fromkeys((day.month, day.day) for day in days))
+
+    def count(self, days) -> int:
+        """Contacts born on any of the (month, day) pairs."""
+        return sum(len(self._days.get(day, ())) for day in days)
+
+    def records(self, days) -> list:
+        return [record for day in days for record in self._days.get(day, ())]
+
+    def upcoming_items(self, today: datetime.date, days: int = AddressBook.UPCOMING_DAYS, limit: int = None) -> list:
+        """AddressBook.upcoming_items from the calendar: anniversaries come in
+        day order and the weekend shift never reorders them, so the walk
+        yields items already sorted."""
+        items = []
+        for offset in range(min(days, self.YEAR_DAYS)):
+            if limit is not None and len(items) >= limit:
+                break
+            day = today + datetime.timedelta(days=offset)
+            records = list(self._days.get((day.month, day.day), ()))
+            if day.month == 3 and day.day == 1 and not calendar.isleap(day.year):
+                records += self._days.get((2, 29), ())  # Feb 29 birthdays are celebrated on Mar 1
+            found = (
+                AddressBook.upcoming_item(r.name.value, r.birthday.value, today, days)
+                for r in records
+            )
+            # a Feb 29 group can be met twice in one walk; keep it where its anniversary is
+            items.extend(sorted(item for item in found if item is not None and item[1] == day))
+        return items[:limit]
+
+    def __sizeof__(self):
+        return (
+            object.__sizeof__(self)
+            + sys.getsizeof(self._days)
+            + sum(sys.getsizeof(day) + sys.getsizeof(group) for day, group in self._days.items())
+        )
+
+
+class TagIndex(BookIndex):
+    """One bitmap per tag over dense record ids.
+
+    Each record gets a small integer id (ids of deleted records are reused)
+    and every tag is a bytearray with bit `id` set for tagged records, so a
+    change flips one bit whatever the size of the book. Queries turn the
+    bitmaps they use into Python ints (cached until the tag changes) and
+    evaluate AND/OR/NOT as single big-int operations.
+
+    Query syntax: tags combined with AND, OR, NOT and parentheses,
+    e.g. `(vip OR friends) AND NOT blocked`. NOT binds tightest, then AND.
+    """
+
+    NAME = "tags"
+    REBUILD_RATIO = 0.1  # bulk batches larger than this share of records rebuild instead of patching
+    _TOKEN = re.compile(r"\(|\)|[^\s()]+")
+
+    @staticmethod
+    def _bitmap(ids, size: int) -> bytearray:
+        """Build a bitmap in one pass over a bytearray instead of one big-int op per id."""
+        buffer = bytearray((size + 7) // 8)
+        for rid in ids:
+            buffer[rid >> 3] |= 1 << (rid & 7)
+        return buffer
+
+    def rebuild(self):
+        self._records = list(self.book.data.values())  # id -> record, None for free slots
+        self._ids = {record: rid for rid, record in enumerate(self._records)}
+        self._free = []
+        members = {}
+        for rid, record in enumerate(self._records):
+            for tag in record.tags:
+                members.setdefault(tag, []).append(rid)
+        size = len(self._records)
+        self._bits = {tag: self._bitmap(ids, size) for tag, ids in members.items()}
+        self._counts = {tag: len(ids) for tag, ids in members.items()}
+        self._ints = {}  # tag -> int form of its bitmap, dropped when the tag changes
+        self._universe = None  # bitmap of every live id, built by the first NOT
+
+    def _on_commit(self, changes):
+        if len(changes) > self.REBUILD_RATIO * max(len(self._ids), 1):
+            self.rebuild()
+        else:
+            for change in changes:
+                self._on_change(change)
+
+    def _add_record(self, record, tags):
+        if self._free:
+            rid = self._free.pop()
+            self._records[rid] = record
+        else:
+            rid = len(self._records)
+            self._records.append(record)
+        self._ids[record] = rid
+        self._universe = None
+        for tag in tags:
+            self._set(tag, rid)
+
+    def _set(self, tag, rid):
+        bits = self._bits.setdefault(tag, bytearray())
+        byte, mask = rid >> 3, 1 << (rid & 7)
+        if byte >= len(bits):
+            bits.extend(bytes(byte + 1 - len(bits)))
+        if not bits[byte] & mask:
+            bits[byte] |= mask
+            self._counts[tag] = self._counts.get(tag, 0) + 1
+            self._ints.pop(tag, None)
+
+    def _clear(self, tag, rid):
+        bits = self._bits.get(tag)
+        byte, mask = rid >> 3, 1 << (rid & 7)
+        if bits is None or byte >= len(bits) or not bits[byte] & mask:
+            return
+        bits[byte] &= ~mask
+        self._ints.pop(tag, None)
+        self._counts[tag] -= 1
+        if not self._counts[tag]:
+            del self._bits[tag], self._counts[tag]
+
+    def _on_change(self, change):
+        kind, record = change.kind, change.record
+        if kind is ChangeKind.TAG_ADDED:
+            self._set(change.new, self._ids[record])
+        elif kind is ChangeKind.TAG_REMOVED:
+            self._clear(change.old, self._ids[record])
+        elif kind is ChangeKind.RECORD_ADDED:
+            self._add_record(record, change.new.tags)
+        elif kind is ChangeKind.RECORD_DELETED:
+            rid = self._ids.pop(record)
+            for tag in change.old.tags:
+                self._clear(tag, rid)
+            self._records[rid] = None
+            self._free.append(rid)
+            self._universe = None
+
+    def _tag_bits(self, tag: str) -> int:
+        bits = self._ints.get(tag)
+        if bits is None:
+            buffer = self._bits.get(tag)
+            if buffer is None:
+                return 0
+            bits = self._ints[tag] = int.from_bytes(buffer, "little")
+        return bits
+
+    def _all(self) -> int:
+        if self._universe is None:
+            size = len(self._records)
+            free = int.from_bytes(self._bitmap(self._free, size), "little") if self._free else 0
+            self._universe = ((1 << size) - 1) & ~free
+        return self._universe
+
+    def tags(self) -> dict[str, int]:
+        """Tag -> number of tagged contacts."""
+        return dict(sorted(self._counts.items()))
+
+    def evaluate(self, expression: str) -> int:
+        """Return the bitmap of records matching a tag expression."""
+        tokens = self._TOKEN.findall(expression)
+        if not tokens:
+            raise ValueError("Tag expression is empty.")
+        pos = 0
+
+        def peek():
+            return tokens[pos].lower() if pos < len(tokens) else None
+
+        def take():
+            nonlocal pos
+            pos += 1
+            return tokens[pos - 1]
+
+        def parse_or():
+            bits = parse_and()
+            while peek() == "or":
+                take()
+                bits |= parse_and()
+            return bits
+
+        def parse_and():
+            bits = parse_not()
+            while peek() == "and":
+                take()
+                bits &= parse_not()
+            return bits
+
+        def parse_not():
+            token = peek()
+            if token == "not":
+                take()
+                return self._all() & ~parse_not()
+            if token == "(":
+                take()
+                bits = parse_or()
+                if peek() != ")":
+                    raise ValueError(f"Missing ')' in tag expression '{expression}'.")
+                take()
+                return bits
+            if token is None or token in (")", "and", "or"):
+                raise ValueError(f"Expected a tag in expression '{expression}'.")
+            return self._tag_bits(Tag(take()).value)
+
+        bits = parse_or()
+        if pos != len(tokens):
+            raise ValueError(f"Unexpected '{tokens[pos]}' in tag expression '{expression}'.")
+        return bits
+
+    def count(self, expression: str) -> int:
+        return self.evaluate(expression).bit_count()
+
+    def query(self, expression: str) -> list:
+        """Return matching records in id order."""
+        bits = bin(self.evaluate(expression))[:1:-1]  # bit i at index i
+        records = self._records
+        found = []
+        i = bits.find("1")
+        while i != -1:
+            found.append(records[i])
+            i = bits.find("1", i + 1)
+        return found
+
+    def __sizeof__(self):
+        return (
+            object.__sizeof__(self)
+            + sys.getsizeof(self._ids)
+            + sys.getsizeof(self._records)
+            + sys.getsizeof(self._counts)
+            + sum(sys.getsizeof(bits) for bits in self._bits.values())
+            + sum(sys.getsizeof(bits) for bits in self._ints.values())
+            + (sys.getsizeof(self._universe) if self._universe is not None else 0)
+        )
+
+
+SERVED_INDEXES = (NameOrder, PhoneIndex, TagIndex, BirthdayCalendar)
+
+
+def attach_served_indexes(book):
+    """Build the indexes models.query plans with (and 'birthdays' walks), so
+    the first query of a session does not fall back to a scan."""
+    for index in SERVED_INDEXES:
+        index.for_book(book)
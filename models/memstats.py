@@ -0,0 +1,84 @@
+"""Memory accounting for an AddressBook.
+
+Sizes come from `sys.getsizeof` on the objects the book actually owns, so a
+report costs one pass over the records and no `gc` walk. For large books
+pass `sample` to measure every k-th record and scale the totals up.
+If `tracemalloc` is tracing, the top allocation sites are included as well.
+"""
+
+import sys
+import tracemalloc
+
+from models.models import Birthday, Name, Phone, Record, Tag
+
+
+def _record_sizes(record, totals):
+    getsizeof = sys.getsizeof
+    rec = totals[Record.__name__]
+    rec[0] += 1
+    rec[1] += getsizeof(record) + getsizeof(record.__dict__) + getsizeof(record.phones) + getsizeof(record.tags)
+
+    name = totals[Name.__name__]
+    name[0] += 1
+    name[1] += getsizeof(record.name) + getsizeof(record.name.value)
+
+    phone = totals[Phone.__name__]
+    for p in record.phones:
+        phone[0] += 1
+        phone[1] += getsizeof(p) + getsizeof(p._value)
+
+    if record.birthday is not None:
+        birthday = totals[Birthday.__name__]
+        birthday[0] += 1
+        birthday[1] += getsizeof(record.birthday) + getsizeof(record.birthday.value)
+
+    tag = totals[Tag.__name__]
+    for t in record.tags:  # tags are stored as plain strings
+        tag[0] += 1
+        tag[1] += getsizeof(t)
+
+
+def memory_stats(book, sample: int = None, top: int = 10) -> dict:
+    """Return object counts and bytes per model class for `book`.
+
+    With `sample=k` only every k-th record is measured and counts/bytes are
+    scaled by contacts / measured records. The result has keys `classes` ({class: {"count", "bytes"}}),
+    `contacts`, `total_bytes`, `bytes_per_contact` and `top_allocations`
+    (None unless tracemalloc is tracing).
+    """
+    step = max(1, sample or 1)
+    totals = {cls.__name__: [0, 0] for cls in (Record, Name, Phone, Birthday, Tag)}
+    records = book.data.values()
+    for i, record in enumerate(records):
+        if i % step == 0:
+            _record_sizes(record, totals)
+    measured = totals[Record.__name__][0]
+    scale = len(records) / measured if measured else 0
+
+    classes = {"AddressBook": {
+        "count": 1,
+        "bytes": sys.getsizeof(book) + sys.getsizeof(book.__dict__) + sys.getsizeof(book.data),
+    }}
+    classes["NameIndex"] = {"count": 1, "bytes": sys.getsizeof(book._index)}
+    for index in book.indexes.values():
+        classes[type(index).__name__] = {"count": 1, "bytes": sys.getsizeof(index)}
+    for cls_name, (count, size) in totals.items():
+        classes[cls_name] = {"count": round(count * scale), "bytes": round(size * scale)}
+
+    contacts = len(records)
+    total = sum(c["bytes"] for c in classes.values())
+    return {
+        "classes": classes,
+        "contacts": contacts,
+        "total_bytes": total,
+        "bytes_per_contact": total / contacts if contacts else 0.0,
+        "top_allocations": _top_allocations(top) if tracemalloc.is_tracing() else None,
+    }
+
+
+def _top_allocations(top: int) -> list[dict]:
+    stats = tracemalloc.take_snapshot().statistics("lineno")[:top]
+    return [
+        {"site": str(stat.traceback[0]), "bytes": stat.size, "count": stat.count}
+        for stat in stats
+    ]
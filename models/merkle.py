@@ -0,0 +1,216 @@
+"""Merkle-hash comparison and delta sync between address books.
+
+A record's content hash is the sum (mod 2**64) of one hash per item: its
+name, each phone, its birthday and each tag. Because the hash is a sum, a
+change event can adjust it without knowing the rest of the record, and the
+hash of a bucket of records is simply the sum of their hashes.
+
+`MerkleTree` spreads records over FANOUT**depth buckets by a hash of
+Name.key and keeps one 64-bit sum per bucket, fed from the change feed like
+the indexes in models.indexes. Inner nodes hash their FANOUT children and
+are recomputed lazily, only along paths below a changed bucket.
+
+`diff` walks two trees from the root and only descends into children whose
+hashes differ, then compares per-record hashes inside the differing
+buckets; each bucket's {name: record hash} map is kept from the change feed
+too, so that costs O(differing buckets), not a pass over the book. `sync` copies just those records. Everything a remote copy would
+have to send is exposed as `node`, `children`, `buckets` and `records`.
+"""
+
+import hashlib
+from array import array
+from typing import NamedTuple
+import zlib
+
+from models.events import ChangeKind
+from models.indexes import BookIndex
+from models.models import Name
+from models.storage import record_from_dict, record_to_dict
+
+FANOUT = 16
+MASK = (1 << 64) - 1
+
+
+def _item_hash(name: str, kind: str, value) -> int:
+    data = f"{name}\0{kind}\0{value}".encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+def _state_hash(name: str, phones, birthday, tags) -> int:
+    total = _item_hash(name, "name", "")
+    for phone in phones:
+        total += _item_hash(name, "phone", int(phone))
+    if birthday is not None:
+        total += _item_hash(name, "birthday", birthday)
+    for tag in tags:
+        total += _item_hash(name, "tag", tag)
+    return total & MASK
+
+
+def record_hash(record) -> int:
+    """64-bit content hash of a record: equal records hash equally, whatever their version."""
+    return _state_hash(record.name.value, list(record.phones), record.birthday, list(record.tags))
+
+
+def _node_hash(children) -> int:
+    return int.from_bytes(hashlib.blake2b(children.tobytes(), digest_size=8).digest(), "little")
+
+
+class BookDiff(NamedTuple):
+    """Names that `sync` would add to, replace in and delete from the target."""
+
+    added: list
+    changed: list
+    removed: list
+    hashes: int  # tree and record hashes compared to find them
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed)
+
+
+class MerkleTree(BookIndex):
+    NAME = "merkle"
+    DEPTH = 4  # 65536 buckets: ~150 records per bucket at 10M records
+
+    def __init__(self, book, depth: int = None):
+        self.depth = depth or self.DEPTH
+        super().__init__(book)
+
+    @classmethod
+    def for_book(cls, book, depth: int = None):
+        """Return the book's tree, building it on first use or if `depth` differs."""
+        tree = book.indexes.get(cls.NAME)
+        if tree is None or (depth and tree.depth != depth):
+            if tree is not None:
+                book.changes.unsubscribe(tree._on_change)
+            tree = book.indexes[cls.NAME] = cls(book, depth)
+        return tree
+
+    def bucket_of(self, name: str) -> int:
+        return zlib.crc32(Name.key(name).encode("utf-8")) % FANOUT ** self.depth
+
+    def rebuild(self):
+        self._leaves = array("Q", bytes(8 * FANOUT ** self.depth))
+        self._members = {}  # bucket -> {display name: record hash}
+        for record in self.book.data.values():
+            name, value = record.name.value, record_hash(record)
+            self._members.setdefault(self._add(name, value), {})[name] = value
+        self._levels = [array("Q", bytes(8 * FANOUT ** level)) for level in range(self.depth)]
+        self._dirty = set(range(0, len(self._leaves), FANOUT))
+
+    def _add(self, name: str, value: int):
+        bucket = self.bucket_of(name)
+        self._leaves[bucket] = (self._leaves[bucket] + value) & MASK
+        return bucket
+
+    def _on_change(self, change):
+        name = change.record.name.value
+        kind = change.kind
+        if kind is ChangeKind.RECORD_ADDED:
+            state = change.new
+            delta = _state_hash(name, state.phones, state.birthday, state.tags)
+        elif kind is ChangeKind.RECORD_DELETED:
+            state = change.old
+            delta = -_state_hash(name, state.phones, state.birthday, state.tags)
+        elif kind is ChangeKind.PHONE_ADDED:
+            delta = _item_hash(name, "phone", int(change.new))
+        elif kind is ChangeKind.PHONE_REMOVED:
+            delta = -_item_hash(name, "phone", int(change.old))
+        elif kind is ChangeKind.BIRTHDAY_SET:
+            delta = _item_hash(name, "birthday", change.new)
+            if change.old is not None:
+                delta -= _item_hash(name, "birthday", change.old)
+        elif kind is ChangeKind.TAG_ADDED:
+            delta = _item_hash(name, "tag", change.new)
+        elif kind is ChangeKind.TAG_REMOVED:
+            delta = -_item_hash(name, "tag", change.old)
+        else:
+            return
+        bucket = self._add(name, delta)
+        self._dirty.add(bucket)
+        members = self._members.setdefault(bucket, {})
+        if kind is ChangeKind.RECORD_DELETED:
+            members.pop(name, None)
+            if not members:
+                del self._members[bucket]
+        else:
+            members[name] = (members.get(name, 0) + delta) & MASK
+
+    def _refresh(self):
+        dirty = self._dirty
+        if not dirty:
+            return
+        below = self._leaves
+        for level in range(self.depth - 1, -1, -1):
+            nodes = self._levels[level]
+            parents = {i // FANOUT for i in dirty}
+            for p in parents:
+                nodes[p] = _node_hash(below[p * FANOUT:(p + 1) * FANOUT])
+            dirty, below = parents, nodes
+        self._dirty = set()
+
+    def node(self, level: int, index: int) -> int:
+        """Hash of a node; level 0 is the root, level `depth` the buckets."""
+        self._refresh()
+        return (self._levels[level] if level < self.depth else self._leaves)[index]
+
+    @property
+    def root(self) -> int:
+        return self.node(0, 0)
+
+    def children(self, level: int, index: int) -> array:
+        """Hashes of the FANOUT children of a node at `level` < depth."""
+        self._refresh()
+        below = self._levels[level + 1] if level + 1 < self.depth else self._leaves
+        return below[index * FANOUT:(index + 1) * FANOUT]
+
+    def buckets(self, indexes) -> dict:
+        """{bucket: {display name: record hash}} for the given buckets."""
+        return {i: dict(self._members.get(i, ())) for i in indexes}
+
+    def records(self, names) -> list:
+        """Record dicts (models.storage format) for `names`."""
+        return [record_to_dict(self.book.find(name)) for name in names]
+
+
+def diff(source: MerkleTree, target: MerkleTree) -> BookDiff:
+    """What differs between the books behind two trees of the same depth."""
+    if source.depth != target.depth:
+        raise ValueError(f"Cannot compare trees of depth {source.depth} and {target.depth}.")
+    hashes = 1
+    if source.root == target.root:
+        return BookDiff([], [], [], hashes)
+    frontier = [0]
+    for level in range(source.depth):
+        below = []
+        for index in frontier:
+            ours, theirs = source.children(level, index), target.children(level, index)
+            hashes += len(theirs)
+            below.extend(index * FANOUT + i for i in range(FANOUT) if ours[i] != theirs[i])
+        frontier = below
+
+    ours, theirs = source.buckets(frontier), target.buckets(frontier)
+    added, changed, removed = [], [], []
+    for bucket in frontier:
+        mine, other = ours[bucket], theirs[bucket]
+        hashes += len(other)
+        other_by_key = {Name.key(name): (name, value) for name, value in other.items()}
+        for name, value in mine.items():
+            match = other_by_key.pop(Name.key(name), None)
+            if match is None:
+                added.append(name)
+            elif match != (name, value):
+                changed.append(name)
+        removed.extend(name for name, _ in other_by_key.values())
+    return BookDiff(added, changed, removed, hashes)
+
+
+def sync(source: MerkleTree, target_book, depth: int = None) -> BookDiff:
+    """Make `target_book` equal to the book behind `source`, copying only differing records."""
+    changes = diff(source, MerkleTree.for_book(target_book, depth or source.depth))
+    with target_book.bulk():
+        for name in changes.removed:
+            target_book.delete(name)
+        for data in source.records(changes.added + changes.changed):
+            target_book.add_record(record_from_dict(data))
+    return changes
@@ -1,8 +1,17 @@
 from collections import UserDict
+from contextlib import contextmanager
 import datetime
+import heapq
+import re
+import unicodedata
+
+from models.errors import VersionConflict
+from models.events import Change, ChangeFeed, ChangeKind, RecordState
 
 
 class Field:
+    __slots__ = ("_value",)
+
     def __init__(self, value):
         self.value = value
 
@@ -22,28 +31,96 @@ class Field:
 
 
 class Name(Field):
+    __slots__ = ()
+
     def _validate(self, value):
         if not value:
             raise ValueError("Name cannot be empty")
         return value
 
+    @staticmethod
+    def key(value: str) -> str:
+        """Case-folded, NFC-normalized lookup key: 'MCDONALD' and 'McDonald' → 'mcdonald'."""
+        if value.isascii():
+            return value.lower()
+        return unicodedata.normalize("NFC", value.casefold())
+
 
 class Phone(Field):
-    def _validate(self, value: str):
-        if not value.isdigit() or len(value) != 10:
+    """A 10-digit phone number packed into a single int.
+
+    The digit string is only rebuilt when `value` is read, so equality and
+    hashing work on plain ints. Common input forms (`+38` country code,
+    spaces, dashes, dots and parentheses) are normalized before validation.
+    """
+
+    __slots__ = ()
+    DIGITS = 10
+    COUNTRY_CODE = "38"
+    _SEPARATORS = str.maketrans("", "", " -.()")
+
+    @property
+    def value(self):
+        return f"{self._value:0{Phone.DIGITS}d}"
+
+    @value.setter
+    def value(self, new_value):
+        self._value = self._validate(new_value)
+
+    @staticmethod
+    def normalize(value: str) -> str:
+        """Strip separators and the `+38` country code, e.g. '+38 (012) 345-67-89' → '0123456789'."""
+        digits = value.translate(Phone._SEPARATORS).removeprefix("+")
+        if len(digits) == Phone.DIGITS + len(Phone.COUNTRY_CODE) and digits.startswith(Phone.COUNTRY_CODE):
+            digits = digits[len(Phone.COUNTRY_CODE):]
+        return digits
+
+    @staticmethod
+    def pack(value: str) -> int:
+        """Return the packed int form of a phone string. Raises ValueError if invalid."""
+        if not isinstance(value, str):
             raise ValueError(f"Phone number must be 10 digits, got: '{value}'")
-        return value
+        digits = Phone.normalize(value)
+        if not digits.isascii() or not digits.isdigit() or len(digits) != Phone.DIGITS:
+            raise ValueError(f"Phone number must be 10 digits, got: '{value}'")
+        return int(digits)
+
+    @staticmethod
+    def prefix_range(prefix: str) -> tuple[int, int]:
+        """Return the half-open range of packed phones starting with `prefix`,
+        e.g. '067' → (670000000, 680000000). Separators and `+38` are stripped."""
+        digits = prefix.translate(Phone._SEPARATORS)
+        if digits.startswith("+" + Phone.COUNTRY_CODE):
+            digits = digits[1 + len(Phone.COUNTRY_CODE):]
+        if not digits.isascii() or not digits.isdigit() or len(digits) > Phone.DIGITS:
+            raise ValueError(f"Phone prefix must be 1 to 10 digits, got: '{prefix}'")
+        scale = 10 ** (Phone.DIGITS - len(digits))
+        return int(digits) * scale, (int(digits) + 1) * scale
+
+    @classmethod
+    def from_packed(cls, packed: int) -> "Phone":
+        """Wrap an already validated packed phone without re-parsing it."""
+        phone = cls.__new__(cls)
+        phone._value = packed
+        return phone
+
+    def _validate(self, value: str):
+        return Phone.pack(value)
+
+    def __int__(self):
+        return self._value
 
     def __eq__(self, other):
         if isinstance(other, Phone):
-            return self.value == other.value
+            return self._value == other._value
         return NotImplemented
 
     def __hash__(self):
-        return hash(self.value)
+        return hash(self._value)
 
 
 class Birthday(Field):
+    __slots__ = ()
     DATE_FORMAT = "%d.%m.%Y"
 
     def _validate(self, value):
@@ -57,96 +134,336 @@ class Birthday(Field):
             raise ValueError(f"Birthday cannot be in the future: '{value}'.")
         return birthday
 
+    @classmethod
+    def from_date(cls, date: datetime.date) -> "Birthday":
+        """Wrap an already validated date without re-parsing it."""
+        birthday = cls.__new__(cls)
+        birthday._value = date
+        return birthday
+
     def __str__(self):
         return self._value.strftime(Birthday.DATE_FORMAT)
 
 
+class Tag(Field):
+    """A lower-cased label such as 'vip' or 'kyiv-office'."""
+
+    __slots__ = ()
+    PATTERN = re.compile(r"^[a-z0-9_-]{1,32}$")
+    RESERVED = ("and", "or", "not")
+
+    def _validate(self, value):
+        tag = value.lower() if isinstance(value, str) else ""
+        if not Tag.PATTERN.match(tag) or tag in Tag.RESERVED:
+            raise ValueError(
+                f"Invalid tag '{value}'. Use up to 32 letters, digits, '-' or '_' (not and/or/not)."
+            )
+        return tag
+
+
 class Record:
     def __init__(self, name):
         self.name = Name(name)
         self.phones = set()
         self.birthday = None
+        self.tags = set()
+        self.version = 0  # bumped once by every mutator call, see check_version
+        self._feed = None  # owning book's ChangeFeed, set by AddressBook.add_record
+
+    def copy(self):
+        """A detached copy with the same fields and version, owned by no book."""
+        record = Record(self.name.value)
+        record.phones = set(self.phones)
+        record.birthday = self.birthday
+        record.tags = set(self.tags)
+        record.version = self.version
+        return record
+
+    def _notify(self, kind, old=None, new=None, bump=True):
+        """Report one change; mutators that emit several pass bump=False after
+        the first, so each call raises the version by exactly one."""
+        if bump:
+            self.version += 1
+        feed = self._feed
+        if feed is not None and feed.active:
+            feed.emit(Change(kind, self, old, new, bump))
+
+    def check_version(self, expected):
+        """Raise VersionConflict unless the record is still at `expected`.
+        None skips the check, so conditional mutators stay unconditional by default."""
+        if expected is not None and expected != self.version:
+            raise VersionConflict(
+                f"Contact '{self.name.value}' was changed (version {self.version}, "
+                f"expected {expected}). Read it again and retry."
+            )
 
     def add_phone(self, phone):
         if self.find_phone(phone):
             raise ValueError(f"Phone {phone} already exists for this contact.")
-        self.phones.add(Phone(phone))
+        phone_obj = Phone(phone)
+        self.phones.add(phone_obj)
+        self._notify(ChangeKind.PHONE_ADDED, new=phone_obj)
 
     def set_phone(self, phone):
-        self.phones.clear()
-        self.add_phone(phone)
+        new_obj = Phone(phone)  # validate before dropping the old phones
+        bump = True
+        for phone_obj in list(self.phones):
+            self.phones.discard(phone_obj)
+            self._notify(ChangeKind.PHONE_REMOVED, old=phone_obj, bump=bump)
+            bump = False
+        self.phones.add(new_obj)
+        self._notify(ChangeKind.PHONE_ADDED, new=new_obj, bump=bump)
 
     def remove_phone(self, phone):
         phone_obj = self.find_phone(phone)
         if phone_obj is None:
             raise ValueError(f"Phone {phone} not found in record")
         self.phones.discard(phone_obj)
+        self._notify(ChangeKind.PHONE_REMOVED, old=phone_obj)
 
-    def edit_phone(self, old_phone, new_phone):
+    def edit_phone(self, old_phone, new_phone, expected_version=None):
         """Replace old_phone with new_phone. Returns True if new_phone already
         existed (phones merged), False if it was a regular update."""
+        self.check_version(expected_version)
         phone_obj = self.find_phone(old_phone)
         if phone_obj is None:
             raise ValueError(f"Phone {old_phone} not found in record")
         merged = self.find_phone(new_phone) is not None
+        new_obj = None if merged else Phone(new_phone)
         self.phones.discard(phone_obj)
-        if not merged:
-            self.phones.add(Phone(new_phone))
+        self._notify(ChangeKind.PHONE_REMOVED, old=phone_obj)
+        if new_obj is not None:
+            self.phones.add(new_obj)
+            self._notify(ChangeKind.PHONE_ADDED, new=new_obj, bump=False)
         return merged
 
     def find_phone(self, phone):
-        return next((p for p in self.phones if p.value == phone), None)
-
-    def add_birthday(self, birthday):
-        self.birthday = Birthday(birthday)
+        try:
+            key = Phone.pack(phone)
+        except ValueError:
+            return None
+        return next((p for p in self.phones if p._value == key), None)
+
+    def add_birthday(self, birthday, expected_version=None):
+        self.check_version(expected_version)
+        old, self.birthday = self.birthday, Birthday(birthday)
+        self._notify(ChangeKind.BIRTHDAY_SET, old=old, new=self.birthday)
+
+    def add_tag(self, tag):
+        tag = Tag(tag).value
+        if tag in self.tags:
+            raise ValueError(f"Tag {tag} already set for this contact.")
+        self.tags.add(tag)
+        self._notify(ChangeKind.TAG_ADDED, new=tag)
+
+    def remove_tag(self, tag):
+        tag = Tag(tag).value
+        if tag not in self.tags:
+            raise ValueError(f"Tag {tag} not found in record")
+        self.tags.discard(tag)
+        self._notify(ChangeKind.TAG_REMOVED, old=tag)
 
     def __str__(self):
         phones = "; ".join(sorted(p.value for p in self.phones)) or "—"
         birthday = f", birthday: {self.birthday}" if self.birthday else ""
-        return f"Contact name: {self.name.value}, phones: {phones}{birthday}"
+        tags = f", tags: {', '.join(sorted(self.tags))}" if self.tags else ""
+        return f"Contact name: {self.name.value}, phones: {phones}{birthday}{tags}"
 
 
 class AddressBook(UserDict):
+    """Records keyed by display name in `data`, plus `_index` mapping each
+    Name.key to its record so lookups ignore case and Unicode form."""
+
+    def __init__(self, *args, **kwargs):
+        self.changes = ChangeFeed()
+        self._index = {}
+        self.indexes = {}  # optional derived structures by name, see models.indexes
+        super().__init__(*args, **kwargs)
+
     def add_record(self, record):
+        """Add the record, replacing any record whose name has the same key.
+        A replaced record is reported as deleted before the new one is added."""
+        key = Name.key(record.name.value)
+        existing = self._index.get(key)
+        if existing is record:
+            return
+        if existing is not None:
+            self.delete(existing.name.value)
         self.data[record.name.value] = record
+        self._index[key] = record
+        record._feed = self.changes
+        if self.changes.active:
+            self.changes.emit(Change(ChangeKind.RECORD_ADDED, record, new=RecordState.of(record)))
+
+    def __setitem__(self, name, record):
+        """`book[name] = record` (and update/setdefault/the constructor) go
+        through add_record, so `_index`, the change feed and indexes stay in step."""
+        if Name.key(name) != Name.key(record.name.value):
+            raise ValueError(f"Cannot store contact '{record.name.value}' under the name '{name}'.")
+        self.add_record(record)
+
+    def __delitem__(self, name):
+        if self.find(name) is None:
+            raise KeyError(name)
+        self.delete(name)
+
+    def __getitem__(self, name):
+        record = self.find(name)
+        if record is None:
+            raise KeyError(name)
+        return record
+
+    def __contains__(self, name):
+        return isinstance(name, str) and self.find(name) is not None
+
+    def copy(self):
+        """A new book holding copies of the records, with its own index and
+        change feed; derived indexes are not copied."""
+        book = type(self)()
+        for record in self.data.values():
+            book.add_record(record.copy())
+        return book
 
     def find(self, name):
-        return self.data.get(name)
+        return self._index.get(Name.key(name))
 
     def delete(self, name):
-        if name in self.data:
-            del self.data[name]
+        record = self._index.pop(Name.key(name), None)
+        if record is not None:
+            del self.data[record.name.value]
+            self._detach(record)
+            if self.changes.active:
+                self.changes.emit(Change(ChangeKind.RECORD_DELETED, record, old=RecordState.of(record)))
+
+    @contextmanager
+    def bulk(self):
+        """Apply many mutations as one batch.
+
+        Subscribers to `changes` are notified once the block exits cleanly
+        (batched subscribers get a single batch), so derived state is merged
+        once instead of per row. If the block raises — e.g. a validation
+        error from add_phone — every mutation made on records in this book
+        is undone and the exception propagates. Nested blocks join the
+        outer batch.
+        """
+        if self.changes.in_batch:
+            yield self
+            return
+        self.changes.begin()
+        try:
+            yield self
+        except BaseException:
+            self._undo(self.changes.rollback())
+            raise
+        self.changes.commit()
+
+    def _undo(self, journal):
+        for change in reversed(journal):
+            record = change.record
+            if change.bumped:
+                record.version -= 1
+            if change.kind is ChangeKind.RECORD_ADDED:
+                del self.data[record.name.value]
+                del self._index[Name.key(record.name.value)]
+                self._detach(record)
+            elif change.kind is ChangeKind.RECORD_DELETED:
+                self.data[record.name.value] = record
+                self._index[Name.key(record.name.value)] = record
+                record._feed = self.changes
+            elif change.kind is ChangeKind.PHONE_ADDED:
+                record.phones.discard(change.new)
+            elif change.kind is ChangeKind.PHONE_REMOVED:
+                record.phones.add(change.old)
+            elif change.kind is ChangeKind.BIRTHDAY_SET:
+                record.birthday = change.old
+            elif change.kind is ChangeKind.TAG_ADDED:
+                record.tags.discard(change.new)
+            elif change.kind is ChangeKind.TAG_REMOVED:
+                record.tags.add(change.old)
+
+    def _detach(self, record):
+        if record._feed is self.changes:
+            record._feed = None
+
+    UPCOMING_DAYS = 7  # default window: today and the next 6 days
+
+    def get_upcoming_birthdays(self, days: int = UPCOMING_DAYS, limit: int = None, today: datetime.date = None):
+        """Contacts whose next birthday falls within `days` days from today,
+        soonest congratulation date first, at most `limit` of them."""
+        return [self.item_entry(item) for item in self.upcoming_items(days, limit, today)]
+
+    def upcoming_items(self, days: int = UPCOMING_DAYS, limit: int = None, today: datetime.date = None) -> list:
+        """Sorted upcoming_item tuples behind get_upcoming_birthdays.
+
+        With a BirthdayCalendar index (models.indexes) the calendar is walked
+        from today and the walk stops once `limit` contacts are found.
+        Otherwise the book is scanned once and heapq keeps the `limit`
+        soonest, so the whole book is never sorted.
+        """
+        today = today or datetime.date.today()
+        calendar = self.indexes.get("birthdays")  # models.indexes.BirthdayCalendar
+        if calendar is not None:
+            return calendar.upcoming_items(today, days, limit)
+        return self.soonest(
+            (
+                self.upcoming_item(record.name.value, record.birthday.value, today, days)
+                for record in self.data.values()
+                if record.birthday is not None
+            ),
+            limit,
+        )
 
-    def get_upcoming_birthdays(self):
-        today = datetime.date.today()
-        upcoming = []
-        for record in self.data.values():
-            if record.birthday is None:
-                continue
-            birthday = record.birthday.value
-            birthday_this_year = self._birthday_in_year(birthday, today.year)
-
-            if birthday_this_year < today:
-                birthday_this_year = self._birthday_in_year(birthday, today.year + 1)
-
-            days_until = (birthday_this_year - today).days
-            if 0 <= days_until <= 6:
-                birthday_str = birthday.strftime(Birthday.DATE_FORMAT)
-                weekday = birthday_this_year.weekday()
-                if weekday == 5:
-                    birthday_this_year += datetime.timedelta(days=2)
-                elif weekday == 6:
-                    birthday_this_year += datetime.timedelta(days=1)
-                upcoming.append(
-                    {
-                        "name": record.name.value,
-                        "birthday": birthday_str,
-                        "congratulation_date": birthday_this_year.strftime(
-                            Birthday.DATE_FORMAT
-                        ),
-                    }
-                )
-        return upcoming
+    @staticmethod
+    def soonest(items, limit: int = None) -> list:
+        """The `limit` smallest upcoming items (all if None) in order, skipping Nones."""
+        items = (item for item in items if item is not None)
+        return heapq.nsmallest(limit, items) if limit is not None else sorted(items)
+
+    @classmethod
+    def upcoming_item(cls, name: str, birthday: datetime.date, today: datetime.date, days: int = UPCOMING_DAYS):
+        """(congratulation date, anniversary, name, birthday) for one contact,
+        or None if the next anniversary is `days` or more days away. Tuples
+        sort in the order get_upcoming_birthdays returns them."""
+        anniversary = cls.next_anniversary(birthday, today)
+        if (anniversary - today).days >= days:
+            return None
+        return cls.congratulation_date(anniversary), anniversary, name, birthday
+
+    @staticmethod
+    def item_entry(item) -> dict:
+        """The get_upcoming_birthdays entry for an upcoming_item tuple; built
+        only for the items that are returned."""
+        congratulation, _, name, birthday = item
+        return {
+            "name": name,
+            "birthday": birthday.strftime(Birthday.DATE_FORMAT),
+            "congratulation_date": congratulation.strftime(Birthday.DATE_FORMAT),
+        }
+
+    @classmethod
+    def upcoming_entry(cls, name: str, birthday: datetime.date, today: datetime.date, days: int = UPCOMING_DAYS):
+        """Return the get_upcoming_birthdays entry for one contact, or None
+        if the next anniversary is `days` or more days away."""
+        item = cls.upcoming_item(name, birthday, today, days)
+        return cls.item_entry(item) if item is not None else None
+
+    @classmethod
+    def next_anniversary(cls, birthday: datetime.date, today: datetime.date) -> datetime.date:
+        """Return the first anniversary of birthday on or after today."""
+        anniversary = cls._birthday_in_year(birthday, today.year)
+        if anniversary < today:
+            anniversary = cls._birthday_in_year(birthday, today.year + 1)
+        return anniversary
+
+    @staticmethod
+    def congratulation_date(anniversary: datetime.date) -> datetime.date:
+        """Saturday and Sunday anniversaries are congratulated on Monday."""
+        weekday = anniversary.weekday()
+        if weekday == 5:
+            return anniversary + datetime.timedelta(days=2)
+        if weekday == 6:
+            return anniversary + datetime.timedelta(days=1)
+        return anniversary
 
     @staticmethod
     def _birthday_in_year(birthday: datetime.date, year: int) -> datetime.date:
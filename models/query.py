@@ -0,0 +1,227 @@
+"""Predicates over records and a planner that picks an access path.
+
+A predicate is a space-separated list of conditions that must all hold
+(a literal "and" between them is allowed):
+
+    name:<prefix>                  name starts with prefix (case-insensitive)
+    phone:<digits>                 some phone starts with the digits
+    tag:<tag>                      has the tag
+    birthday:<month>               born in month 1-12
+    birthday:<DD.MM.YYYY>..<DD.MM.YYYY>   born in the range, either end optional
+    no-phone                       has no phones
+
+`plan(book, conditions)` asks every condition for an access path through an
+index the book already maintains (see models.indexes) with its estimated
+row count, and uses the smallest, or a full scan if none applies. The
+remaining conditions are checked on each candidate record, and so is the
+chosen one when its path only narrows the candidates (birthday ranges read
+whole calendar days, whatever the year).
+"""
+
+import datetime
+from typing import Callable, NamedTuple
+
+from models.indexes import BirthdayCalendar, BookStats, NameOrder, PhoneIndex, TagIndex
+from models.models import Birthday, Name, Phone, Tag
+
+
+class AccessPath(NamedTuple):
+    index: str
+    detail: str
+    estimate: int
+    records: Callable  # () -> iterable of candidate records
+    exact: bool = True  # False: the candidates still have to be checked against the condition
+
+
+class NamePrefix(NamedTuple):
+    prefix: str
+    key: str  # Name.key(prefix)
+
+    def matches(self, record) -> bool:
+        return Name.key(record.name.value).startswith(self.key)
+
+    def access(self, book):
+        order = book.indexes.get(NameOrder.NAME)
+        if order is None:
+            return None
+        return AccessPath(
+            NameOrder.NAME, f"names starting with '{self.prefix}'",
+            order.count(self.prefix, self.prefix), lambda: order.records(self.prefix, self.prefix),
+        )
+
+    def __str__(self):
+        return f"name:{self.prefix}"
+
+
+class PhonePrefix(NamedTuple):
+    prefix: str
+    low: int  # packed phones in [low, high) start with the prefix
+    high: int
+
+    def matches(self, record) -> bool:
+        return any(self.low <= int(phone) < self.high for phone in list(record.phones))
+
+    def access(self, book):
+        index = book.indexes.get(PhoneIndex.NAME)
+        if index is None:
+            return None
+        return AccessPath(
+            PhoneIndex.NAME, f"phones starting with {self.prefix}", index.count(self.prefix),
+            lambda: dict.fromkeys(record for _, record in index.with_prefix(self.prefix)),
+        )
+
+    def __str__(self):
+        return f"phone:{self.prefix}"
+
+
+class HasTag(NamedTuple):
+    tag: str
+
+    def matches(self, record) -> bool:
+        return self.tag in record.tags
+
+    def access(self, book):
+        index = book.indexes.get(TagIndex.NAME)
+        if index is None:
+            return None
+        return AccessPath(
+            TagIndex.NAME, f"bitmap of tag '{self.tag}'", index.count(self.tag), lambda: index.query(self.tag),
+        )
+
+    def __str__(self):
+        return f"tag:{self.tag}"
+
+
+class BirthMonth(NamedTuple):
+    month: int
+
+    def matches(self, record) -> bool:
+        return record.birthday is not None and record.birthday.value.month == self.month
+
+    def access(self, book):
+        index = book.indexes.get(BirthdayCalendar.NAME)
+        if index is None:
+            return None
+        month_days = BirthdayCalendar.month_days(self.month)
+        stats = book.indexes.get(BookStats.NAME)
+        estimate = stats.birth_months[self.month] if stats is not None else index.count(month_days)
+        return AccessPath(
+            BirthdayCalendar.NAME, f"birthdays in month {self.month}", estimate, lambda: index.records(month_days),
+        )
+
+    def __str__(self):
+        return f"birthday:{self.month}"
+
+
+class BirthRange(NamedTuple):
+    start: datetime.date = None
+    end: datetime.date = None
+
+    def matches(self, record) -> bool:
+        if record.birthday is None:
+            return False
+        born = record.birthday.value
+        return (self.start is None or born >= self.start) and (self.end is None or born <= self.end)
+
+    def access(self, book):
+        index = book.indexes.get(BirthdayCalendar.NAME)
+        if index is None:
+            return None
+        calendar_days = BirthdayCalendar.days_between(self.start, self.end)
+        return AccessPath(
+            BirthdayCalendar.NAME, f"birthdays on {len(calendar_days)} calendar day(s)",
+            index.count(calendar_days), lambda: index.records(calendar_days), exact=False,
+        )
+
+    def __str__(self):
+        start = self.start.strftime(Birthday.DATE_FORMAT) if self.start else ""
+        end = self.end.strftime(Birthday.DATE_FORMAT) if self.end else ""
+        return f"birthday:{start}..{end}"
+
+
+class NoPhone(NamedTuple):
+    def matches(self, record) -> bool:
+        return not record.phones
+
+    def access(self, book):
+        return None
+
+    def __str__(self):
+        return "no-phone"
+
+
+def _date(text: str, term: str):
+    if not text:
+        return None
+    try:
+        return datetime.datetime.strptime(text, Birthday.DATE_FORMAT).date()
+    except ValueError:
+        raise ValueError(f"Invalid date in '{term}'. Use DD.MM.YYYY.")
+
+
+def _birthday(value: str, term: str):
+    if ".." in value:
+        start, end = value.split("..", 1)
+        return BirthRange(_date(start, term), _date(end, term))
+    if value.isdigit() and 1 <= int(value) <= 12:
+        return BirthMonth(int(value))
+    raise ValueError(f"Invalid birthday condition '{term}'. Use a month 1-12 or DD.MM.YYYY..DD.MM.YYYY.")
+
+
+def parse_predicate(terms) -> list:
+    """Turn condition terms (e.g. ["name:al", "and", "no-phone"]) into conditions."""
+    conditions = []
+    for term in terms:
+        field, _, value = term.partition(":")
+        field = field.lower()
+        if field == "and":
+            continue
+        if field == "no-phone" and not value:
+            conditions.append(NoPhone())
+        elif field == "name" and value:
+            conditions.append(NamePrefix(value, Name.key(value)))
+        elif field == "phone" and value:
+            conditions.append(PhonePrefix(value, *Phone.prefix_range(value)))
+        elif field == "tag" and value:
+            conditions.append(HasTag(Tag(value).value))
+        elif field == "birthday" and value:
+            conditions.append(_birthday(value, term))
+        else:
+            raise ValueError(
+                f"Unknown condition '{term}'. Use name:, phone:, tag:, birthday: or no-phone."
+            )
+    if not conditions:
+        raise ValueError("The predicate has no conditions.")
+    return conditions
+
+
+class Plan(NamedTuple):
+    path: AccessPath
+    filters: tuple  # conditions checked on every candidate
+    candidates: tuple  # every access path considered, the scan included
+
+    def records(self) -> list:
+        """Matching records, materialized so callers may mutate the book while using them."""
+        filters = self.filters
+        return [r for r in self.path.records() if all(c.matches(r) for c in filters)]
+
+    def explain(self) -> list[tuple[str, str, int, str]]:
+        """(index, detail, estimated rows, "chosen" or "") for every candidate path."""
+        return [
+            (path.index, path.detail, path.estimate, "chosen" if path is self.path else "")
+            for path in self.candidates
+        ]
+
+
+def plan(book, conditions) -> Plan:
+    """Pick the access path with the fewest estimated rows."""
+    scan = AccessPath("scan", "every record", len(book.data), lambda: list(book.data.values()))
+    candidates = [(scan, None)]
+    for condition in conditions:
+        path = condition.access(book)
+        if path is not None:
+            candidates.append((path, condition if path.exact else None))
+    # on a tie an exact index beats the scan: it reads the same rows and skips a check
+    best, served = min(candidates, key=lambda c: (c[0].estimate, c[1] is None))
+    filters = tuple(c for c in conditions if c is not served)  # the index already applied its own
+    return Plan(best, filters, tuple(path for path, _ in candidates))
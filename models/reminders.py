@@ -0,0 +1,171 @@
+"""Birthday reminder scheduler.
+
+`BirthdayScheduler` keeps a min-heap of (congratulation date, record name)
+using the same anniversary and weekend rules as
+AddressBook.get_upcoming_birthdays. It listens to the book's change feed,
+so adding or changing a birthday is a single O(log N) push; stale heap
+entries are skipped when popped. The worker thread sleeps until the next
+due date, hands each reminder to a notifier and schedules next year's.
+
+A notifier is any callable taking the reminder dict
+({"name", "birthday", "congratulation_date"}); stdout, file and local-socket
+notifiers are provided.
+"""
+
+import datetime
+import heapq
+import itertools
+import json
+import socket
+import threading
+
+from models.events import ChangeKind
+from models.models import AddressBook, Birthday
+
+
+class StdoutNotifier:
+    def __call__(self, reminder: dict):
+        print(f"Reminder: congratulate {reminder['name']} today (birthday {reminder['birthday']}).")
+
+
+class FileNotifier:
+    """Appends one JSON line per reminder to `path`."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __call__(self, reminder: dict):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(reminder) + "\n")
+
+
+class SocketNotifier:
+    """Sends each reminder as a JSON datagram to a Unix domain socket."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+
+    def __call__(self, reminder: dict):
+        try:
+            self._socket.sendto(json.dumps(reminder).encode("utf-8"), self.path)
+        except OSError:
+            pass  # nobody listening — a reminder must never crash the bot
+
+
+def make_notifier(spec: str):
+    """Build a notifier from 'stdout', 'file:<path>' or 'socket:<path>'."""
+    kind, _, target = spec.partition(":")
+    if kind == "stdout":
+        return StdoutNotifier()
+    if kind == "file" and target:
+        return FileNotifier(target)
+    if kind == "socket" and target:
+        return SocketNotifier(target)
+    raise ValueError(f"Unknown notifier '{spec}'. Use stdout, file:<path> or socket:<path>.")
+
+
+class BirthdayScheduler:
+    def __init__(self, book, notifier, today=datetime.date.today):
+        self.book = book
+        self.notifier = notifier
+        self._today = today
+        self._heap = []  # (congratulation date, seq, name, anniversary, birth date)
+        self._live = {}  # name -> seq of its current heap entry
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        today_ = today()
+        for record in book.data.values():
+            if record.birthday is not None:
+                self._push(record.name.value, record.birthday.value, today_, defer_heapify=True)
+        heapq.heapify(self._heap)
+        book.changes.subscribe(self._on_change)
+
+    def _push(self, name, birthday, after: datetime.date, defer_heapify=False):
+        anniversary = AddressBook.next_anniversary(birthday, after)
+        seq = next(self._seq)
+        self._live[name] = seq
+        entry = (AddressBook.congratulation_date(anniversary), seq, name, anniversary, birthday)
+        if defer_heapify:
+            self._heap.append(entry)
+        else:
+            heapq.heappush(self._heap, entry)
+        return entry[0]
+
+    def _on_change(self, change):
+        name = change.record.name.value
+        with self._lock:
+            if change.kind is ChangeKind.RECORD_DELETED:
+                self._live.pop(name, None)
+                return
+            if change.kind is ChangeKind.RECORD_ADDED:
+                birthday = change.new.birthday
+            elif change.kind is ChangeKind.BIRTHDAY_SET:
+                birthday = change.new
+            else:
+                return
+            if birthday is None:
+                return
+            head = self._heap[0][0] if self._heap else None
+            due = self._push(name, birthday.value, self._today())
+        if head is None or due < head:
+            self._wake.set()  # the sleeping worker must re-check its deadline
+
+    def _pop_stale(self):
+        while self._heap and self._live.get(self._heap[0][2]) != self._heap[0][1]:
+            heapq.heappop(self._heap)
+
+    def next_due(self):
+        """Return the earliest pending congratulation date, or None."""
+        with self._lock:
+            self._pop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def fire_due(self) -> list[dict]:
+        """Notify every reminder due today or earlier and reschedule it a year on."""
+        today = self._today()
+        fired = []
+        with self._lock:
+            self._pop_stale()
+            while self._heap and self._heap[0][0] <= today:
+                # the entry carries the birth date: inside a bulk() batch the record
+                # may already be gone from the book before its deletion reaches us
+                _, _, name, anniversary, birthday = heapq.heappop(self._heap)
+                fired.append({
+                    "name": name,
+                    "birthday": birthday.strftime(Birthday.DATE_FORMAT),
+                    "congratulation_date": today.strftime(Birthday.DATE_FORMAT),
+                })
+                self._push(name, birthday, anniversary + datetime.timedelta(days=1))
+                self._pop_stale()
+        for reminder in fired:
+            self.notifier(reminder)
+        return fired
+
+    def _seconds_until(self, day: datetime.date) -> float:
+        start = datetime.datetime.combine(day, datetime.time())
+        return max(0.0, (start - datetime.datetime.now()).total_seconds())
+
+    def run(self):
+        """Sleep until the next due date, fire, repeat — until stop()."""
+        while not self._stopped.is_set():
+            self.fire_due()
+            due = self.next_due()
+            timeout = self._seconds_until(due) if due is not None else None
+            self._wake.wait(timeout)
+            self._wake.clear()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="birthday-reminders", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.book.changes.unsubscribe(self._on_change)
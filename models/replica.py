@@ -0,0 +1,318 @@
+"""Read-only AddressBook replicas in shared memory.
+
+`ReplicaPublisher` writes an immutable image of a book into a new
+`multiprocessing.shared_memory` segment per generation, then bumps the
+generation number in a small control segment. `ReplicaReader` in any local
+process attaches to the current generation and answers `find` and
+`get_upcoming_birthdays` straight from the mapped bytes — nothing is
+unpickled and only the requested record is decoded. Readers check the
+control segment on every call and swap to a newer generation atomically.
+
+Image layout (all sections 8-byte aligned, little-endian):
+    header        magic, generation, records N, phones M, names blob size
+    records       N × (name offset u32, name length u32, birthday ordinal i32
+                  or 0, first phone u32, phone count u32, version u64), in
+                  insertion order
+    name hashes   N × u64 hash of Name.key, sorted, with N × u32 record ids
+    phones        M × i64 packed phones, grouped by record
+    phone index   M × i64 sorted phones, with M × u32 record ids
+    names         UTF-8 display names
+"""
+
+from array import array
+from bisect import bisect_left
+import datetime
+import hashlib
+from multiprocessing import resource_tracker, shared_memory
+import struct
+import threading
+
+from models.models import AddressBook, Birthday, Name, Phone
+
+MAGIC = b"ABREPL2\0"
+HEADER = struct.Struct("<8sQQQQ")
+RECORD = struct.Struct("<IIiIIQ")
+CONTROL = struct.Struct("<Q")
+
+
+def _name_hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def _layout(n: int, m: int, blob: int) -> dict:
+    """Byte offsets of every section for N records, M phones, `blob` name bytes."""
+    offsets = {"records": _align(HEADER.size)}
+    offsets["hashes"] = _align(offsets["records"] + n * RECORD.size)
+    offsets["hash_ids"] = offsets["hashes"] + 8 * n
+    offsets["phones"] = _align(offsets["hash_ids"] + 4 * n)
+    offsets["phone_index"] = offsets["phones"] + 8 * m
+    offsets["phone_ids"] = offsets["phone_index"] + 8 * m
+    offsets["names"] = _align(offsets["phone_ids"] + 4 * m)
+    offsets["end"] = offsets["names"] + blob
+    return offsets
+
+
+_attach_lock = threading.Lock()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach without letting this process's resource tracker unlink the segment on exit."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13 has no track argument: skip registering this one name
+        with _attach_lock:
+            register = resource_tracker.register
+
+            def register_others(rname, rtype):
+                if rname.lstrip("/") != name:
+                    register(rname, rtype)
+
+            resource_tracker.register = register_others
+            try:
+                return shared_memory.SharedMemory(name=name)
+            finally:
+                resource_tracker.register = register
+
+
+def build_image(records, generation: int) -> bytes:
+    """Serialize `records` (in book order) into the replica image format."""
+    table = bytearray()
+    blob = bytearray()
+    phones = array("q")
+    owners = []
+    hashed = []
+    for i, record in enumerate(records):
+        name = record.name.value.encode("utf-8")
+        record_phones = sorted(int(p) for p in list(record.phones))
+        birthday = record.birthday
+        table += RECORD.pack(
+            len(blob), len(name), birthday.value.toordinal() if birthday is not None else 0,
+            len(phones), len(record_phones), record.version,
+        )
+        blob += name
+        phones.extend(record_phones)
+        owners.extend([i] * len(record_phones))
+        hashed.append((_name_hash(Name.key(record.name.value)), i))
+
+    n, m = len(hashed), len(phones)
+    hashed.sort()
+    by_phone = sorted(zip(phones, owners))
+    offsets = _layout(n, m, len(blob))
+    image = bytearray(offsets["end"])
+    HEADER.pack_into(image, 0, MAGIC, generation, n, m, len(blob))
+    image[offsets["records"]:offsets["records"] + len(table)] = table
+    image[offsets["hashes"]:offsets["hash_ids"]] = array("Q", (h for h, _ in hashed)).tobytes()
+    image[offsets["hash_ids"]:offsets["hash_ids"] + 4 * n] = array("I", (i for _, i in hashed)).tobytes()
+    image[offsets["phones"]:offsets["phone_index"]] = phones.tobytes()
+    image[offsets["phone_index"]:offsets["phone_ids"]] = array("q", (p for p, _ in by_phone)).tobytes()
+    image[offsets["phone_ids"]:offsets["phone_ids"] + 4 * m] = array("I", (i for _, i in by_phone)).tobytes()
+    image[offsets["names"]:offsets["end"]] = blob
+    return bytes(image)
+
+
+class ReplicaPublisher:
+    """Publishes `book` under `name`; republishes when it changed.
+
+    Call `publish()` directly, or `start()` a thread that republishes at
+    most every `interval` seconds while the book is dirty. Every committed
+    `book.bulk()` batch is published immediately.
+    """
+
+    def __init__(self, book, name: str, interval: float = 1.0):
+        self.book = book
+        self.name = name
+        self.interval = interval
+        self.generation = 0
+        self._segment = None
+        self._control = shared_memory.SharedMemory(name=name, create=True, size=CONTROL.size)
+        CONTROL.pack_into(self._control.buf, 0, 0)
+        self._dirty = True
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+        book.changes.subscribe(self._on_change, on_commit=self._on_commit)
+
+    def _on_change(self, change):
+        self._dirty = True
+
+    def _on_commit(self, changes):
+        self.publish()
+
+    def publish(self):
+        """Write a new generation and switch readers to it."""
+        with self._lock:
+            self._dirty = False
+            generation = self.generation + 1
+            image = build_image(list(self.book.data.values()), generation)
+            segment = shared_memory.SharedMemory(
+                name=f"{self.name}-g{generation}", create=True, size=max(len(image), 1)
+            )
+            segment.buf[:len(image)] = image
+            CONTROL.pack_into(self._control.buf, 0, generation)
+            old, self._segment, self.generation = self._segment, segment, generation
+            if old is not None:
+                # Readers that already mapped it keep their mapping; new ones see the new generation.
+                old.close()
+                old.unlink()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            if self._dirty:
+                self.publish()
+
+    def start(self):
+        """Publish now, then keep republishing from a background thread."""
+        self.publish()
+        self._thread = threading.Thread(target=self._run, name="replica-publisher", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.book.changes.unsubscribe(self._on_change)
+        with self._lock:
+            for segment in (self._segment, self._control):
+                if segment is not None:
+                    segment.close()
+                    segment.unlink()
+            self._segment = self._control = None
+
+
+class ReplicaRecord:
+    """One record decoded from a replica image; read-only."""
+
+    def __init__(self, name: str, phones, birthday, version: int = 0):
+        self.name = Name(name)
+        self.version = version
+        self.phones = [Phone.from_packed(p) for p in phones]
+        self.birthday = Birthday.from_date(birthday) if birthday is not None else None
+
+    def find_phone(self, phone):
+        try:
+            key = Phone.pack(phone)
+        except ValueError:
+            return None
+        return next((p for p in self.phones if int(p) == key), None)
+
+    def __str__(self):
+        phones = "; ".join(sorted(p.value for p in self.phones)) or "—"
+        birthday = f", birthday: {self.birthday}" if self.birthday else ""
+        return f"Contact name: {self.name.value}, phones: {phones}{birthday}"
+
+
+class ReplicaReader:
+    """Attaches to a published replica and serves read-only lookups."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._control = _attach(name)
+        self._segment = None
+        self.generation = None
+        self.refresh()
+
+    def refresh(self):
+        """Swap to the newest generation if the publisher moved on."""
+        while True:
+            generation = CONTROL.unpack_from(self._control.buf, 0)[0]
+            if generation == self.generation:
+                return
+            if generation == 0:
+                raise ValueError(f"Replica '{self.name}' has not been published yet.")
+            try:
+                segment = _attach(f"{self.name}-g{generation}")
+            except FileNotFoundError:
+                continue  # replaced while we were attaching; read the control block again
+            self._release()
+            self._segment, self.generation = segment, generation
+            self._map()
+            return
+
+    def _map(self):
+        buf = self._segment.buf
+        magic, _, n, m, blob = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Replica '{self.name}' is not an address book image.")
+        self._n, self._m = n, m
+        self._offsets = _layout(n, m, blob)
+        o = self._offsets
+        self._hashes = buf[o["hashes"]:o["hash_ids"]].cast("Q")
+        self._hash_ids = buf[o["hash_ids"]:o["hash_ids"] + 4 * n].cast("I")
+        self._phones = buf[o["phones"]:o["phone_index"]].cast("q")
+        self._phone_index = buf[o["phone_index"]:o["phone_ids"]].cast("q")
+        self._phone_ids = buf[o["phone_ids"]:o["phone_ids"] + 4 * m].cast("I")
+
+    def _release(self):
+        if self._segment is None:
+            return
+        for view in (self._hashes, self._hash_ids, self._phones, self._phone_index, self._phone_ids):
+            view.release()
+        self._segment.close()
+        self._segment = None
+
+    def _entry(self, i: int):
+        return RECORD.unpack_from(self._segment.buf, self._offsets["records"] + i * RECORD.size)
+
+    def _name(self, entry) -> str:
+        start = self._offsets["names"] + entry[0]
+        return bytes(self._segment.buf[start:start + entry[1]]).decode("utf-8")
+
+    def _record(self, i: int) -> ReplicaRecord:
+        entry = self._entry(i)
+        birthday = datetime.date.fromordinal(entry[2]) if entry[2] else None
+        return ReplicaRecord(self._name(entry), self._phones[entry[3]:entry[3] + entry[4]], birthday, entry[5])
+
+    def __len__(self):
+        self.refresh()
+        return self._n
+
+    def find(self, name: str):
+        self.refresh()
+        key = Name.key(name)
+        h = _name_hash(key)
+        i = bisect_left(self._hashes, h)
+        while i < self._n and self._hashes[i] == h:
+            record_id = self._hash_ids[i]
+            if Name.key(self._name(self._entry(record_id))) == key:
+                return self._record(record_id)
+            i += 1
+        return None
+
+    def find_by_phone(self, phone: str) -> list:
+        """Return every record owning `phone` (reverse lookup for caller ID)."""
+        self.refresh()
+        key = Phone.pack(phone)
+        i = bisect_left(self._phone_index, key)
+        found = []
+        while i < self._m and self._phone_index[i] == key:
+            found.append(self._record(self._phone_ids[i]))
+            i += 1
+        return found
+
+    def get_upcoming_birthdays(self, days: int = AddressBook.UPCOMING_DAYS, limit: int = None, today=None):
+        self.refresh()
+        today = today or datetime.date.today()
+        entries = (self._entry(i) for i in range(self._n))
+        items = AddressBook.soonest(
+            (
+                AddressBook.upcoming_item(self._name(entry), datetime.date.fromordinal(entry[2]), today, days)
+                for entry in entries
+                if entry[2]
+            ),
+            limit,
+        )
+        return [AddressBook.item_entry(item) for item in items]
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        raise ValueError(f"'{attr}' is not available on a read-only replica.")
+
+    def close(self):
+        self._release()
+        self._control.close()
@@ -0,0 +1,228 @@
+"""AddressBook partitioned across worker processes.
+
+`ShardedBook` starts N worker processes, each owning a plain AddressBook,
+and routes every contact to shard `crc32(Name.key(name)) % N`. Point
+operations go to the owning shard only. Book-wide queries (`data`,
+`get_upcoming_birthdays`, `records_in_order`) are sent to all shards at
+once, run in parallel, and are merged back (by a global insertion sequence
+number, by date for birthdays, by Name.key for name order), so results come
+out in the same order a single AddressBook would give.
+
+`find` returns a ShardRecord: a local copy of the record whose mutators
+(add_phone, edit_phone, ...) run on the owning shard and then refresh the
+copy, so command handlers work unchanged. Conditional updates carry their
+expected version to the shard, where the check and the write run together.
+Features built on the change feed (indexes, bulk, persistence) are not
+available on a sharded book.
+"""
+
+import heapq
+import itertools
+import multiprocessing
+import zlib
+
+from models.indexes import NameOrder
+from models.models import AddressBook, Name
+from models.storage import record_from_dict, record_to_dict
+
+RECORD_MUTATORS = (
+    "add_phone", "set_phone", "remove_phone", "edit_phone", "add_birthday", "add_tag", "remove_tag",
+)
+
+
+def _serve(conn):
+    """Worker loop: one AddressBook, requests are (op, payload) tuples."""
+    book = AddressBook()
+    seqs = {}  # display name -> global sequence number
+
+    def state(record):
+        return seqs[record.name.value], record_to_dict(record)
+
+    while True:
+        op, payload = conn.recv()
+        if op == "stop":
+            conn.close()
+            return
+        try:
+            if op == "add":
+                for seq, data in payload:
+                    existing = book.find(data["name"])
+                    if existing is not None:
+                        del seqs[existing.name.value]
+                    book.add_record(record_from_dict(data))
+                    seqs[data["name"]] = seq
+                result = None
+            elif op == "find":
+                record = book.find(payload)
+                result = state(record) if record is not None else None
+            elif op == "delete":
+                record = book.find(payload)
+                if record is not None:
+                    del seqs[record.name.value]
+                    book.delete(payload)
+                result = None
+            elif op == "call":
+                name, method, args = payload
+                record = book.find(name)
+                if record is None:
+                    raise KeyError(f"Contact '{name}' doesn't exist.")
+                if method not in RECORD_MUTATORS:
+                    raise ValueError(f"Unsupported record operation '{method}'.")
+                result = (getattr(record, method)(*args), state(record))
+            elif op == "scan":
+                result = [state(record) for record in book.data.values()]
+            elif op == "ordered":
+                result = [
+                    ((Name.key(record.name.value), record.name.value), state(record))
+                    for record in NameOrder.for_book(book).records(*payload)
+                ]
+            elif op == "upcoming":
+                result = book.upcoming_items(*payload)
+            elif op == "len":
+                result = len(book.data)
+            else:
+                raise ValueError(f"Unknown shard operation '{op}'.")
+            conn.send(("ok", result))
+        except Exception as e:  # sent back and re-raised in the parent
+            conn.send(("err", e))
+
+
+class ShardRecord:
+    """Local copy of a record living in a shard; mutators are forwarded."""
+
+    def __init__(self, book, data: dict):
+        self._book = book
+        self._copy = record_from_dict(data)
+
+    def _forward(self, method, *args):
+        result, (_, data) = self._book._request_for(self._copy.name.value, "call", (self._copy.name.value, method, args))
+        self._copy = record_from_dict(data)
+        return result
+
+    def add_phone(self, phone):
+        return self._forward("add_phone", phone)
+
+    def set_phone(self, phone):
+        return self._forward("set_phone", phone)
+
+    def remove_phone(self, phone):
+        return self._forward("remove_phone", phone)
+
+    def edit_phone(self, old_phone, new_phone, expected_version=None):
+        return self._forward("edit_phone", old_phone, new_phone, expected_version)
+
+    def add_birthday(self, birthday, expected_version=None):
+        return self._forward("add_birthday", birthday, expected_version)
+
+    def add_tag(self, tag):
+        return self._forward("add_tag", tag)
+
+    def remove_tag(self, tag):
+        return self._forward("remove_tag", tag)
+
+    def __getattr__(self, attr):
+        return getattr(self._copy, attr)
+
+    def __str__(self):
+        return str(self._copy)
+
+
+class ShardedBook:
+    def __init__(self, shards: int = None):
+        self.shards = shards or multiprocessing.cpu_count()
+        self._seq = itertools.count()
+        self._conns = []
+        self._workers = []
+        for i in range(self.shards):
+            parent_conn, child_conn = multiprocessing.Pipe()
+            worker = multiprocessing.Process(target=_serve, args=(child_conn,), name=f"shard-{i}", daemon=True)
+            worker.start()
+            child_conn.close()
+            self._conns.append(parent_conn)
+            self._workers.append(worker)
+
+    def shard_of(self, name: str) -> int:
+        return zlib.crc32(Name.key(name).encode("utf-8")) % self.shards
+
+    @staticmethod
+    def _unwrap(reply):
+        status, result = reply
+        if status == "err":
+            raise result
+        return result
+
+    def _request_for(self, name: str, op: str, payload):
+        conn = self._conns[self.shard_of(name)]
+        conn.send((op, payload))
+        return self._unwrap(conn.recv())
+
+    def _scatter(self, op: str, payload=None) -> list:
+        for conn in self._conns:
+            conn.send((op, payload))
+        replies = [conn.recv() for conn in self._conns]  # shards work in parallel meanwhile
+        return [self._unwrap(reply) for reply in replies]
+
+    # Point operations
+
+    def add_record(self, record):
+        data = record_to_dict(record)
+        self._request_for(data["name"], "add", [(next(self._seq), data)])
+
+    def add_records(self, records):
+        """Add many records with one message per shard, all shards in parallel."""
+        batches = [[] for _ in range(self.shards)]
+        for record in records:
+            data = record_to_dict(record)
+            batches[self.shard_of(data["name"])].append((next(self._seq), data))
+        for conn, batch in zip(self._conns, batches):
+            conn.send(("add", batch))
+        for conn in self._conns:
+            self._unwrap(conn.recv())
+
+    def find(self, name):
+        found = self._request_for(name, "find", name)
+        return ShardRecord(self, found[1]) if found is not None else None
+
+    def delete(self, name):
+        self._request_for(name, "delete", name)
+
+    # Book-wide queries
+
+    @property
+    def data(self) -> dict:
+        """All records as {name: ShardRecord}, in insertion order."""
+        merged = heapq.merge(*self._scatter("scan"), key=lambda item: item[0])
+        return {data["name"]: ShardRecord(self, data) for _, data in merged}
+
+    def records_in_order(self, start: str = None, stop: str = None) -> list:
+        """NameOrder.records(start, stop) across shards: each shard returns its
+        range in name order and the sorted lists are merged."""
+        merged = heapq.merge(*self._scatter("ordered", (start, stop)), key=lambda item: item[0])
+        return [ShardRecord(self, data) for _, (_, data) in merged]
+
+    def get_upcoming_birthdays(self, days: int = AddressBook.UPCOMING_DAYS, limit: int = None, today=None):
+        """Each shard returns its own `limit` soonest; the sorted lists are merged."""
+        merged = heapq.merge(*self._scatter("upcoming", (days, limit, today)))
+        return [AddressBook.item_entry(item) for item in itertools.islice(merged, limit)]
+
+    def __len__(self):
+        return sum(self._scatter("len"))
+
+    def __str__(self):
+        return "\n".join(str(record) for record in self.data.values())
+
+    def __getattr__(self, attr):
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        raise ValueError(f"'{attr}' is not available on a sharded book.")
+
+    def close(self):
+        for conn, worker in zip(self._conns, self._workers):
+            try:
+                conn.send(("stop", None))
+            except OSError:
+                pass
+            worker.join(timeout=5)
+            conn.close()
+        self._conns = []
+        self._workers = []
@@ -0,0 +1,285 @@
+"""Persistence for AddressBook.
+
+A book is stored as an append-only JSON-lines journal: each line is either
+{"put": {record}} or {"del": name}, and later lines win on load. Only dirty
+records are appended, so a save costs O(changes), not O(book). `compact`
+rewrites the file as one "put" per record when the journal grows too long.
+
+`AutoSaver` does the appending on a background thread so saving never runs
+inside the REPL loop.
+
+For backups and copies between hosts, `save_snapshot`/`load_snapshot` use a
+compact binary format: records are written in independently compressed
+chunks followed by a chunk index, so loading can stream chunk by chunk and
+decompress several chunks in parallel with bounded memory.
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import json
+import lzma
+import os
+import struct
+import threading
+import zlib
+
+from models.models import AddressBook, Record
+
+
+def record_to_dict(record) -> dict:
+    # list() copies the set in one C-level step, so a concurrent add_phone on
+    # the REPL thread cannot break the iteration below.
+    phones = list(record.phones)
+    birthday = record.birthday
+    return {
+        "name": record.name.value,
+        "phones": sorted(p.value for p in phones),
+        "birthday": str(birthday) if birthday is not None else None,
+        "tags": sorted(list(record.tags)),
+        "version": record.version,
+    }
+
+
+def record_from_dict(data: dict) -> Record:
+    record = Record(data["name"])
+    for phone in data["phones"]:
+        record.add_phone(phone)
+    if data.get("birthday"):
+        record.add_birthday(data["birthday"])
+    for tag in data.get("tags", ()):
+        record.add_tag(tag)
+    record.version = data.get("version", 0)
+    return record
+
+
+def read_journal(path: str) -> tuple[dict, int]:
+    """Return ({name: record dict}, number of journal lines) for `path`."""
+    records = {}
+    lines = 0
+    if not os.path.exists(path):
+        return records, lines
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            lines += 1
+            entry = json.loads(line)
+            if "put" in entry:
+                records[entry["put"]["name"]] = entry["put"]
+            else:
+                records.pop(entry["del"], None)
+    return records, lines
+
+
+def load_journal(path: str) -> tuple[AddressBook, int]:
+    """Return (book, number of journal lines) for `path`; pass the count to
+    AutoSaver so it does not parse the journal a second time."""
+    book = AddressBook()
+    records, lines = read_journal(path)
+    for data in records.values():
+        book.add_record(record_from_dict(data))
+    return book, lines
+
+
+def load_book(path: str) -> AddressBook:
+    """Load a book from a journal file; a missing file gives an empty book."""
+    return load_journal(path)[0]
+
+
+def append_journal(book, path: str, names) -> int:
+    """Append the current state of each named record ("put", or "del" if it is
+    gone from `book`) to the journal at `path` with one fsync. Returns lines written."""
+    lines = []
+    for name in names:
+        record = book.data.get(name)
+        entry = {"del": name} if record is None else {"put": record_to_dict(record)}
+        lines.append(json.dumps(entry) + "\n")
+    if lines:
+        with open(path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+    return len(lines)
+
+
+def compact(book, path: str):
+    """Atomically rewrite `path` with one "put" line per record."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for record in list(book.data.values()):
+            f.write(json.dumps({"put": record_to_dict(record)}) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class AutoSaver:
+    """Background writer that appends dirty records to a journal file.
+
+    Subscribes to `book.changes` and only remembers which names changed.
+    A daemon thread flushes them every `interval` seconds, or sooner once
+    `max_pending` names are dirty, with one fsync per flush. Call `close()`
+    on shutdown to stop the thread and write whatever is still pending.
+    `journal_lines` is the line count from load_journal; without it the
+    journal is read again to count them.
+    """
+
+    def __init__(
+        self, book, path: str, interval: float = 5.0, max_pending: int = 100, journal_lines: int = None,
+    ):
+        self.book = book
+        self.path = path
+        self.interval = interval
+        self.max_pending = max_pending
+        self._dirty: set[str] = set()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._journal_lines = journal_lines if journal_lines is not None else read_journal(path)[1]
+        if self._journal_lines > 2 * len(book.data):
+            compact(book, path)
+            self._journal_lines = len(book.data)
+        book.changes.subscribe(self._on_change)
+        self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        return len(self._dirty)
+
+    def _on_change(self, change):
+        name = change.record.name.value
+        with self._lock:
+            self._dirty.add(name)
+            if len(self._dirty) >= self.max_pending:
+                self._wake.set()
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Append every dirty record (or its deletion) and fsync once."""
+        with self._write_lock:
+            with self._lock:
+                dirty, self._dirty = self._dirty, set()
+            if not dirty:
+                return
+            self._journal_lines += append_journal(self.book, self.path, dirty)
+
+    def close(self):
+        """Stop the writer thread and flush everything still pending."""
+        if self._stopped:
+            return
+        self._stopped = True
+        self._wake.set()
+        self._thread.join()
+        self.book.changes.unsubscribe(self._on_change)
+        self.flush()
+
+
+SNAPSHOT_MAGIC = b"ABSNAP1\n"
+_FOOTER = struct.Struct("<Q8s")  # index length, magic
+CODECS = {
+    "zlib": (lambda data: zlib.compress(data, 6), zlib.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+}
+_CORRUPT = (zlib.error, lzma.LZMAError, struct.error)  # raised by the codecs and the footer on damaged bytes
+
+
+def save_snapshot(book, path: str, chunk_size: int = 10_000, codec: str = "zlib"):
+    """Write `book` to `path` as compressed chunks of `chunk_size` records.
+
+    Layout: magic, chunks, JSON index ({"codec", "chunks": [[offset, length, count]]}),
+    then a footer with the index length and the magic again. Only one chunk
+    is held in memory at a time. The file is replaced atomically.
+    """
+    if codec not in CODECS:
+        raise ValueError(f"Unknown codec '{codec}'. Expected one of: {', '.join(CODECS)}.")
+    compress = CODECS[codec][0]
+    chunks = []
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        records = list(book.data.values())
+        for start in range(0, len(records), chunk_size):
+            batch = records[start:start + chunk_size]
+            payload = "\n".join(json.dumps(record_to_dict(r)) for r in batch).encode("utf-8")
+            data = compress(payload)
+            chunks.append([f.tell(), len(data), len(batch)])
+            f.write(data)
+        index = json.dumps({"codec": codec, "chunks": chunks}).encode("utf-8")
+        f.write(index)
+        f.write(_FOOTER.pack(len(index), SNAPSHOT_MAGIC))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_snapshot_index(f) -> dict:
+    f.seek(0)
+    if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+        raise ValueError("Not an address book snapshot.")
+    f.seek(-_FOOTER.size, os.SEEK_END)
+    try:
+        index_length, magic = _FOOTER.unpack(f.read(_FOOTER.size))
+    except _CORRUPT as e:
+        raise ValueError(f"Snapshot is corrupt: bad footer ({e}).") from e
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("Snapshot is truncated: footer missing.")
+    f.seek(-_FOOTER.size - index_length, os.SEEK_END)
+    return json.loads(f.read(index_length))
+
+
+def iter_snapshot(path: str, workers: int = 0):
+    """Yield record dicts chunk by chunk, in the order they were saved.
+
+    With `workers > 0` chunks are decompressed on a thread pool (zlib and
+    lzma release the GIL); at most `2 * workers` chunks are in flight.
+    """
+    with open(path, "rb") as f:
+        index = read_snapshot_index(f)
+        decompress = CODECS[index["codec"]][1]
+
+        def decode(data: bytes) -> list[str]:
+            try:
+                return decompress(data).decode("utf-8").split("\n")
+            except _CORRUPT as e:
+                raise ValueError(f"Snapshot is corrupt: cannot decompress a chunk ({e}).") from e
+
+        def raw_chunks():
+            for offset, length, count in index["chunks"]:
+                if count:
+                    f.seek(offset)
+                    yield f.read(length)
+
+        if workers <= 0:
+            for data in raw_chunks():
+                yield from map(json.loads, decode(data))
+            return
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            in_flight = deque()
+            for data in raw_chunks():
+                in_flight.append(pool.submit(decode, data))
+                if len(in_flight) >= 2 * workers:
+                    yield from map(json.loads, in_flight.popleft().result())
+            while in_flight:
+                yield from map(json.loads, in_flight.popleft().result())
+
+
+def is_snapshot(path: str) -> bool:
+    """True if `path` starts like a file written by `save_snapshot`."""
+    with open(path, "rb") as f:
+        return f.read(len(SNAPSHOT_MAGIC)) == SNAPSHOT_MAGIC
+
+
+def load_snapshot(path: str, workers: int = 0) -> AddressBook:
+    """Build a book from a snapshot written by `save_snapshot`."""
+    book = AddressBook()
+    for data in iter_snapshot(path, workers):
+        book.add_record(record_from_dict(data))
+    return book
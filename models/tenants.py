@@ -0,0 +1,128 @@
+"""Many named address books in one process.
+
+`BookManager` keeps each book in `<directory>/<name>.jsonl` (the journal
+format from models.storage). A book is loaded on first access and gets its
+own AutoSaver; when more than `max_books` are loaded, or their measured size
+exceeds `max_bytes`, the least recently used ones are flushed and dropped.
+
+`BookSession` is what the REPL hands to command handlers when several books
+are served: it behaves like the current AddressBook and adds `use(name)`.
+"""
+
+from collections import OrderedDict
+import os
+import re
+
+from models.indexes import attach_served_indexes
+from models.memstats import memory_stats
+from models.storage import AutoSaver, load_journal
+
+BOOK_NAME = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+BOOK_SUFFIX = ".jsonl"
+MEMORY_SAMPLE_SIZE = 1_000  # records measured per book when checking max_bytes
+
+
+class BookManager:
+    def __init__(self, directory: str, max_books: int = 16, max_bytes: int = None, save_interval: float = 5.0):
+        self.directory = directory
+        self.max_books = max(1, max_books)
+        self.max_bytes = max_bytes
+        self.save_interval = save_interval
+        self._books = OrderedDict()  # name -> (book, saver), least recently used first
+        self._sizes = {}
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def validate_name(name: str) -> str:
+        if not BOOK_NAME.match(name):
+            raise ValueError(f"Invalid book name '{name}'. Use letters, digits, '-' or '_'.")
+        return name
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, self.validate_name(name) + BOOK_SUFFIX)
+
+    def get(self, name: str):
+        """Return the named book, loading it (or creating it empty) if needed."""
+        entry = self._books.get(name)
+        if entry is not None:
+            self._books.move_to_end(name)
+            return entry[0]
+        path = self.path(name)
+        if not os.path.exists(path):
+            open(path, "a").close()  # so a new empty book is listed by names()
+        book, lines = load_journal(path)
+        attach_served_indexes(book)
+        self._books[name] = (book, AutoSaver(book, path, interval=self.save_interval, journal_lines=lines))
+        self._evict_if_needed()
+        return book
+
+    @property
+    def loaded(self) -> list[str]:
+        """Names of books held in memory, least recently used first."""
+        return list(self._books)
+
+    def names(self) -> list[str]:
+        """Every known book: on disk or loaded."""
+        on_disk = {f[: -len(BOOK_SUFFIX)] for f in os.listdir(self.directory) if f.endswith(BOOK_SUFFIX)}
+        return sorted(on_disk | set(self._books))
+
+    def evict(self, name: str):
+        """Flush the named book to disk and drop it from memory."""
+        entry = self._books.pop(name, None)
+        self._sizes.pop(name, None)
+        if entry is not None:
+            entry[1].close()
+
+    def _measure(self) -> int:
+        for name, (book, _) in self._books.items():
+            sample = len(book.data) // MEMORY_SAMPLE_SIZE
+            self._sizes[name] = memory_stats(book, sample=sample)["total_bytes"]
+        return sum(self._sizes.values())
+
+    def _evict_if_needed(self):
+        while len(self._books) > self.max_books:
+            self.evict(next(iter(self._books)))
+        if self.max_bytes is None:
+            return
+        while len(self._books) > 1 and self._measure() > self.max_bytes:
+            self.evict(next(iter(self._books)))
+
+    def close(self):
+        for name in list(self._books):
+            self.evict(name)
+
+
+class BookSession:
+    """Stands in for the current AddressBook; `use(name)` switches books."""
+
+    def __init__(self, manager: BookManager, name: str = "default"):
+        self.manager = manager
+        self.current = manager.validate_name(name)
+        manager.get(name)
+
+    @property
+    def book(self):
+        return self.manager.get(self.current)
+
+    def use(self, name: str):
+        book = self.manager.get(name)
+        self.current = name
+        return book
+
+    def __getattr__(self, attr):
+        return getattr(self.book, attr)
+
+    def __len__(self):
+        return len(self.book)
+
+    def __iter__(self):
+        return iter(self.book)
+
+    def __contains__(self, name):
+        return name in self.book
+
+    def __getitem__(self, name):
+        return self.book[name]
+
+    def __str__(self):
+        return str(self.book)
@@ -0,0 +1,52 @@
+"""Tests for agent.py — command pipelining and scripts."""
+
+import pytest
+
+from agent import main, run_commands, split_commands
+
+
+class TestSplitCommands:
+    def test_splits_on_semicolons_and_newlines(self):
+        text = "add bob 0123456789; add-birthday bob 01.01.1990\nphone bob;;\n"
+        assert split_commands(text) == ["add bob 0123456789", "add-birthday bob 01.01.1990", "phone bob"]
+
+    def test_blank_input_has_no_commands(self):
+        assert split_commands(" ; \n ") == []
+
+
+class TestRunCommands:
+    def test_batch_runs_in_order_with_one_output(self, book):
+        output, exit_requested = run_commands("add bob 0123456789; add-birthday bob 01.01.1990; phone bob", book)
+        assert str(book.find("Bob").birthday) == "01.01.1990"
+        assert output.index("Contact added") < output.index("Birthday added") < output.index("0123456789")
+        assert exit_requested is False
+
+    def test_errors_do_not_stop_batch_by_default(self, book):
+        output, _ = run_commands("phone nobody; bogus; add bob 0123456789", book)
+        assert "doesn't exist" in output
+        assert "Invalid command" in output
+        assert book.find("Bob") is not None
+
+    @pytest.mark.parametrize("failing", ["phone nobody", "bogus"])
+    def test_stop_on_error_ends_batch(self, book, failing):
+        output, _ = run_commands(f"add bob 0123456789; {failing}; add carol 0123456789", book, stop_on_error=True)
+        assert book.find("Bob") is not None
+        assert book.find("Carol") is None
+
+    def test_exit_ends_batch_and_requests_exit(self, book):
+        output, exit_requested = run_commands("add bob 0123456789; exit; add carol 0123456789", book)
+        assert exit_requested is True
+        assert "Good bye" in output
+        assert book.find("Carol") is None
+
+
+class TestScript:
+    def test_script_file_runs_as_one_batch(self, tmp_path, capsys):
+        script = tmp_path / "provision.txt"
+        script.write_text("add bob 0123456789\nadd-birthday bob 01.01.1990; show-birthday bob\n", encoding="utf-8")
+        book_path = tmp_path / "book.jsonl"
+        main(book_path=str(book_path), script=str(script))
+        out = capsys.readouterr().out
+        assert "Welcome" not in out
+        assert "Bob's birthday is 01.01.1990" in out
+        assert book_path.exists()
@@ -0,0 +1,123 @@
+"""Tests for models/audit.py and the audit command — ring buffer, flusher, rotation."""
+
+import json
+import time
+
+import pytest
+
+import handlers  # noqa: F401 — registers all @command decorators
+from handlers.audit import audit_cmd
+from models.audit import AuditLog
+from models.commands import Command, registry
+from models.errors import UsageError
+
+
+def _lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def _record(log, i):
+    log.record("add", [f"User{i}", "1234567890"], True, "\x1b[33mContact added.\x1b[0m", time.time())
+
+
+@pytest.fixture
+def audit(monkeypatch):
+    log = AuditLog(user="tester")
+    monkeypatch.setattr(Command, "audit", log)
+    return log
+
+
+class TestAuditLog:
+    def test_tail_returns_latest_entries_in_order(self):
+        log = AuditLog(capacity=3)
+        for i in range(5):
+            _record(log, i)
+        assert [e.args[0] for e in log.tail(10)] == ["User2", "User3", "User4"]
+        assert [e.args[0] for e in log.tail(2)] == ["User3", "User4"]
+
+    def test_memory_only_log_overwrites_without_dropping(self):
+        log = AuditLog(capacity=2)
+        for i in range(5):
+            _record(log, i)
+        assert log.dropped == 0
+
+    def test_flush_writes_json_lines_without_colours(self, tmp_path):
+        path = str(tmp_path / "audit.log")
+        log = AuditLog(path, interval=60, user="tester")
+        _record(log, 1)
+        log.close()
+        [line] = _lines(path)
+        assert line["user"] == "tester"
+        assert line["command"] == "add"
+        assert line["args"] == ["User1", "1234567890"]
+        assert line["result"] == "Contact added."
+        assert line["ok"] is True
+
+    def test_drop_policy_counts_overwritten_entries(self, tmp_path):
+        path = str(tmp_path / "audit.log")
+        log = AuditLog(path, capacity=2, interval=60)
+        with log._write_lock:  # keep the flusher from draining while we overflow
+            for i in range(5):
+                _record(log, i)
+        assert log.dropped == 3
+        log.close()
+        assert [line["args"][0] for line in _lines(path)] == ["User3", "User4"]
+
+    def test_block_policy_waits_for_flusher(self, tmp_path):
+        path = str(tmp_path / "audit.log")
+        log = AuditLog(path, capacity=1, policy="block", interval=60)
+        for i in range(3):
+            _record(log, i)
+        log.close()
+        assert log.dropped == 0
+        assert len(_lines(path)) == 3
+
+    def test_rotates_and_keeps_backups(self, tmp_path):
+        path = tmp_path / "audit.log"
+        log = AuditLog(str(path), interval=60, max_bytes=200, backups=2)
+        for i in range(6):
+            _record(log, i)
+            log.flush()
+        log.close()
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["audit.log", "audit.log.1", "audit.log.2"]
+        assert _lines(str(path))[-1]["args"][0] == "User5"
+
+    def test_unknown_policy_raises(self):
+        with pytest.raises(ValueError, match="policy"):
+            AuditLog(policy="ignore")
+
+
+class TestCommandAuditing:
+    def test_mutating_command_is_recorded(self, audit, book):
+        registry["add"](["Alice", "1234567890"], book)
+        [entry] = audit.tail()
+        assert (entry.command, entry.args, entry.ok, entry.user) == ("add", ("Alice", "1234567890"), True, "tester")
+
+    def test_failed_command_is_recorded_as_error(self, audit, book):
+        registry["change"](["Nobody", "1234567890", "0987654321"], book)
+        assert audit.tail()[0].ok is False
+
+    def test_read_only_command_is_not_recorded(self, audit, book_with_alice):
+        registry["phone"](["Alice"], book_with_alice)
+        assert audit.tail() == []
+
+    @pytest.mark.parametrize("name", ["sync", "use", "restore", "tag"])
+    def test_commands_changing_persistent_state_are_audited(self, name):
+        assert registry[name].mutates
+
+
+class TestAuditTail:
+    def test_shows_recent_commands(self, audit, book):
+        registry["add"](["Alice", "1234567890"], book)
+        result = audit_cmd(["tail"], book)
+        assert "add Alice 1234567890" in result
+        assert "Contact added." in result
+
+    def test_reports_when_log_is_off(self, book):
+        assert "Audit log is off" in audit_cmd(["tail"], book)
+
+    @pytest.mark.parametrize("args", [[], ["head"], ["tail", "x"]])
+    def test_bad_arguments_raise_usage_error(self, audit, book, args):
+        with pytest.raises(UsageError):
+            audit_cmd(args, book)
@@ -0,0 +1,40 @@
+"""Smoke tests for benchmarks/ — the generator and the runner on a tiny book."""
+
+from benchmarks.run import _spare_phone, compare, run_size
+from benchmarks.synthetic import make_book, make_records
+from models.models import Record
+
+
+class TestSyntheticBook:
+    def test_book_has_requested_size(self):
+        assert len(make_book(200)) == 200
+
+    def test_same_seed_gives_same_data(self):
+        a = [str(r) for r in make_records(50, seed=7)]
+        b = [str(r) for r in make_records(50, seed=7)]
+        assert a == b
+
+    def test_contains_multi_phone_and_birthday_records(self):
+        records = make_records(500)
+        assert any(len(r.phones) > 1 for r in records)
+        assert any(r.birthday is not None for r in records)
+
+
+class TestRunner:
+    def test_run_size_times_every_benchmark(self):
+        results = run_size(50)
+        assert "AddressBook.find" in results
+        assert "handler:birthdays" in results
+        assert all(r["ns_per_op"] >= 0 for r in results.values())
+
+    def test_spare_phone_is_not_on_record(self):
+        r = Record("Alice")
+        r.add_phone("0000000000")
+        r.add_phone("0000000001")
+        assert _spare_phone(r) == "0000000002"
+
+    def test_compare_flags_regression(self):
+        baseline = {"results": {"10": {"x": {"ns_per_op": 100}}}}
+        current = {"results": {"10": {"x": {"ns_per_op": 150}}}}
+        rows = compare(current, baseline, threshold=0.1)
+        assert rows[0][-1] == "REGRESSION"
@@ -0,0 +1,77 @@
+"""Tests for models/commands.py — sync and async handlers, error formatting."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from models.commands import Command, CommandRegistry
+from models.errors import UsageError
+
+
+@pytest.fixture
+def commands():
+    registry = CommandRegistry()
+
+    @registry.command("echo", usage="echo <text>")
+    async def echo(args, book):
+        await asyncio.sleep(0)
+        if not args:
+            raise UsageError("Give me text please.")
+        return " ".join(args)
+
+    @registry.command("where")
+    def where(args, book):
+        return threading.current_thread().name
+
+    return registry
+
+
+class TestAsyncHandlers:
+    def test_coroutine_handler_is_detected(self, commands):
+        assert commands["echo"].is_async
+        assert not commands["where"].is_async
+
+    def test_calling_runs_coroutine_to_completion(self, commands):
+        assert commands["echo"](["hi", "there"], None) == "hi there"
+
+    def test_errors_are_formatted_as_for_sync_handlers(self, commands):
+        result = commands["echo"]([], None)
+        assert "Give me text please." in result
+        assert "echo <text>" in result
+
+    def test_execute_async_awaits_coroutines(self, commands):
+        assert asyncio.run(commands["echo"].execute_async(["hi"], None)) == (True, "hi")
+
+    def test_execute_async_runs_sync_handlers_on_handler_thread(self, commands):
+        ok, thread = asyncio.run(commands["where"].execute_async([], None))
+        assert ok
+        assert thread.startswith("handler")
+        assert Command.executor()._max_workers == 1
+
+    def test_execute_async_reports_errors(self, commands):
+        ok, result = asyncio.run(commands["echo"].execute_async([], None))
+        assert not ok
+        assert "Give me text please." in result
+
+    def test_shutdown_waits_for_handler_of_cancelled_command(self):
+        registry, started, done = CommandRegistry(), threading.Event(), []
+
+        @registry.command("slow")
+        def slow(args, book):
+            started.set()
+            time.sleep(0.2)
+            done.append(True)
+
+        async def cancel_while_running():
+            task = asyncio.ensure_future(registry["slow"].execute_async([], None))
+            await asyncio.get_running_loop().run_in_executor(None, started.wait)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_while_running())
+        assert done == []
+        Command.shutdown()
+        assert done == [True]
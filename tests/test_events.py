@@ -0,0 +1,103 @@
+"""Tests for models/events.py — change feed emitted by AddressBook and Record."""
+
+from models.events import ChangeKind
+from models.models import AddressBook, Record
+
+
+def _recording_book():
+    book = AddressBook()
+    seen = []
+    book.changes.subscribe(seen.append)
+    return book, seen
+
+
+class TestChangeFeed:
+    def test_add_record_emits_record_added(self):
+        book, seen = _recording_book()
+        r = Record("Alice")
+        book.add_record(r)
+        assert [(c.kind, c.record) for c in seen] == [(ChangeKind.RECORD_ADDED, r)]
+
+    def test_replacing_record_emits_delete_then_add(self):
+        book, seen = _recording_book()
+        old = Record("Alice")
+        book.add_record(old)
+        book.add_record(Record("Alice"))
+        kinds = [c.kind for c in seen]
+        assert kinds == [ChangeKind.RECORD_ADDED, ChangeKind.RECORD_DELETED, ChangeKind.RECORD_ADDED]
+        assert seen[1].record is old
+
+    def test_delete_emits_record_deleted(self):
+        book, seen = _recording_book()
+        book.add_record(Record("Alice"))
+        book.delete("Alice")
+        assert seen[-1].kind is ChangeKind.RECORD_DELETED
+
+    def test_record_mutations_emit_after_record_is_added(self):
+        book, seen = _recording_book()
+        r = Record("Alice")
+        book.add_record(r)
+        r.add_phone("1234567890")
+        r.edit_phone("1234567890", "0987654321")
+        r.add_birthday("01.01.1990")
+        kinds = [c.kind for c in seen[1:]]
+        assert kinds == [
+            ChangeKind.PHONE_ADDED,
+            ChangeKind.PHONE_REMOVED,
+            ChangeKind.PHONE_ADDED,
+            ChangeKind.BIRTHDAY_SET,
+        ]
+        assert seen[2].old.value == "1234567890"
+        assert seen[3].new.value == "0987654321"
+
+    def test_record_outside_book_emits_nothing(self):
+        book, seen = _recording_book()
+        r = Record("Alice")
+        r.add_phone("1234567890")
+        book.add_record(r)
+        book.delete("Alice")
+        seen.clear()
+        r.add_phone("0987654321")
+        assert seen == []
+
+    def test_unsubscribe_stops_delivery(self):
+        book, seen = _recording_book()
+        book.changes.unsubscribe(seen.append)
+        book.add_record(Record("Alice"))
+        assert seen == []
+
+    def test_batched_subscriber_receives_events_on_flush(self):
+        book = AddressBook()
+        batches = []
+        book.changes.subscribe(batches.append, batched=True)
+        book.add_record(Record("Alice"))
+        book.add_record(Record("Bob"))
+        assert batches == []
+        book.changes.flush()
+        assert len(batches) == 1 and len(batches[0]) == 2
+        book.changes.flush()
+        assert len(batches) == 1  # empty queue is not delivered
+
+    def test_on_commit_handler_receives_whole_bulk_batch(self):
+        book = AddressBook()
+        seen, batches = [], []
+        book.changes.subscribe(seen.append, on_commit=batches.append)
+        book.add_record(Record("Alice"))
+        with book.bulk():
+            book.add_record(Record("Bob"))
+            book.add_record(Record("Carol"))
+        assert len(seen) == 1  # only the event outside the bulk block
+        assert [len(b) for b in batches] == [2]
+
+    def test_record_events_carry_state_at_emit_time(self):
+        book = AddressBook()
+        seen = []
+        book.changes.subscribe(seen.append)
+        with book.bulk():
+            r = Record("Alice")
+            book.add_record(r)
+            r.add_phone("1234567890")
+        added = seen[0]
+        assert added.kind is ChangeKind.RECORD_ADDED
+        assert added.new.phones == ()
+        assert len(r.phones) == 1
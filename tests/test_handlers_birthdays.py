@@ -24,6 +24,13 @@ class TestAddBirthday:
         add_birthday(["Alice", "01.01.1990"], book_with_alice)
         assert str(book_with_alice.find("Alice").birthday) == "01.01.1990"
 
+    def test_stale_version_rejects_birthday(self, book_with_alice):
+        stale = str(book_with_alice.find("Alice").version)
+        book_with_alice.find("Alice").add_phone("0987654321")
+        with pytest.raises(ValueError, match="was changed"):
+            add_birthday(["Alice", "01.01.1990", "--if-version", stale], book_with_alice)
+        assert book_with_alice.find("Alice").birthday is None
+
     # Boundary: today is the latest valid birthday
     def test_today_as_birthday_is_accepted(self, book_with_alice):
         today_str = datetime.date.today().strftime("%d.%m.%Y")
@@ -167,6 +174,34 @@ class TestBirthdaysCmd:
         book.add_record(Record("NoBirthday"))
         assert "No birthdays" in birthdays_cmd([], book)
 
+    def test_does_not_attach_indexes(self, book):
+        birthdays_cmd([], book)
+        assert book.indexes == {}
+
+    def test_days_option_widens_the_window(self, book):
+        r = Record("Alice")
+        r.add_birthday(birthday_n_days_from_now(20))
+        book.add_record(r)
+        assert "Alice" not in birthdays_cmd([], book)
+        assert "Alice" in birthdays_cmd(["--days", "30"], book)
+
+    def test_limit_option_shows_the_soonest(self, book):
+        for name, offset in [("Later", 10), ("Sooner", 2)]:
+            r = Record(name)
+            r.add_birthday(birthday_n_days_from_now(offset))
+            book.add_record(r)
+        result = birthdays_cmd(["--limit", "1", "--days", "30"], book)
+        assert "Sooner" in result
+        assert "Later" not in result
+
+    def test_empty_window_names_its_length(self, book):
+        assert "the next 30 day(s)" in birthdays_cmd(["--days", "30"], book)
+
+    @pytest.mark.parametrize("args", [["--days"], ["--days", "0"], ["--limit", "x"], ["--weeks", "2"]])
+    def test_bad_options_raise_usage_error(self, book, args):
+        with pytest.raises(UsageError):
+            birthdays_cmd(args, book)
+
 
 # ─── Error messages returned by the Command wrapper ───────────────────────────
 # Calls via registry["name"](args, book) — tests what the user actually sees.
@@ -3,7 +3,10 @@
 import pytest
 
 import handlers  # noqa: F401 — registers all @command decorators before _COMMANDS is used
-from handlers.contacts import add_contact, update_contact, get_users_phone, all_contacts
+from handlers.contacts import (
+    add_contact, update_contact, get_users_phone, all_contacts, dedupe_contacts, list_range,
+    phones_by_prefix,
+)
 from models.commands import registry
 from models.errors import UsageError
 from models.models import Record
@@ -29,6 +32,14 @@ class TestAddContact:
         add_contact(["alice", "1234567890"], book)
         assert book.find("Alice") is not None
 
+    def test_rest_of_name_is_preserved(self, book):
+        add_contact(["mcDonald", "1234567890"], book)
+        assert list(book.data) == ["McDonald"]
+
+    def test_lookup_ignores_case(self, book_with_alice):
+        result = add_contact(["ALICE", "0987654321"], book_with_alice)
+        assert "Phone added" in result
+
     def test_phone_added_to_existing_contact(self, book_with_alice):
         result = add_contact(["alice", "0987654321"], book_with_alice)
         assert "Phone added" in result
@@ -104,6 +115,23 @@ class TestUpdateContact:
         with pytest.raises(ValueError, match="not found"):
             update_contact(["alice", "0000000000", "1111111111"], book_with_alice)
 
+    # Conditional update
+    def test_current_version_applies_change(self, book_with_alice):
+        version = str(book_with_alice.find("Alice").version)
+        result = update_contact(["alice", "1234567890", "0987654321", "--if-version", version], book_with_alice)
+        assert "Contact updated" in result
+
+    def test_stale_version_is_reported_and_nothing_changes(self, book_with_alice):
+        stale = str(book_with_alice.find("Alice").version)
+        book_with_alice.find("Alice").add_tag("vip")
+        result = registry["change"](["alice", "1234567890", "0987654321", "--if-version", stale], book_with_alice)
+        assert "was changed" in result
+        assert book_with_alice.find("Alice").find_phone("1234567890") is not None
+
+    def test_missing_version_number_raises_usage_error(self, book_with_alice):
+        with pytest.raises(UsageError):
+            update_contact(["alice", "1234567890", "0987654321", "--if-version"], book_with_alice)
+
 
 # ─── get_users_phone ──────────────────────────────────────────────────────────
 
@@ -114,6 +142,14 @@ class TestGetUsersPhone:
         assert "Alice" in result
         assert "1234567890" in result
 
+    def test_shows_stored_display_name(self, book):
+        add_contact(["McDonald", "1234567890"], book)
+        assert "McDonald" in get_users_phone(["mcdonald"], book)
+
+    def test_shows_version(self, book_with_alice):
+        book_with_alice.find("Alice").add_tag("vip")
+        assert "Version" in get_users_phone(["alice"], book_with_alice)
+
     def test_multiple_phones_all_appear(self, book_with_alice):
         book_with_alice.find("Alice").add_phone("0987654321")
         result = get_users_phone(["alice"], book_with_alice)
@@ -158,6 +194,30 @@ class TestAllContacts:
         assert "Alice" in result
         assert "Bob" in result
 
+    def test_sorted_flag_lists_alphabetically(self, book):
+        for name in ("carol", "alice", "Bob"):
+            book.add_record(Record(name))
+        result = all_contacts(["--sorted"], book)
+        assert result.index("alice") < result.index("Bob") < result.index("carol")
+
+
+# ─── list_range ───────────────────────────────────────────────────────────────
+
+class TestListRange:
+    def test_lists_only_names_in_range(self, book):
+        for name in ("Alice", "Bob", "Carol", "Dave"):
+            book.add_record(Record(name))
+        result = list_range(["b", "c"], book)
+        assert "Bob" in result and "Carol" in result
+        assert "Alice" not in result and "Dave" not in result
+
+    def test_empty_range_message(self, book_with_alice):
+        assert "No contacts between x and z" in list_range(["x", "z"], book_with_alice)
+
+    def test_one_arg_raises_usage_error(self, book):
+        with pytest.raises(UsageError):
+            list_range(["a"], book)
+
 
 # ─── Error messages returned by the Command wrapper ───────────────────────────
 # Calls via registry["name"](args, book) — tests what the user actually sees.
@@ -206,3 +266,81 @@ class TestContactCommandErrorMessages:
     def test_phone_unknown_contact_returns_not_found_message(self, book):
         result = registry["phone"](["nobody"], book)
         assert "doesn't exist" in result
+
+
+# ─── dedupe_contacts ──────────────────────────────────────────────────────────
+
+class TestDedupeContacts:
+    def _add(self, book, name, *phones):
+        r = Record(name)
+        for p in phones:
+            r.add_phone(p)
+        book.add_record(r)
+        return r
+
+    def test_no_duplicates_message(self, book_with_alice):
+        assert "No duplicates" in dedupe_contacts([], book_with_alice)
+
+    def test_shared_phone_merges_into_first(self, book_with_alice):
+        self._add(book_with_alice, "Alicia", "1234567890", "5555555555")
+        result = dedupe_contacts([], book_with_alice)
+        assert "Merged 1" in result
+        assert book_with_alice.find("Alicia") is None
+        assert book_with_alice.find("Alice").find_phone("5555555555") is not None
+
+    def test_merge_keeps_duplicate_tags(self, book):
+        self._add(book, "Alice", "1234567890").add_tag("vip")
+        self._add(book, "Bob", "1234567890").add_tag("blocked")
+        dedupe_contacts([], book)
+        assert book.find("Bob") is None
+        assert book.find("Alice").tags == {"vip", "blocked"}
+
+    def test_near_identical_names_merge(self, book):
+        self._add(book, "Mary-Ann", "1111111111")
+        self._add(book, "mary ann", "2222222222")
+        dedupe_contacts([], book)
+        assert list(book.data) == ["Mary-Ann"]
+        assert len(book.find("Mary-Ann").phones) == 2
+
+    def test_transitive_links_form_one_group(self, book):
+        self._add(book, "A", "1111111111")
+        self._add(book, "B", "1111111111", "2222222222")
+        self._add(book, "C", "2222222222")
+        dedupe_contacts([], book)
+        assert list(book.data) == ["A"]
+
+    def test_birthday_copied_when_survivor_has_none(self, book_with_alice):
+        other = self._add(book_with_alice, "Alicia", "1234567890")
+        other.add_birthday("01.01.1990")
+        dedupe_contacts([], book_with_alice)
+        assert str(book_with_alice.find("Alice").birthday) == "01.01.1990"
+
+    def test_dry_run_leaves_book_unchanged(self, book_with_alice):
+        self._add(book_with_alice, "Alicia", "1234567890")
+        result = dedupe_contacts(["--dry-run"], book_with_alice)
+        assert "Would merge 1" in result
+        assert book_with_alice.find("Alicia") is not None
+
+
+# ─── phones_by_prefix ─────────────────────────────────────────────────────────
+
+class TestPhonesByPrefix:
+    def test_lists_matching_contacts(self, book_with_alice):
+        result = phones_by_prefix(["123"], book_with_alice)
+        assert "Alice" in result
+        assert "1 phone(s)" in result
+
+    def test_reflects_later_changes(self, book_with_alice):
+        phones_by_prefix(["123"], book_with_alice)
+        add_contact(["bob", "1239999999"], book_with_alice)
+        assert "2 phone(s)" in phones_by_prefix(["123"], book_with_alice)
+
+    def test_no_match_message(self, book_with_alice):
+        assert "No phones start with 999" in phones_by_prefix(["999"], book_with_alice)
+
+    def test_zero_args_raises_usage_error(self, book):
+        with pytest.raises(UsageError):
+            phones_by_prefix([], book)
+
+    def test_invalid_prefix_returns_error_message(self, book):
+        assert "1 to 10 digits" in registry["phones-prefix"](["abc"], book)
@@ -0,0 +1,55 @@
+"""Tests for handlers/tags.py — tag, untag, tagged commands."""
+
+import pytest
+
+import handlers  # noqa: F401 — registers all @command decorators before _COMMANDS is used
+from handlers.tags import tag_contact, tagged_contacts, untag_contact
+from models.commands import registry
+from models.errors import UsageError
+
+
+class TestTagContact:
+    def test_tag_is_stored(self, book_with_alice):
+        assert "Tag added" in tag_contact(["alice", "VIP"], book_with_alice)
+        assert book_with_alice.find("Alice").tags == {"vip"}
+
+    def test_duplicate_tag_raises(self, book_with_alice):
+        tag_contact(["alice", "vip"], book_with_alice)
+        with pytest.raises(ValueError, match="already set"):
+            tag_contact(["alice", "vip"], book_with_alice)
+
+    def test_reserved_word_is_rejected(self, book_with_alice):
+        assert "Invalid tag" in registry["tag"](["alice", "not"], book_with_alice)
+
+    def test_one_arg_raises_usage_error(self, book_with_alice):
+        with pytest.raises(UsageError):
+            tag_contact(["alice"], book_with_alice)
+
+
+class TestUntagContact:
+    def test_tag_is_removed(self, book_with_alice):
+        tag_contact(["alice", "vip"], book_with_alice)
+        assert "Tag removed" in untag_contact(["alice", "vip"], book_with_alice)
+        assert book_with_alice.find("Alice").tags == set()
+
+    def test_missing_tag_raises(self, book_with_alice):
+        with pytest.raises(ValueError, match="not found"):
+            untag_contact(["alice", "vip"], book_with_alice)
+
+
+class TestTaggedContacts:
+    def test_lists_matching_contacts(self, book_with_alice):
+        tag_contact(["alice", "vip"], book_with_alice)
+        result = tagged_contacts(["vip", "AND", "NOT", "blocked"], book_with_alice)
+        assert "Alice" in result
+        assert "1 contact(s)" in result
+
+    def test_no_match_message(self, book_with_alice):
+        assert "No contacts match" in tagged_contacts(["vip"], book_with_alice)
+
+    def test_invalid_expression_returns_error_message(self, book_with_alice):
+        assert "Missing ')'" in registry["tagged"](["(vip"], book_with_alice)
+
+    def test_zero_args_raises_usage_error(self, book):
+        with pytest.raises(UsageError):
+            tagged_contacts([], book)
@@ -0,0 +1,311 @@
+"""Tests for models/indexes.py — incrementally maintained secondary indexes."""
+
+import datetime
+import sys
+
+import pytest
+
+from models.indexes import BirthdayCalendar, BookStats, NameOrder, PhoneIndex, TagIndex
+from models.models import AddressBook, Record
+
+
+def _book(**contacts):
+    book = AddressBook()
+    for name, phones in contacts.items():
+        r = Record(name)
+        for p in phones:
+            r.add_phone(p)
+        book.add_record(r)
+    return book
+
+
+class TestPhoneIndex:
+    def test_for_book_is_cached(self):
+        book = _book()
+        assert PhoneIndex.for_book(book) is PhoneIndex.for_book(book)
+
+    def test_prefix_returns_sorted_matches(self):
+        book = _book(Alice=["0671111111", "0501111111"], Bob=["0670000000"])
+        matches = PhoneIndex.for_book(book).with_prefix("067")
+        assert [(p, r.name.value) for p, r in matches] == [
+            ("0670000000", "Bob"),
+            ("0671111111", "Alice"),
+        ]
+
+    def test_prefix_accepts_country_code(self):
+        book = _book(Alice=["0671111111"])
+        assert PhoneIndex.for_book(book).count("+38067") == 1
+
+    def test_full_number_and_empty_results(self):
+        index = PhoneIndex.for_book(_book(Alice=["0671111111"]))
+        assert index.count("0671111111") == 1
+        assert index.count("099") == 0
+
+    def test_invalid_prefix_raises(self):
+        with pytest.raises(ValueError, match="prefix"):
+            PhoneIndex.for_book(_book()).count("06a")
+
+    def test_tracks_phone_mutations(self):
+        book = _book(Alice=["0671111111"])
+        index = PhoneIndex.for_book(book)
+        alice = book.find("Alice")
+        alice.add_phone("0502222222")
+        alice.edit_phone("0671111111", "0673333333")
+        assert [p for p, _ in index.with_prefix("0")] == ["0502222222", "0673333333"]
+
+    def test_tracks_record_add_and_delete(self):
+        book = _book(Alice=["0671111111"])
+        index = PhoneIndex.for_book(book)
+        book.add_record(_book(Bob=["0672222222"]).find("Bob"))
+        book.delete("Alice")
+        assert [r.name.value for _, r in index.with_prefix("067")] == ["Bob"]
+
+    def test_shared_phone_keeps_both_owners(self):
+        book = _book(Alice=["0671111111"], Bob=["0671111111"])
+        index = PhoneIndex.for_book(book)
+        book.delete("Alice")
+        assert [r.name.value for _, r in index.with_prefix("067")] == ["Bob"]
+
+    def test_bulk_batch_is_applied_on_commit(self):
+        book = _book()
+        index = PhoneIndex.for_book(book)
+        with book.bulk():
+            for i in range(20):
+                r = Record(f"User{i}")
+                r.add_phone(f"067{i:07d}")
+                book.add_record(r)
+            assert len(index) == 0
+        assert index.count("067") == 20
+
+    def test_small_bulk_batch_is_patched_without_duplicates(self):
+        book = _book(**{f"User{i}": [f"050{i:07d}"] for i in range(50)})
+        index = PhoneIndex.for_book(book)
+        with book.bulk():
+            r = Record("Alice")
+            book.add_record(r)
+            r.add_phone("0671111111")
+        assert index.count("067") == 1
+        assert len(index) == 51
+
+    def test_prefix_counts(self):
+        book = _book(A=["0671111111", "0672222222"], B=["0501111111"], C=["0991111111"])
+        assert PhoneIndex.for_book(book).prefix_counts(3) == {"050": 1, "067": 2, "099": 1}
+
+
+class TestBookStats:
+    TODAY = datetime.date(2025, 6, 2)  # a Monday
+
+    def _stats_book(self):
+        book = _book(Alice=["0671111111", "0672222222"], Bob=["0501111111"], Carol=[])
+        book.find("Alice").add_birthday("03.06.1990")  # Tue 03.06.2025, age 34
+        book.find("Bob").add_birthday("01.06.2000")    # next: Mon 01.06.2026, age 25
+        return book
+
+    def test_initial_aggregates(self):
+        stats = BookStats.for_book(self._stats_book())
+        assert stats.contacts == 3
+        assert +stats.phones_per_contact == {0: 1, 1: 1, 2: 1}
+        assert +stats.birth_months == {6: 2}
+
+    def test_anniversary_weekdays(self):
+        stats = BookStats.for_book(self._stats_book())
+        assert +stats.anniversary_weekdays(self.TODAY) == {1: 1, 0: 1}
+
+    def test_age_histogram(self):
+        stats = BookStats.for_book(self._stats_book())
+        assert +stats.age_histogram(self.TODAY) == {30: 1, 20: 1}
+
+    def test_updates_on_mutations(self):
+        book = self._stats_book()
+        stats = BookStats.for_book(book)
+        book.find("Carol").add_phone("0990000000")
+        book.find("Alice").add_birthday("01.01.1990")
+        book.delete("Bob")
+        assert stats.contacts == 2
+        assert +stats.phones_per_contact == {1: 1, 2: 1}
+        assert +stats.birth_months == {1: 1}
+
+    def test_matches_rebuild_after_bulk(self):
+        book = self._stats_book()
+        stats = BookStats.for_book(book)
+        with book.bulk():
+            r = Record("Dave")
+            book.add_record(r)
+            r.add_phone("0631111111")
+            r.add_birthday("05.05.1985")
+        fresh = BookStats(book)  # built by a full scan
+        assert +stats.phones_per_contact == +fresh.phones_per_contact
+        assert +stats.birth_months == +fresh.birth_months
+
+
+class TestNameOrder:
+    def _names_book(self, *names):
+        book = AddressBook()
+        for name in names:
+            book.add_record(Record(name))
+        return book
+
+    def test_names_are_case_insensitively_sorted(self):
+        book = self._names_book("bob", "Alice", "carol", "Bea")
+        assert list(NameOrder.for_book(book).names()) == ["Alice", "Bea", "bob", "carol"]
+
+    def test_range_includes_names_starting_with_stop(self):
+        book = self._names_book("Alice", "Bob", "Bobby", "Carol", "Dave")
+        assert list(NameOrder.for_book(book).names("b", "c")) == ["Bob", "Bobby", "Carol"]
+
+    def test_range_before_all_and_after_all(self):
+        order = NameOrder.for_book(self._names_book("Bob"))
+        assert list(order.names("a", "a")) == []
+        assert list(order.names("z", "zz")) == []
+
+    def test_stays_sorted_across_adds_deletes_and_block_splits(self, monkeypatch):
+        monkeypatch.setattr(NameOrder, "LOAD", 2)
+        book = self._names_book(*[f"N{i:03d}" for i in range(0, 40, 2)])
+        order = NameOrder.for_book(book)
+        for i in range(1, 40, 2):
+            book.add_record(Record(f"N{i:03d}"))
+        for i in range(0, 40, 3):
+            book.delete(f"N{i:03d}")
+        assert list(order.names()) == sorted(book.data)
+        assert len(order) == len(book.data)
+        assert max(len(b) for b in order._blocks) <= 4
+
+    def test_records_follow_order(self):
+        book = self._names_book("b", "a")
+        assert [r.name.value for r in NameOrder.for_book(book).records()] == ["a", "b"]
+
+
+class TestTagIndex:
+    def _tagged_book(self):
+        book = AddressBook()
+        for name, tags in [("Alice", ["vip", "kyiv"]), ("Bob", ["kyiv"]), ("Carol", ["vip", "blocked"]), ("Dave", [])]:
+            r = Record(name)
+            for tag in tags:
+                r.add_tag(tag)
+            book.add_record(r)
+        return book
+
+    def _names(self, index, expression):
+        return sorted(r.name.value for r in index.query(expression))
+
+    def test_single_tag(self):
+        index = TagIndex.for_book(self._tagged_book())
+        assert self._names(index, "vip") == ["Alice", "Carol"]
+
+    def test_and_or_not_with_precedence(self):
+        index = TagIndex.for_book(self._tagged_book())
+        assert self._names(index, "vip AND kyiv OR blocked") == ["Alice", "Carol"]
+        assert self._names(index, "vip AND NOT blocked") == ["Alice"]
+        assert self._names(index, "NOT (vip OR kyiv)") == ["Dave"]
+
+    def test_keywords_and_tags_are_case_insensitive(self):
+        index = TagIndex.for_book(self._tagged_book())
+        assert index.count("VIP and not Blocked") == 1
+
+    def test_unknown_tag_matches_nothing(self):
+        assert TagIndex.for_book(self._tagged_book()).count("nobody") == 0
+
+    @pytest.mark.parametrize("expression", ["", "vip AND", "(vip", "vip )", "AND vip", "vip kyiv"])
+    def test_invalid_expression_raises(self, expression):
+        with pytest.raises(ValueError):
+            TagIndex.for_book(self._tagged_book()).evaluate(expression)
+
+    def test_tracks_tag_and_record_changes(self):
+        book = self._tagged_book()
+        index = TagIndex.for_book(book)
+        book.find("Dave").add_tag("vip")
+        book.find("Alice").remove_tag("vip")
+        book.delete("Carol")
+        eve = Record("Eve")
+        eve.add_tag("vip")
+        book.add_record(eve)  # reuses Carol's id
+        assert self._names(index, "vip") == ["Dave", "Eve"]
+        assert self._names(index, "NOT vip") == ["Alice", "Bob"]
+
+    def test_not_skips_deleted_records(self):
+        book = self._tagged_book()
+        index = TagIndex.for_book(book)
+        assert "Bob" in self._names(index, "NOT vip")
+        book.delete("Bob")
+        assert "Bob" not in self._names(index, "NOT vip")
+        assert index.count("NOT vip") == 1
+
+    def test_large_bulk_batch_rebuilds(self):
+        book = self._tagged_book()
+        index = TagIndex.for_book(book)
+        with book.bulk():
+            for i in range(10):
+                r = Record(f"User{i}")
+                book.add_record(r)
+                r.add_tag("new")
+        assert index.count("new") == 10
+        assert index.tags()["vip"] == 2
+
+    def test_tag_counts(self):
+        assert TagIndex.for_book(self._tagged_book()).tags() == {"blocked": 1, "kyiv": 2, "vip": 2}
+
+
+class TestBirthdayCalendar:
+    TODAY = datetime.date(2023, 2, 25)  # a Saturday, in a non-leap year
+
+    def _book(self):
+        book = AddressBook()
+        for name, born in [
+            ("Alice", "26.02.1990"), ("Bob", "25.02.1985"), ("Carol", "29.02.1992"),
+            ("Dave", "01.03.1980"), ("Eve", "10.03.1995"), ("Frank", "24.02.1991"),
+        ]:
+            r = Record(name)
+            r.add_birthday(born)
+            book.add_record(r)
+        book.add_record(Record("NoBirthday"))
+        return book
+
+    def _scan(self, book, days, limit=None):
+        items = (
+            book.upcoming_item(r.name.value, r.birthday.value, self.TODAY, days)
+            for r in book.data.values() if r.birthday is not None
+        )
+        return book.soonest([i for i in items if i is not None], limit)
+
+    @pytest.mark.parametrize("days, limit", [(7, None), (30, None), (366, None), (366, 2), (7, 3), (1, 1)])
+    def test_matches_scan(self, days, limit):
+        book = self._book()
+        calendar = BirthdayCalendar.for_book(book)
+        assert calendar.upcoming_items(self.TODAY, days, limit) == self._scan(book, days, limit)
+
+    def test_results_are_in_date_order(self):
+        calendar = BirthdayCalendar.for_book(self._book())
+        names = [item[2] for item in calendar.upcoming_items(self.TODAY, 366)]
+        assert names == ["Bob", "Alice", "Carol", "Dave", "Eve", "Frank"]
+
+    def test_feb_29_is_celebrated_on_mar_1_in_common_years(self):
+        calendar = BirthdayCalendar.for_book(self._book())
+        carol = next(i for i in calendar.upcoming_items(self.TODAY, 7) if i[2] == "Carol")
+        assert carol[1] == datetime.date(2023, 3, 1)
+
+    def test_tracks_birthday_and_record_changes(self):
+        book = self._book()
+        calendar = BirthdayCalendar.for_book(book)
+        book.find("Eve").add_birthday("27.02.1995")
+        book.delete("Bob")
+        gina = Record("Gina")
+        gina.add_birthday("25.02.2000")
+        book.add_record(gina)
+        assert calendar.upcoming_items(self.TODAY, 366) == self._scan(book, 366)
+        assert [i[2] for i in calendar.upcoming_items(self.TODAY, 3)] == ["Gina", "Alice", "Eve"]
+
+    def test_size_grows_with_contacts(self):
+        book = self._book()
+        calendar = BirthdayCalendar.for_book(book)
+        before = sys.getsizeof(calendar)
+        for i in range(100):
+            r = Record(f"User{i}")
+            r.add_birthday("26.02.1990")
+            book.add_record(r)
+        assert sys.getsizeof(calendar) > before > 1000
+
+    def test_book_uses_calendar_once_built(self):
+        book = self._book()
+        BirthdayCalendar.for_book(book)
+        book.indexes[BirthdayCalendar.NAME]._days.clear()
+        assert book.get_upcoming_birthdays(366, today=self.TODAY) == []
@@ -0,0 +1,95 @@
+"""Tests for models/memstats.py and the handlers/stats.py commands."""
+
+import tracemalloc
+
+import handlers  # noqa: F401 — registers all @command decorators
+from handlers.stats import book_stats_cmd, memstats_cmd
+from models.memstats import memory_stats
+from models.models import AddressBook, Record
+
+
+def _book(n):
+    book = AddressBook()
+    for i in range(n):
+        r = Record(f"User{i}")
+        r.add_phone(f"{i:010d}")
+        if i % 2:
+            r.add_birthday("01.01.1990")
+        book.add_record(r)
+    return book
+
+
+class TestMemoryStats:
+    def test_counts_per_class(self):
+        stats = memory_stats(_book(10))
+        assert stats["classes"]["Record"]["count"] == 10
+        assert stats["classes"]["Phone"]["count"] == 10
+        assert stats["classes"]["Birthday"]["count"] == 5
+        assert stats["contacts"] == 10
+
+    def test_total_is_sum_of_classes(self):
+        stats = memory_stats(_book(5))
+        assert stats["total_bytes"] == sum(c["bytes"] for c in stats["classes"].values())
+        assert stats["bytes_per_contact"] == stats["total_bytes"] / 5
+
+    def test_empty_book(self):
+        stats = memory_stats(AddressBook())
+        assert stats["contacts"] == 0
+        assert stats["bytes_per_contact"] == 0.0
+
+    def test_sampling_scales_counts(self):
+        stats = memory_stats(_book(100), sample=10)
+        assert stats["classes"]["Record"]["count"] == 100
+
+    def test_sampling_scales_by_measured_records(self):
+        stats = memory_stats(_book(95), sample=10)  # 10 records measured
+        assert stats["classes"]["Record"]["count"] == 95
+        assert stats["classes"]["Phone"]["count"] == 95
+
+    def test_counts_tags(self):
+        book = _book(3)
+        book.find("User1").add_tag("vip")
+        book.find("User2").add_tag("vip")
+        book.find("User2").add_tag("kyiv")
+        tags = memory_stats(book)["classes"]["Tag"]
+        assert tags["count"] == 3
+        assert tags["bytes"] > 0
+
+    def test_no_allocations_without_tracemalloc(self):
+        assert memory_stats(_book(1))["top_allocations"] is None
+
+    def test_top_allocations_when_tracing(self):
+        tracemalloc.start()
+        try:
+            stats = memory_stats(_book(1), top=3)
+        finally:
+            tracemalloc.stop()
+        assert 0 < len(stats["top_allocations"]) <= 3
+
+
+class TestMemstatsCmd:
+    def test_reports_structures(self, book_with_alice):
+        result = memstats_cmd([], book_with_alice)
+        assert "Record" in result
+        assert "Phone" in result
+        assert "bytes per contact" in result
+
+    def test_on_off_toggles_tracing(self, book):
+        assert "started" in memstats_cmd(["on"], book)
+        assert tracemalloc.is_tracing()
+        assert "Allocation site" in memstats_cmd([], book)
+        assert "stopped" in memstats_cmd(["off"], book)
+        assert not tracemalloc.is_tracing()
+
+
+class TestBookStatsCmd:
+    def test_reports_sections(self, book_with_alice):
+        book_with_alice.find("Alice").add_birthday("01.01.1990")
+        result = book_stats_cmd([], book_with_alice)
+        assert "Contacts: 1" in result
+        assert "Phones per contact" in result
+        assert "January" in result
+        assert "Age" in result
+
+    def test_empty_book(self, book):
+        assert "Contacts: 0" in book_stats_cmd([], book)
@@ -0,0 +1,132 @@
+"""Tests for models/merkle.py and the diff/sync commands."""
+
+import pytest
+
+import handlers  # noqa: F401 — registers all @command decorators
+from handlers.storage import diff_cmd, sync_cmd
+from models.merkle import MerkleTree, diff, record_hash, sync
+from models.models import AddressBook, Record
+from models.storage import load_book, save_snapshot
+
+
+def _book(size=50):
+    book = AddressBook()
+    for i in range(size):
+        r = Record(f"User{i}")
+        r.add_phone(f"{i:010d}")
+        if i % 3 == 0:
+            r.add_birthday("01.01.1990")
+        book.add_record(r)
+    return book
+
+
+class TestRecordHash:
+    def test_equal_content_hashes_equal_whatever_the_version(self):
+        a, b = Record("Alice"), Record("Alice")
+        a.add_phone("1234567890")
+        a.add_tag("vip")
+        b.add_tag("vip")
+        b.add_phone("0987654321")
+        b.edit_phone("0987654321", "1234567890")
+        assert a.version != b.version
+        assert record_hash(a) == record_hash(b)
+
+    def test_any_field_changes_the_hash(self, alice_record):
+        before = record_hash(alice_record)
+        alice_record.add_tag("vip")
+        assert record_hash(alice_record) != before
+
+
+class TestMerkleTree:
+    def test_incremental_updates_match_a_fresh_build(self):
+        book = _book()
+        tree = MerkleTree.for_book(book, depth=2)
+        book.find("User1").add_birthday("02.02.1992")
+        book.find("User3").add_birthday("03.03.1993")
+        book.find("User2").edit_phone("0000000002", "1111111111")
+        book.delete("User4")
+        with book.bulk():
+            book.add_record(Record("Zed"))
+            book.find("Zed").add_tag("new")
+        book.add_record(Record("USER5"))  # replaces User5
+        fresh = MerkleTree(book, depth=2)
+        assert tree.root == fresh.root
+        every_bucket = range(16 ** 2)
+        assert tree.buckets(every_bucket) == fresh.buckets(every_bucket)
+
+    def test_buckets_do_not_scan_the_book(self, monkeypatch):
+        book = _book()
+        tree = MerkleTree.for_book(book, depth=2)
+        book.find("User1").add_tag("vip")
+        monkeypatch.setattr(book, "data", {})
+        bucket = tree.bucket_of("User1")
+        assert tree.buckets([bucket])[bucket]["User1"] == record_hash(book.find("User1"))
+
+    def test_identical_books_compare_only_the_root(self):
+        changes = diff(MerkleTree.for_book(_book()), MerkleTree.for_book(_book()))
+        assert not changes
+        assert changes.hashes == 1
+
+    def test_diff_classifies_records(self):
+        source, target = _book(), _book()
+        source.add_record(Record("Newcomer"))
+        source.find("User5").add_tag("vip")
+        target.delete("User6")
+        target.add_record(Record("Leaver"))
+        changes = diff(MerkleTree.for_book(source), MerkleTree.for_book(target))
+        assert sorted(changes.added) == ["Newcomer", "User6"]
+        assert changes.changed == ["User5"]
+        assert changes.removed == ["Leaver"]
+
+    def test_diff_only_descends_into_changed_subtrees(self):
+        source, target = _book(500), _book(500)
+        source.find("User7").add_tag("vip")
+        changes = diff(MerkleTree.for_book(source, depth=3), MerkleTree.for_book(target, depth=3))
+        assert changes.changed == ["User7"]
+        assert changes.hashes < 3 * 16 + 1 + 20  # one path of children plus one small bucket
+
+    def test_sync_copies_only_the_difference(self):
+        source, target = _book(), _book()
+        source.find("User1").add_tag("vip")
+        target.add_record(Record("Stale"))
+        tree = MerkleTree.for_book(source)
+        changes = sync(tree, target)
+        assert (changes.changed, changes.removed) == (["User1"], ["Stale"])
+        assert target.find("User1").tags == {"vip"}
+        assert target.find("Stale") is None
+        assert MerkleTree.for_book(target).root == tree.root
+
+    def test_depth_mismatch_raises(self):
+        with pytest.raises(ValueError, match="depth"):
+            diff(MerkleTree(_book(), depth=2), MerkleTree(_book(), depth=3))
+
+
+class TestDiffAndSyncCommands:
+    def test_sync_appends_only_changed_records(self, tmp_path):
+        path = tmp_path / "standby.jsonl"
+        book = _book()
+        sync_cmd([str(path)], book)
+        lines = len(path.read_text().splitlines())
+        book.find("User2").add_tag("vip")
+        book.delete("User3")
+        assert "1 changed, 1 removed (2 journal line(s))" in sync_cmd([str(path)], book)
+        assert len(path.read_text().splitlines()) == lines + 2
+        standby = load_book(str(path))
+        assert standby.find("User2").tags == {"vip"}
+        assert standby.find("User3") is None
+
+    def test_diff_against_snapshot(self, tmp_path):
+        path = str(tmp_path / "backup.snap")
+        book = _book()
+        save_snapshot(book, path)
+        assert "identical" in diff_cmd([path], book)
+        book.add_record(Record("Newcomer"))
+        result = diff_cmd([path], book)
+        assert "Only here" in result
+        assert "Newcomer" in result
+
+    def test_sync_refuses_snapshots(self, tmp_path):
+        path = str(tmp_path / "backup.snap")
+        save_snapshot(_book(), path)
+        with pytest.raises(ValueError, match="snapshot"):
+            sync_cmd([path], _book())
@@ -4,7 +4,9 @@ import datetime
 
 import pytest
 
-from models.models import Name, Phone, Birthday, Record, AddressBook
+from models.errors import VersionConflict
+from models.events import ChangeKind
+from models.models import Name, Phone, Birthday, Tag, Record, AddressBook
 from tests.helpers import birthday_n_days_from_now, days_until_next
 
 
@@ -27,6 +29,16 @@ class TestName:
         with pytest.raises(ValueError):
             n.value = ""
 
+    # Lookup key
+    def test_key_ignores_case(self):
+        assert Name.key("McDonald") == Name.key("MCDONALD") == "mcdonald"
+
+    def test_key_normalizes_unicode_forms(self):
+        assert Name.key("Jos\u00e9") == Name.key("Jose\u0301")
+
+    def test_key_casefolds_non_ascii(self):
+        assert Name.key("STRASSE") == Name.key("straße")
+
 
 # ─── Phone ────────────────────────────────────────────────────────────────────
 
@@ -79,6 +91,30 @@ class TestPhone:
         with pytest.raises(ValueError):
             Phone("123456789a")
 
+    # Normalization
+    def test_country_code_is_stripped(self):
+        assert Phone("+380123456789").value == "0123456789"
+
+    def test_separators_are_stripped(self):
+        assert Phone("(012) 345-67.89").value == "0123456789"
+
+    def test_formatted_and_plain_inputs_are_equal(self):
+        assert Phone("+38 (012) 345-67-89") == Phone("0123456789")
+
+    def test_leading_zero_preserved_in_value(self):
+        assert Phone("0000000001").value == "0000000001"
+
+    def test_stored_as_packed_int(self):
+        assert int(Phone("0123456789")) == 123456789
+
+    def test_other_country_code_raises(self):
+        with pytest.raises(ValueError):
+            Phone("+440123456789")
+
+    def test_non_string_raises(self):
+        with pytest.raises(ValueError):
+            Phone(1234567890)
+
     # Setter path
     def test_setter_rejects_invalid_value(self):
         p = Phone("1234567890")
@@ -152,6 +188,84 @@ class TestBirthday:
         assert str(b) == "15.06.1985"
 
 
+# ─── Tag ──────────────────────────────────────────────────────────────────────
+
+class TestTag:
+    def test_value_is_lower_cased(self):
+        assert Tag("VIP").value == "vip"
+
+    @pytest.mark.parametrize("value", ["", "two words", "a" * 33, "and", "NOT"])
+    def test_invalid_tag_raises(self, value):
+        with pytest.raises(ValueError):
+            Tag(value)
+
+    def test_record_add_and_remove_tag(self, alice_record):
+        alice_record.add_tag("Kyiv")
+        assert alice_record.tags == {"kyiv"}
+        assert "tags: kyiv" in str(alice_record)
+        alice_record.remove_tag("kyiv")
+        assert alice_record.tags == set()
+
+    def test_duplicate_tag_raises(self, alice_record):
+        alice_record.add_tag("vip")
+        with pytest.raises(ValueError, match="already set"):
+            alice_record.add_tag("VIP")
+
+    def test_remove_missing_tag_raises(self, alice_record):
+        with pytest.raises(ValueError, match="not found"):
+            alice_record.remove_tag("vip")
+
+
+# ─── Record versions ──────────────────────────────────────────────────────────
+
+class TestRecordVersion:
+    def test_every_mutation_bumps_version(self):
+        r = Record("Alice")
+        assert r.version == 0
+        r.add_phone("1234567890")
+        r.add_birthday("01.01.1990")
+        r.add_tag("vip")
+        assert r.version == 3
+
+    def test_matching_expected_version_allows_update(self, alice_record):
+        version = alice_record.version
+        alice_record.edit_phone("1234567890", "0987654321", expected_version=version)
+        assert alice_record.version == version + 1  # one call, although it removes and adds a phone
+
+    def test_set_phone_bumps_once(self):
+        r = Record("Alice")
+        r.add_phone("1234567890")
+        r.add_phone("0987654321")
+        r.set_phone("5555555555")
+        assert r.version == 3
+
+    def test_set_phone_rejects_invalid_phone_without_changing(self, alice_record):
+        version = alice_record.version
+        with pytest.raises(ValueError):
+            alice_record.set_phone("12")
+        assert alice_record.find_phone("1234567890") is not None
+        assert alice_record.version == version
+
+    def test_stale_expected_version_raises_without_changing(self, alice_record):
+        stale = alice_record.version
+        alice_record.add_tag("vip")
+        with pytest.raises(VersionConflict, match="was changed"):
+            alice_record.add_birthday("01.01.1990", expected_version=stale)
+        assert alice_record.birthday is None
+
+    def test_bulk_rollback_restores_version(self, book_with_alice):
+        alice = book_with_alice.find("Alice")
+        version = alice.version
+        with pytest.raises(ValueError):
+            with book_with_alice.bulk():
+                alice.add_phone("0987654321")
+                alice.add_birthday("01.01.1990")
+                alice.set_phone("5555555555")
+                alice.edit_phone("5555555555", "1234567890")
+                raise ValueError("abort")
+        assert alice.version == version
+
+
 # ─── Record ───────────────────────────────────────────────────────────────────
 
 class TestRecord:
@@ -172,6 +286,14 @@ class TestRecord:
         r.add_phone("1234567890")
         assert r.find_phone("1234567890").value == "1234567890"
 
+    def test_find_phone_accepts_formatted_input(self):
+        r = Record("Alice")
+        r.add_phone("0123456789")
+        assert r.find_phone("+38 012 345 67 89") is not None
+
+    def test_find_invalid_phone_returns_none(self):
+        assert Record("Alice").find_phone("123") is None
+
     def test_find_nonexistent_phone_returns_none(self):
         assert Record("Alice").find_phone("0000000000") is None
 
@@ -243,6 +365,28 @@ class TestAddressBook:
     def test_find_nonexistent_returns_none(self):
         assert AddressBook().find("Nobody") is None
 
+    def test_find_is_case_insensitive(self):
+        book = AddressBook()
+        r = Record("McDonald")
+        book.add_record(r)
+        assert book.find("mcdonald") is r
+        assert book.find("MCDONALD") is r
+
+    def test_same_key_replaces_existing_record(self):
+        book = AddressBook()
+        book.add_record(Record("Alice"))
+        r = Record("ALICE")
+        book.add_record(r)
+        assert list(book.data) == ["ALICE"]
+        assert book.find("alice") is r
+
+    def test_delete_is_case_insensitive(self):
+        book = AddressBook()
+        book.add_record(Record("Alice"))
+        book.delete("alice")
+        assert book.find("Alice") is None
+        assert len(book.data) == 0
+
     def test_delete_removes_record(self):
         book = AddressBook()
         book.add_record(Record("Alice"))
@@ -252,6 +396,56 @@ class TestAddressBook:
     def test_delete_nonexistent_is_noop(self):
         AddressBook().delete("Nobody")  # must not raise
 
+    def test_mapping_writes_keep_find_in_step(self):
+        alice, bob, carol = Record("Alice"), Record("Bob"), Record("Carol")
+        book = AddressBook({"Alice": alice})
+        book["Bob"] = bob
+        book.update({"Carol": carol})
+        assert [book.find(n) for n in ("alice", "bob", "carol")] == [alice, bob, carol]
+        del book["Bob"]
+        assert book.pop("Carol") is carol
+        assert book.find("Bob") is None and book.find("Carol") is None
+        assert list(book.data) == ["Alice"]
+
+    def test_mapping_writes_emit_changes(self):
+        book = AddressBook()
+        seen = []
+        book.changes.subscribe(lambda change: seen.append(change.kind))
+        book["Alice"] = Record("Alice")
+        del book["Alice"]
+        assert seen == [ChangeKind.RECORD_ADDED, ChangeKind.RECORD_DELETED]
+
+    def test_mapping_reads_ignore_case(self):
+        book = AddressBook()
+        alice = Record("Alice")
+        book.add_record(alice)
+        assert "alice" in book and "ALICE" in book
+        assert book["alice"] is alice
+        assert "Bob" not in book
+        with pytest.raises(KeyError):
+            book["Bob"]
+
+    def test_copy_is_independent(self):
+        book = AddressBook()
+        alice = Record("Alice")
+        alice.add_phone("1234567890")
+        book.add_record(alice)
+        copy = book.copy()
+        copy.add_record(Record("Zed"))
+        copy.find("Alice").add_phone("0987654321")
+        assert book.find("zed") is None
+        assert list(book.data) == ["Alice"]
+        assert len(alice.phones) == 1
+        assert copy.find("zed") is not None and len(copy.find("alice").phones) == 2
+
+    def test_mapping_write_under_other_name_raises(self):
+        with pytest.raises(ValueError, match="Cannot store"):
+            AddressBook()["Bob"] = Record("Alice")
+
+    def test_del_missing_name_raises_key_error(self):
+        with pytest.raises(KeyError):
+            del AddressBook()["Nobody"]
+
     def test_str_contains_record_info(self):
         book = AddressBook()
         r = Record("Alice")
@@ -260,6 +454,77 @@ class TestAddressBook:
         assert "Alice" in str(book)
 
 
+# ─── AddressBook.bulk ─────────────────────────────────────────────────────────
+
+class TestAddressBookBulk:
+    def test_mutations_are_applied(self, book_with_alice):
+        with book_with_alice.bulk():
+            book_with_alice.add_record(Record("Bob"))
+            book_with_alice.find("Alice").add_birthday("01.01.1990")
+        assert book_with_alice.find("Bob") is not None
+        assert str(book_with_alice.find("Alice").birthday) == "01.01.1990"
+
+    def test_subscribers_notified_only_at_exit(self, book):
+        seen = []
+        book.changes.subscribe(seen.append)
+        with book.bulk():
+            book.add_record(Record("Alice"))
+            book.find("Alice").add_phone("1234567890")
+            assert seen == []
+        assert len(seen) == 2
+
+    def test_batched_subscriber_gets_single_batch(self, book):
+        batches = []
+        book.changes.subscribe(batches.append, batched=True)
+        with book.bulk():
+            for name in ("A", "B", "C"):
+                book.add_record(Record(name))
+        assert [len(b) for b in batches] == [3]
+
+    def test_validation_error_rolls_back_batch(self, book_with_alice):
+        seen = []
+        book_with_alice.changes.subscribe(seen.append)
+        alice = book_with_alice.find("Alice")
+        with pytest.raises(ValueError):
+            with book_with_alice.bulk():
+                book_with_alice.add_record(Record("Bob"))
+                alice.add_phone("0987654321")
+                alice.add_birthday("01.01.1990")
+                book_with_alice.delete("Alice")
+                alice.add_phone("bad")
+        assert book_with_alice.find("Bob") is None
+        assert book_with_alice.find("Alice") is alice
+        assert [p.value for p in alice.phones] == ["1234567890"]
+        assert alice.birthday is None
+        assert seen == []
+
+    def test_rollback_restores_tags(self, book_with_alice):
+        alice = book_with_alice.find("Alice")
+        alice.add_tag("vip")
+        with pytest.raises(ValueError):
+            with book_with_alice.bulk():
+                alice.remove_tag("vip")
+                alice.add_tag("kyiv")
+                raise ValueError("abort")
+        assert alice.tags == {"vip"}
+
+    def test_rollback_restores_replaced_record(self, book_with_alice):
+        alice = book_with_alice.find("Alice")
+        with pytest.raises(ValueError):
+            with book_with_alice.bulk():
+                book_with_alice.add_record(Record("Alice"))
+                raise ValueError("abort")
+        assert book_with_alice.find("Alice") is alice
+
+    def test_nested_bulk_joins_outer_batch(self, book):
+        with pytest.raises(ValueError):
+            with book.bulk():
+                with book.bulk():
+                    book.add_record(Record("Alice"))
+                raise ValueError("abort")
+        assert book.find("Alice") is None
+
+
 # ─── AddressBook._birthday_in_year ────────────────────────────────────────────
 
 class TestBirthdayInYear:
@@ -371,3 +636,24 @@ class TestGetUpcomingBirthdays:
         names = [u["name"] for u in book.get_upcoming_birthdays()]
         assert "Inside" in names
         assert "Outside" not in names
+
+    def test_days_widens_the_window(self):
+        book = self._book("Alice", birthday_n_days_from_now(20))
+        assert book.get_upcoming_birthdays() == []
+        assert [u["name"] for u in book.get_upcoming_birthdays(days=21)] == ["Alice"]
+
+    def test_results_are_sorted_by_date(self):
+        book = AddressBook()
+        for name, offset in [("Late", 5), ("Soon", 0), ("Middle", 3)]:
+            r = Record(name)
+            r.add_birthday(birthday_n_days_from_now(offset))
+            book.add_record(r)
+        assert [u["name"] for u in book.get_upcoming_birthdays()] == ["Soon", "Middle", "Late"]
+
+    def test_limit_keeps_the_soonest(self):
+        book = AddressBook()
+        for i in range(10):
+            r = Record(f"User{i}")
+            r.add_birthday(birthday_n_days_from_now(30 - i))
+            book.add_record(r)
+        assert [u["name"] for u in book.get_upcoming_birthdays(days=31, limit=3)] == ["User9", "User8", "User7"]
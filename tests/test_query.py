@@ -0,0 +1,169 @@
+"""Tests for models/query.py and the select-where/delete-where/update-where/explain commands."""
+
+import pytest
+
+import handlers  # noqa: F401 — registers all @command decorators
+from handlers.query import delete_where, explain_cmd, select_where, update_where
+from models.commands import registry
+from models.errors import UsageError
+from models.indexes import (
+    BirthdayCalendar, BookStats, NameOrder, PhoneIndex, TagIndex, attach_served_indexes,
+)
+from models.models import AddressBook, Record
+from models.query import parse_predicate, plan
+
+
+def _people():
+    book = AddressBook()
+    for name, phone, birthday, tag in [
+        ("Alice", "0671111111", "15.03.1990", "vip"),
+        ("Alan", "0501111111", "01.07.1985", None),
+        ("Bob", "0672222222", "20.03.2001", None),
+        ("Carol", None, None, "vip"),
+    ]:
+        r = Record(name)
+        if phone:
+            r.add_phone(phone)
+        if birthday:
+            r.add_birthday(birthday)
+        if tag:
+            r.add_tag(tag)
+        book.add_record(r)
+    return book
+
+
+def _select(book, *terms):
+    return sorted(r.name.value for r in plan(book, parse_predicate(terms)).records())
+
+
+class TestPredicates:
+    @pytest.mark.parametrize("terms, expected", [
+        (["name:AL"], ["Alan", "Alice"]),
+        (["phone:067"], ["Alice", "Bob"]),
+        (["tag:VIP"], ["Alice", "Carol"]),
+        (["birthday:3"], ["Alice", "Bob"]),
+        (["birthday:01.01.1986..31.12.1999"], ["Alice"]),
+        (["birthday:..01.01.1990"], ["Alan"]),
+        (["no-phone"], ["Carol"]),
+        (["phone:067", "and", "birthday:3", "tag:vip"], ["Alice"]),
+    ])
+    def test_conditions_match_with_a_scan(self, terms, expected):
+        assert _select(_people(), *terms) == expected
+
+    @pytest.mark.parametrize("terms", [["bogus"], ["name:"], ["phone:06x"], ["birthday:13"], ["birthday:1.1..x"], ["and"]])
+    def test_invalid_predicate_raises(self, terms):
+        with pytest.raises(ValueError):
+            parse_predicate(terms)
+
+
+class TestPlanner:
+    def test_falls_back_to_scan_without_indexes(self):
+        query = plan(_people(), parse_predicate(["phone:067"]))
+        assert query.path.index == "scan"
+        assert [str(c) for c in query.filters] == ["phone:067"]
+
+    def test_picks_index_with_fewest_rows(self):
+        book = _people()
+        PhoneIndex.for_book(book)
+        NameOrder.for_book(book)
+        query = plan(book, parse_predicate(["phone:067", "name:bo"]))
+        assert query.path.index == NameOrder.NAME
+        assert query.path.estimate == 1
+        assert [str(c) for c in query.filters] == ["phone:067"]
+
+    def test_exact_index_wins_tie_with_scan(self):
+        book = _people()
+        PhoneIndex.for_book(book)
+        query = plan(book, parse_predicate(["phone:0"]))  # every phone matches: 3 rows either way
+        assert query.path.index == PhoneIndex.NAME
+        assert query.filters == ()
+
+    def test_served_indexes_are_planned_without_warming_up(self):
+        book = _people()
+        attach_served_indexes(book)
+        query = plan(book, parse_predicate(["phone:067", "tag:vip", "name:al"]))
+        assert {path[0] for path in query.explain()} == {
+            "scan", PhoneIndex.NAME, TagIndex.NAME, NameOrder.NAME,
+        }
+
+    def test_index_results_match_scan_results(self):
+        book = _people()
+        expected = _select(book, "tag:vip", "no-phone")
+        TagIndex.for_book(book)
+        assert plan(book, parse_predicate(["tag:vip"])).path.index == TagIndex.NAME
+        assert _select(book, "tag:vip", "no-phone") == expected
+
+    @pytest.mark.parametrize("terms", [
+        ["birthday:3"], ["birthday:01.01.1986..31.12.1999"], ["birthday:..01.01.1990"],
+        ["birthday:01.03.2001..31.03.2001"], ["birthday:10.03.1990..05.01.1991"], ["birthday:3", "no-phone"],
+    ])
+    def test_birthday_conditions_use_calendar(self, terms):
+        book = _people()
+        expected = _select(book, *terms)
+        BirthdayCalendar.for_book(book)
+        assert plan(book, parse_predicate(terms)).path.index == BirthdayCalendar.NAME
+        assert _select(book, *terms) == expected
+
+    def test_birth_month_is_served_by_calendar(self):
+        book = _people()
+        BirthdayCalendar.for_book(book)
+        query = plan(book, parse_predicate(["birthday:3"]))
+        assert query.path.estimate == 2
+        assert query.filters == ()
+
+    def test_birth_month_estimate_uses_stats(self):
+        book = _people()
+        BirthdayCalendar.for_book(book)
+        BookStats.for_book(book).birth_months[3] = 99  # stats answer the estimate, the calendar the rows
+        query = plan(book, parse_predicate(["birthday:3"]))
+        assert (BirthdayCalendar.NAME, "birthdays in month 3", 99, "") in query.explain()
+        assert query.path.index == "scan"
+
+    def test_birth_range_keeps_its_check(self):
+        book = _people()
+        BirthdayCalendar.for_book(book)
+        query = plan(book, parse_predicate(["birthday:01.03.2001..31.03.2001"]))
+        assert query.path.estimate == 2  # both March birthdays are read, only Bob matches
+        assert [str(c) for c in query.filters] == ["birthday:01.03.2001..31.03.2001"]
+
+
+class TestQueryCommands:
+    def test_select_where_lists_matches(self):
+        result = select_where(["phone:067"], _people())
+        assert "Alice" in result and "Bob" in result
+        assert "2 contact(s)" in result
+
+    def test_select_where_without_conditions_raises_usage_error(self):
+        with pytest.raises(UsageError):
+            select_where([], _people())
+
+    def test_delete_where_removes_matches_in_one_batch(self):
+        book = _people()
+        batches = []
+        book.changes.subscribe(batches.append, batched=True)
+        assert "Deleted 2 contact(s)" in delete_where(["birthday:3"], book)
+        assert sorted(book.data) == ["Alan", "Carol"]
+        assert len(batches) == 1
+
+    def test_update_where_applies_actions(self):
+        book = _people()
+        assert "Updated 2 contact(s)" in update_where(["tag:vip", "set", "untag:vip", "tag:gold"], book)
+        assert book.find("Alice").tags == {"gold"}
+        assert book.find("Carol").tags == {"gold"}
+
+    def test_update_where_rejects_bad_action_before_changing_anything(self):
+        book = _people()
+        assert "Unknown action" in registry["update-where"](["tag:vip", "set", "tag:gold", "rename:x"], book)
+        assert book.find("Alice").tags == {"vip"}
+
+    def test_update_where_without_set_raises_usage_error(self):
+        with pytest.raises(UsageError):
+            update_where(["tag:vip"], _people())
+
+    def test_explain_marks_chosen_path(self):
+        book = _people()
+        PhoneIndex.for_book(book)
+        result = explain_cmd(["update-where", "phone:050", "birthday:7", "set", "tag:x"], book)
+        assert "phones starting with 050" in result
+        assert "chosen" in result
+        assert "Then checks: birthday:7." in result
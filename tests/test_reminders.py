@@ -0,0 +1,118 @@
+"""Tests for models/reminders.py — heap-based birthday scheduler and notifiers."""
+
+import datetime
+import json
+
+import pytest
+
+from models.models import AddressBook, Record
+from models.reminders import BirthdayScheduler, FileNotifier, make_notifier
+
+
+class FakeClock:
+    def __init__(self, day):
+        self.day = day
+
+    def __call__(self):
+        return self.day
+
+
+def _record(name, birthday):
+    r = Record(name)
+    r.add_birthday(birthday)
+    return r
+
+
+@pytest.fixture
+def clock():
+    return FakeClock(datetime.date(2025, 6, 2))  # a Monday
+
+
+class TestBirthdayScheduler:
+    def test_next_due_is_earliest_congratulation(self, clock):
+        book = AddressBook()
+        book.add_record(_record("Late", "20.06.1990"))
+        book.add_record(_record("Soon", "04.06.1990"))
+        scheduler = BirthdayScheduler(book, [].append, today=clock)
+        assert scheduler.next_due() == datetime.date(2025, 6, 4)
+
+    def test_weekend_birthday_is_due_on_monday(self, clock):
+        book = AddressBook()
+        book.add_record(_record("Sat", "07.06.1990"))
+        scheduler = BirthdayScheduler(book, [].append, today=clock)
+        assert scheduler.next_due() == datetime.date(2025, 6, 9)
+
+    def test_fire_due_notifies_and_reschedules_next_year(self, clock):
+        book = AddressBook()
+        book.add_record(_record("Alice", "02.06.1990"))
+        fired = []
+        scheduler = BirthdayScheduler(book, fired.append, today=clock)
+        scheduler.fire_due()
+        assert [r["name"] for r in fired] == ["Alice"]
+        assert fired[0]["congratulation_date"] == "02.06.2025"
+        assert scheduler.next_due() == datetime.date(2026, 6, 2)
+
+    def test_nothing_fires_before_due(self, clock):
+        book = AddressBook()
+        book.add_record(_record("Alice", "03.06.1990"))
+        fired = []
+        BirthdayScheduler(book, fired.append, today=clock).fire_due()
+        assert fired == []
+
+    def test_added_birthday_is_scheduled(self, clock):
+        book = AddressBook()
+        scheduler = BirthdayScheduler(book, [].append, today=clock)
+        book.add_record(Record("Alice"))
+        book.find("Alice").add_birthday("05.06.1990")
+        assert scheduler.next_due() == datetime.date(2025, 6, 5)
+
+    def test_changed_birthday_replaces_old_entry(self, clock):
+        book = AddressBook()
+        book.add_record(_record("Alice", "03.06.1990"))
+        scheduler = BirthdayScheduler(book, [].append, today=clock)
+        book.find("Alice").add_birthday("10.06.1990")
+        assert scheduler.next_due() == datetime.date(2025, 6, 10)
+
+    def test_deleted_record_is_not_notified(self, clock):
+        book = AddressBook()
+        book.add_record(_record("Alice", "02.06.1990"))
+        fired = []
+        scheduler = BirthdayScheduler(book, fired.append, today=clock)
+        book.delete("Alice")
+        assert scheduler.fire_due() == []
+        assert scheduler.next_due() is None
+
+    def test_record_deleted_inside_bulk_batch_does_not_break_firing(self, clock):
+        book = AddressBook()
+        book.add_record(_record("Alice", "02.06.1990"))
+        fired = []
+        scheduler = BirthdayScheduler(book, fired.append, today=clock)
+        with book.bulk():
+            book.delete("Alice")  # the scheduler hears about this only at commit
+            scheduler.fire_due()
+        assert [r["birthday"] for r in fired] == ["02.06.1990"]
+        assert scheduler.next_due() is None
+
+    def test_start_and_stop_thread(self):
+        book = AddressBook()
+        scheduler = BirthdayScheduler(book, [].append).start()
+        book.add_record(_record("Alice", "01.01.1990"))
+        scheduler.stop()
+
+
+class TestNotifiers:
+    def test_file_notifier_appends_json_lines(self, tmp_path):
+        path = tmp_path / "reminders.jsonl"
+        notifier = FileNotifier(str(path))
+        notifier({"name": "Alice"})
+        notifier({"name": "Bob"})
+        assert [json.loads(line)["name"] for line in path.read_text().splitlines()] == ["Alice", "Bob"]
+
+    @pytest.mark.parametrize("spec", ["stdout", "file:/tmp/x", "socket:/tmp/x.sock"])
+    def test_make_notifier_accepts_known_specs(self, spec):
+        assert callable(make_notifier(spec))
+
+    @pytest.mark.parametrize("spec", ["email", "file:", "socket"])
+    def test_make_notifier_rejects_unknown_specs(self, spec):
+        with pytest.raises(ValueError, match="Unknown notifier"):
+            make_notifier(spec)
@@ -0,0 +1,44 @@
+"""Tests for agent.SessionRecorder and benchmarks/replay.py."""
+
+from agent import SessionRecorder
+from benchmarks.replay import load_session, replay, synthesize_session
+
+
+class TestSessionRecording:
+    def test_recorded_lines_load_back_in_order(self, tmp_path):
+        path = tmp_path / "session.jsonl"
+        recorder = SessionRecorder(str(path))
+        recorder.record("add alice 1234567890")
+        recorder.record("  phone alice ")
+        recorder.close()
+        assert load_session(str(path)) == ["add alice 1234567890", "  phone alice "]
+
+
+class TestReplay:
+    def test_commands_are_applied_to_book(self, book):
+        replay(["add alice 1234567890", "add-birthday alice 01.01.1990"], book)
+        assert str(book.find("Alice").birthday) == "01.01.1990"
+
+    def test_counts_and_percentiles_per_command(self, book):
+        report = replay(["add alice 1234567890", "phone alice", "phone alice"], book)
+        assert report["lines"] == 3
+        assert report["commands"]["phone"]["count"] == 2
+        assert report["commands"]["phone"]["p50"] <= report["commands"]["phone"]["max"]
+
+    def test_handler_and_unknown_command_errors_are_counted(self, book):
+        report = replay(["phone nobody", "bogus"], book)
+        assert report["commands"]["phone"]["errors"] == 1
+        assert report["commands"]["bogus"]["errors"] == 1
+
+    def test_blank_and_exit_lines_are_skipped(self, book):
+        assert replay(["", "exit", "hello"], book)["lines"] == 1
+
+    def test_synthesized_session_replays(self, book):
+        report = replay(synthesize_session(300), book)
+        assert report["lines"] == 300
+        assert report["throughput"] > 0
+
+    def test_pipelined_lines_are_replayed_per_command(self, book):
+        report = replay(["add alice 1234567890; phone alice; phone alice"], book)
+        assert report["lines"] == 3
+        assert report["commands"]["phone"]["count"] == 2
@@ -0,0 +1,89 @@
+"""Tests for models/replica.py — shared-memory read replicas."""
+
+import multiprocessing
+import uuid
+
+import pytest
+
+import handlers  # noqa: F401 — registers all @command decorators
+from models.commands import registry
+from models.models import AddressBook, Record
+from models.replica import ReplicaPublisher, ReplicaReader
+from tests.helpers import birthday_n_days_from_now
+
+
+def _book():
+    book = AddressBook()
+    for i, name in enumerate(["Alice", "McDonald", "José"]):
+        r = Record(name)
+        r.add_phone(f"067000000{i}")
+        r.add_birthday(birthday_n_days_from_now(i))
+        book.add_record(r)
+    book.find("Alice").add_phone("0501112233")
+    return book
+
+
+@pytest.fixture
+def published():
+    book = _book()
+    publisher = ReplicaPublisher(book, f"abtest-{uuid.uuid4().hex[:8]}")
+    publisher.publish()
+    reader = ReplicaReader(publisher.name)
+    yield book, publisher, reader
+    reader.close()
+    publisher.close()
+
+
+def _read_in_child(name, queue):
+    reader = ReplicaReader(name)
+    queue.put(str(reader.find("mcdonald")))
+    reader.close()
+
+
+class TestReplica:
+    def test_find_is_case_insensitive_and_matches_book(self, published):
+        book, _, reader = published
+        assert str(reader.find("ALICE")) == str(book.find("Alice"))
+        assert str(reader.find("josé")) == str(book.find("José"))
+
+    def test_find_missing_returns_none(self, published):
+        assert published[2].find("Nobody") is None
+
+    def test_find_by_phone(self, published):
+        assert [r.name.value for r in published[2].find_by_phone("0501112233")] == ["Alice"]
+
+    def test_upcoming_birthdays_match_book(self, published):
+        book, _, reader = published
+        assert reader.get_upcoming_birthdays() == book.get_upcoming_birthdays()
+
+    def test_reader_swaps_to_new_generation(self, published):
+        book, publisher, reader = published
+        book.add_record(Record("Bob"))
+        assert reader.find("Bob") is None
+        publisher.publish()
+        assert reader.find("Bob") is not None
+        assert reader.generation == 2
+        assert len(reader) == 4
+
+    def test_bulk_commit_republishes(self, published):
+        book, _, reader = published
+        with book.bulk():
+            book.add_record(Record("Bob"))
+        assert reader.find("Bob") is not None
+
+    def test_read_commands_are_served(self, published):
+        reader = published[2]
+        assert "0670000001" in registry["phone"](["mcdonald"], reader)
+        assert "birthday is" in registry["show-birthday"](["alice"], reader)
+        assert "Alice" in registry["birthdays"]([], reader)
+
+    def test_write_commands_are_rejected(self, published):
+        assert "read-only replica" in registry["add"](["bob", "1234567890"], published[2])
+
+    def test_another_process_can_attach(self, published):
+        _, publisher, _ = published
+        queue = multiprocessing.Queue()
+        child = multiprocessing.Process(target=_read_in_child, args=(publisher.name, queue))
+        child.start()
+        child.join(timeout=30)
+        assert "McDonald" in queue.get(timeout=5)
@@ -0,0 +1,119 @@
+"""Tests for models/sharding.py — records partitioned across worker processes."""
+
+import pytest
+
+import handlers  # noqa: F401 — registers all @command decorators
+from models.commands import registry
+from models.models import AddressBook, Record
+from models.sharding import ShardedBook
+from tests.helpers import birthday_n_days_from_now
+
+
+@pytest.fixture(scope="module")
+def sharded():
+    book = ShardedBook(3)
+    yield book
+    book.close()
+
+
+@pytest.fixture(autouse=True)
+def _empty(sharded):
+    for name in list(sharded.data):
+        sharded.delete(name)
+
+
+def _record(name, phone=None, birthday=None):
+    r = Record(name)
+    if phone:
+        r.add_phone(phone)
+    if birthday:
+        r.add_birthday(birthday)
+    return r
+
+
+class TestShardedBook:
+    def test_add_and_find_routes_to_one_shard(self, sharded):
+        sharded.add_record(_record("Alice", "1234567890"))
+        found = sharded.find("alice")
+        assert found.name.value == "Alice"
+        assert found.find_phone("1234567890") is not None
+
+    def test_conditional_update_checks_version_on_the_shard(self, sharded):
+        sharded.add_record(_record("Alice", "1234567890"))
+        stale = sharded.find("Alice").version
+        sharded.find("Alice").add_tag("vip")
+        with pytest.raises(ValueError, match="was changed"):
+            sharded.find("Alice").add_birthday("01.01.1990", stale)
+        assert sharded.find("Alice").birthday is None
+
+    def test_find_missing_returns_none(self, sharded):
+        assert sharded.find("Nobody") is None
+
+    def test_record_mutations_reach_the_shard(self, sharded):
+        sharded.add_record(_record("Alice", "1234567890"))
+        sharded.find("Alice").edit_phone("1234567890", "0987654321")
+        sharded.find("Alice").add_birthday("01.01.1990")
+        again = sharded.find("Alice")
+        assert [p.value for p in again.phones] == ["0987654321"]
+        assert str(again.birthday) == "01.01.1990"
+
+    def test_mutation_errors_are_raised_locally(self, sharded):
+        sharded.add_record(_record("Alice", "1234567890"))
+        with pytest.raises(ValueError, match="already exists"):
+            sharded.find("Alice").add_phone("1234567890")
+
+    def test_data_keeps_insertion_order_across_shards(self, sharded):
+        names = [f"User{i}" for i in range(20)]
+        for name in names:
+            sharded.add_record(_record(name))
+        assert list(sharded.data) == names
+        assert len(sharded) == 20
+
+    def test_upcoming_birthdays_match_single_book(self, sharded):
+        local = AddressBook()
+        for i in range(10):
+            for book in (sharded, local):
+                book.add_record(_record(f"User{i}", birthday=birthday_n_days_from_now(i % 8)))
+        assert sharded.get_upcoming_birthdays() == local.get_upcoming_birthdays()
+
+    def test_upcoming_birthdays_limit_merges_shards(self, sharded):
+        local = AddressBook()
+        for i in range(20):
+            for book in (sharded, local):
+                book.add_record(_record(f"User{i}", birthday=birthday_n_days_from_now(i)))
+        assert sharded.get_upcoming_birthdays(30, 5) == local.get_upcoming_birthdays(30, 5)
+
+    def test_add_records_batches_per_shard(self, sharded):
+        sharded.add_records([_record(f"User{i}", f"{i:010d}") for i in range(30)])
+        assert list(sharded.data) == [f"User{i}" for i in range(30)]
+        assert sharded.find("User7").find_phone("0000000007") is not None
+
+    def test_delete(self, sharded):
+        sharded.add_record(_record("Alice"))
+        sharded.delete("ALICE")
+        assert sharded.find("Alice") is None
+
+    def test_handlers_run_unchanged(self, sharded):
+        registry["add"](["alice", "1234567890"], sharded)
+        registry["add"](["alice", "0987654321"], sharded)
+        result = registry["phone"](["alice"], sharded)
+        assert "1234567890" in result and "0987654321" in result
+
+    def test_all_gathers_shards_once(self, sharded, monkeypatch):
+        sharded.add_record(_record("Alice", "1234567890"))
+        scatter, calls = sharded._scatter, []
+        monkeypatch.setattr(sharded, "_scatter", lambda op, *a: calls.append(op) or scatter(op, *a))
+        assert "Alice" in registry["all"]([], sharded)
+        assert calls == ["scan"]
+
+    def test_sorted_listing_matches_single_book(self, sharded):
+        local = AddressBook()
+        for name in ["bob", "Alice", "carol", "Ann", "Dave", "alan"]:
+            for book in (sharded, local):
+                book.add_record(_record(name, "1234567890"))
+        for args, command in [(["--sorted"], "all"), (["a", "c"], "list")]:
+            assert registry[command](args, sharded) == registry[command](args, local)
+        assert [r.name.value for r in sharded.records_in_order("b")] == ["bob", "carol", "Dave"]
+
+    def test_unsupported_feature_returns_error_message(self, sharded):
+        assert "not available on a sharded book" in registry["book-stats"]([], sharded)
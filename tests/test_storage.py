@@ -0,0 +1,176 @@
+"""Tests for models/storage.py — journal persistence and the AutoSaver thread."""
+
+import time
+
+import pytest
+
+import handlers  # noqa: F401 — registers all @command decorators
+from handlers.storage import backup_cmd, restore_cmd
+from models.commands import registry
+from models.models import AddressBook, Record
+from models.storage import (
+    AutoSaver, compact, load_book, load_journal, load_snapshot, read_journal, save_snapshot,
+)
+
+
+def _alice():
+    r = Record("Alice")
+    r.add_phone("1234567890")
+    r.add_birthday("01.01.1990")
+    r.add_tag("vip")
+    return r
+
+
+class TestJournal:
+    def test_missing_file_loads_empty_book(self, tmp_path):
+        assert len(load_book(str(tmp_path / "none.jsonl"))) == 0
+
+    def test_compact_round_trip(self, tmp_path):
+        path = str(tmp_path / "book.jsonl")
+        book = AddressBook()
+        book.add_record(_alice())
+        compact(book, path)
+        loaded = load_book(path)
+        assert str(loaded.find("Alice")) == str(book.find("Alice"))
+        assert loaded.find("Alice").version == book.find("Alice").version
+
+
+class TestAutoSaver:
+    def test_close_flushes_pending_changes(self, tmp_path):
+        path = str(tmp_path / "book.jsonl")
+        book = AddressBook()
+        saver = AutoSaver(book, path, interval=60)
+        book.add_record(_alice())
+        saver.close()
+        assert load_book(path).find("Alice") is not None
+
+    def test_only_dirty_records_are_appended(self, tmp_path):
+        path = str(tmp_path / "book.jsonl")
+        book = AddressBook()
+        saver = AutoSaver(book, path, interval=60)
+        book.add_record(_alice())
+        book.add_record(Record("Bob"))
+        saver.flush()
+        book.find("Bob").add_phone("5555555555")
+        saver.close()
+        _, lines = read_journal(path)
+        assert lines == 3
+        assert load_book(path).find("Bob").find_phone("5555555555") is not None
+
+    def test_delete_is_persisted(self, tmp_path):
+        path = str(tmp_path / "book.jsonl")
+        book = AddressBook()
+        saver = AutoSaver(book, path, interval=60)
+        book.add_record(_alice())
+        saver.flush()
+        book.delete("Alice")
+        saver.close()
+        assert load_book(path).find("Alice") is None
+
+    def test_max_pending_wakes_writer(self, tmp_path):
+        path = str(tmp_path / "book.jsonl")
+        book = AddressBook()
+        saver = AutoSaver(book, path, interval=60, max_pending=2)
+        book.add_record(Record("A"))
+        book.add_record(Record("B"))
+        deadline = time.monotonic() + 5
+        while read_journal(path)[1] < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        try:
+            assert read_journal(path)[1] == 2
+        finally:
+            saver.close()
+
+    def test_long_journal_is_compacted_on_start(self, tmp_path):
+        path = str(tmp_path / "book.jsonl")
+        book = AddressBook()
+        saver = AutoSaver(book, path, interval=60)
+        book.add_record(Record("Alice"))
+        for phone in ("1111111111", "2222222222", "3333333333"):
+            book.find("Alice").add_phone(phone)
+            saver.flush()
+        saver.close()
+        book = load_book(path)
+        AutoSaver(book, path, interval=60).close()
+        assert read_journal(path)[1] == 1
+
+    def test_journal_lines_from_load_journal_skip_the_second_read(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "book.jsonl")
+        book = AddressBook()
+        book.add_record(Record("Alice"))
+        compact(book, path)
+        book, lines = load_journal(path)
+        assert lines == 1
+        monkeypatch.setattr("models.storage.read_journal", lambda p: pytest.fail("journal read twice"))
+        AutoSaver(book, path, interval=60, journal_lines=lines).close()
+
+
+class TestSnapshot:
+    def _book(self, n):
+        book = AddressBook()
+        for i in range(n):
+            r = Record(f"User{i}")
+            r.add_phone(f"{i:010d}")
+            book.add_record(r)
+        return book
+
+    @pytest.mark.parametrize("codec", ["zlib", "lzma"])
+    def test_round_trip_preserves_records_and_order(self, tmp_path, codec):
+        path = str(tmp_path / "book.snap")
+        book = self._book(25)
+        book.find("User3").add_birthday("01.01.1990")
+        save_snapshot(book, path, chunk_size=10, codec=codec)
+        assert [str(r) for r in load_snapshot(path).values()] == [str(r) for r in book.values()]
+
+    def test_parallel_load_matches_sequential(self, tmp_path):
+        path = str(tmp_path / "book.snap")
+        book = self._book(100)
+        save_snapshot(book, path, chunk_size=7)
+        assert list(load_snapshot(path, workers=3)) == list(book)
+
+    def test_empty_book_round_trip(self, tmp_path):
+        path = str(tmp_path / "book.snap")
+        save_snapshot(AddressBook(), path)
+        assert len(load_snapshot(path)) == 0
+
+    def test_unknown_codec_raises(self, tmp_path):
+        with pytest.raises(ValueError, match="codec"):
+            save_snapshot(AddressBook(), str(tmp_path / "x"), codec="brotli")
+
+    def test_non_snapshot_file_raises(self, tmp_path):
+        path = tmp_path / "book.jsonl"
+        path.write_text("{}\n")
+        with pytest.raises(ValueError, match="Not an address book snapshot"):
+            load_snapshot(str(path))
+
+    @pytest.mark.parametrize("codec", ["zlib", "lzma"])
+    def test_corrupt_chunk_raises_value_error(self, tmp_path, codec):
+        path = tmp_path / "book.snap"
+        save_snapshot(self._book(25), str(path), chunk_size=10, codec=codec)
+        data = bytearray(path.read_bytes())
+        for i in (20, 21):  # inside the first chunk, just past the magic
+            data[i] ^= 0xFF
+        path.write_bytes(bytes(data))
+        with pytest.raises(ValueError, match="Snapshot is corrupt"):
+            load_snapshot(str(path))
+
+
+class TestBackupRestoreCmd:
+    def test_backup_then_restore_into_empty_book(self, tmp_path, book_with_alice):
+        path = str(tmp_path / "book.snap")
+        assert "Saved 1" in backup_cmd([path], book_with_alice)
+        book = AddressBook()
+        assert "Restored 1" in restore_cmd([path], book)
+        assert book.find("Alice").find_phone("1234567890") is not None
+
+    def test_restore_missing_file_raises_value_error(self, tmp_path, book):
+        with pytest.raises(ValueError, match="Cannot read"):
+            restore_cmd([str(tmp_path / "missing.snap")], book)
+
+    def test_restore_corrupt_snapshot_returns_error_message(self, tmp_path, book_with_alice):
+        path = tmp_path / "book.snap"
+        backup_cmd([str(path)], book_with_alice)
+        data = bytearray(path.read_bytes())
+        data[12] ^= 0xFF
+        path.write_bytes(bytes(data))
+        assert "Snapshot is corrupt" in registry["restore"]([str(path)], AddressBook())
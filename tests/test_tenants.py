@@ -0,0 +1,85 @@
+"""Tests for models/tenants.py and the use/books commands."""
+
+import pytest
+
+import handlers  # noqa: F401 — registers all @command decorators
+from handlers.books import list_books, use_book
+from models.indexes import SERVED_INDEXES
+from models.models import Record
+from models.tenants import BookManager, BookSession
+
+
+@pytest.fixture
+def manager(tmp_path):
+    m = BookManager(str(tmp_path), max_books=2, save_interval=60)
+    yield m
+    m.close()
+
+
+class TestBookManager:
+    def test_get_creates_empty_book(self, manager):
+        assert len(manager.get("team")) == 0
+
+    def test_loaded_book_keeps_served_indexes(self, manager):
+        assert set(manager.get("work").indexes) == {index.NAME for index in SERVED_INDEXES}
+
+    def test_get_returns_same_loaded_book(self, manager):
+        assert manager.get("team") is manager.get("team")
+
+    def test_least_recently_used_book_is_evicted(self, manager):
+        manager.get("a")
+        manager.get("b")
+        manager.get("a")
+        manager.get("c")
+        assert manager.loaded == ["a", "c"]
+
+    def test_evicted_book_is_flushed_and_reloaded(self, manager):
+        manager.get("a").add_record(Record("Alice"))
+        manager.evict("a")
+        assert "a" not in manager.loaded
+        assert manager.get("a").find("Alice") is not None
+
+    def test_names_include_books_on_disk(self, manager):
+        manager.get("a")
+        manager.evict("a")
+        manager.get("b")
+        assert manager.names() == ["a", "b"]
+
+    def test_memory_budget_evicts_down_to_one_book(self, tmp_path):
+        m = BookManager(str(tmp_path), max_books=10, max_bytes=1, save_interval=60)
+        m.get("a")
+        m.get("b")
+        assert m.loaded == ["b"]
+        m.close()
+
+    @pytest.mark.parametrize("name", ["../etc", "a/b", "", "a b"])
+    def test_invalid_name_raises(self, manager, name):
+        with pytest.raises(ValueError, match="Invalid book name"):
+            manager.get(name)
+
+
+class TestBookCommands:
+    def test_use_switches_current_book(self, manager):
+        session = BookSession(manager)
+        session.add_record(Record("Alice"))
+        use_book(["team"], session)
+        assert session.find("Alice") is None
+        use_book(["default"], session)
+        assert session.find("Alice") is not None
+
+    def test_books_marks_current(self, manager):
+        session = BookSession(manager)
+        use_book(["team"], session)
+        result = list_books([], session)
+        assert "* team" in result
+        assert "default" in result
+
+    def test_use_without_manager_raises(self, book):
+        with pytest.raises(ValueError, match="not enabled"):
+            use_book(["team"], book)
+
+    def test_handlers_work_through_session(self, manager):
+        from models.commands import registry
+        session = BookSession(manager)
+        registry["add"](["alice", "1234567890"], session)
+        assert "1234567890" in registry["all"]([], session)